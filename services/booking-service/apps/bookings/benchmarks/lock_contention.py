@@ -0,0 +1,100 @@
+"""
+Нагрузочный тест распределенной блокировки: N участников борются за
+один слот, каждый в цикле берет блокировку, держит hold секунд и
+отпускает.
+
+С Redis участники - отдельные процессы (как воркеры gunicorn), с
+backend в памяти - потоки одного процесса.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from bookings.exceptions import LockTimeoutError
+from bookings.services.distributed_lock_service import DistributedLock, get_lock_backend
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def contend(name: str, duration: float, hold: float, wait: float, start, results) -> None:
+    """Один участник: берет и отпускает блокировку, пока не выйдет duration."""
+    backend = get_lock_backend()
+    waits, holds, timeouts = [], [], 0
+    start.wait()
+    finish = time.monotonic() + duration
+    while time.monotonic() < finish:
+        lock = DistributedLock(name, wait=wait, backend=backend)
+        try:
+            lock.acquire()
+        except LockTimeoutError:
+            timeouts += 1
+            continue
+        acquired_at = time.time()
+        time.sleep(hold)
+        held = lock.is_held()
+        token = lock.token
+        released_at = time.time()
+        lock.release()
+        waits.append(lock.wait_time)
+        # (токен, начало, конец, аренда была жива до конца)
+        holds.append((token, acquired_at, released_at, held))
+    results.put({'waits': waits, 'holds': holds, 'timeouts': timeouts})
+
+
+def run_contention(name: str, workers: int, duration: float, hold: float, wait: float,
+                   use_processes: bool) -> Dict:
+    """
+    Запускает участников и сводит результаты.
+
+    Кроме скорости проверяет корректность: токены уникальны, а интервалы
+    владения, упорядоченные по токену, не пересекаются.
+    """
+    if use_processes:
+        context = multiprocessing.get_context('fork')
+        start, results = context.Event(), context.Queue()
+        participants = [
+            context.Process(target=contend, args=(name, duration, hold, wait, start, results))
+            for _ in range(workers)
+        ]
+    else:
+        start, results = threading.Event(), queue.Queue()
+        participants = [
+            threading.Thread(target=contend, args=(name, duration, hold, wait, start, results))
+            for _ in range(workers)
+        ]
+
+    for participant in participants:
+        participant.start()
+    started = time.monotonic()
+    start.set()
+    # Результаты забираем до join: процесс с полной очередью не завершится.
+    # Таймаут - на случай упавшего участника
+    reports = [results.get(timeout=duration + wait + 60) for _ in participants]
+    elapsed = time.monotonic() - started
+    for participant in participants:
+        participant.join()
+
+    waits = sorted(w for report in reports for w in report['waits'])
+    holds = sorted(h for report in reports for h in report['holds'])
+    tokens = [h[0] for h in holds]
+    overlaps = sum(1 for prev, cur in zip(holds, holds[1:]) if cur[1] < prev[2])
+    return {
+        'workers': workers,
+        'acquisitions': len(holds),
+        'acquisitions_per_sec': round(len(holds) / elapsed, 1) if elapsed else 0.0,
+        'timeouts': sum(report['timeouts'] for report in reports),
+        'wait_p50_ms': round(percentile(waits, 50) * 1000, 2),
+        'wait_p95_ms': round(percentile(waits, 95) * 1000, 2),
+        'wait_p99_ms': round(percentile(waits, 99) * 1000, 2),
+        'wait_max_ms': round(waits[-1] * 1000, 2) if waits else 0.0,
+        'duplicate_tokens': len(tokens) - len(set(tokens)),
+        'overlaps': overlaps,
+        'lost_leases': sum(1 for h in holds if not h[3]),
+    }
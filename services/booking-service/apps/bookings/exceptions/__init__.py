@@ -0,0 +1,6 @@
+from bookings.exceptions.booking_exceptions import (
+    SlotConflictError, InvalidSlotError, BookingStateError, LockTimeoutError, LockLostError,
+    StaleFencingTokenError, SlotHeldError, HoldNotFoundError, HoldLimitError, HoldConfirmInProgressError,
+    ExternalServiceError, CircuitOpenError,
+    custom_exception_handler, slot_conflict_from_integrity_error
+)
@@ -0,0 +1,136 @@
+from typing import Optional
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler
+
+
+# Exclusion constraints модели Booking, запрещающие пересечение записей
+OVERLAP_CONSTRAINTS = {
+    'booking_no_provider_overlap': 'Исполнитель уже занят в это время',
+    'booking_no_resource_overlap': 'Ресурс уже занят в это время',
+}
+
+# SQLSTATE exclusion_violation
+EXCLUSION_VIOLATION = '23P01'
+
+
+class SlotConflictError(APIException):
+    """Исключение когда выбранное время уже занято."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Выбранное время уже занято'
+    default_code = 'slot_conflict'
+
+
+class InvalidSlotError(APIException):
+    """Исключение когда время записи недопустимо."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Недопустимое время записи'
+    default_code = 'invalid_slot'
+
+
+class BookingStateError(APIException):
+    """Исключение когда действие недоступно в текущем статусе записи."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Действие недоступно для записи в этом статусе'
+    default_code = 'invalid_booking_status'
+
+
+class LockTimeoutError(APIException):
+    """Исключение когда не удалось дождаться распределенной блокировки."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Слот сейчас бронируется другим запросом, повторите попытку'
+    default_code = 'slot_busy'
+
+
+class LockLostError(APIException):
+    """Исключение когда аренда блокировки истекла до завершения операции."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Блокировка слота истекла, повторите попытку'
+    default_code = 'lock_lost'
+
+
+class StaleFencingTokenError(APIException):
+    """Исключение когда запись идет с токеном блокировки старше уже принятого."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Блокировка слота перехвачена другим запросом'
+    default_code = 'stale_lock'
+
+
+class SlotHeldError(SlotConflictError):
+    """Исключение когда время временно удержано другим клиентом."""
+    default_detail = 'Выбранное время временно удержано другим клиентом'
+    default_code = 'slot_held'
+
+
+class HoldNotFoundError(APIException):
+    """Исключение когда удержание слота не найдено или уже истекло."""
+    status_code = status.HTTP_404_NOT_FOUND
+    default_detail = 'Удержание не найдено или истекло'
+    default_code = 'hold_not_found'
+
+
+class HoldLimitError(APIException):
+    """Исключение когда у клиента слишком много одновременных удержаний."""
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_detail = 'Слишком много удерживаемых слотов, подтвердите или отмените одно из удержаний'
+    default_code = 'hold_limit'
+
+
+class HoldConfirmInProgressError(APIException):
+    """Исключение когда удержание уже подтверждается другим запросом."""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Удержание уже подтверждается'
+    default_code = 'hold_confirming'
+
+
+class ExternalServiceError(APIException):
+    """Исключение когда другой сервис недоступен или отвечает ошибкой."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Связанный сервис временно недоступен, повторите попытку'
+    default_code = 'dependency_unavailable'
+
+
+class CircuitOpenError(ExternalServiceError):
+    """Исключение когда вызов отклонен открытым circuit breaker сервиса."""
+    default_code = 'dependency_circuit_open'
+
+
+def custom_exception_handler(exc, context):
+    """
+    Обработчик исключений DRF: ответ в едином для сервисов формате
+    {"error": {"message": ..., "code": ..., "details": {...}}}.
+    """
+    response = exception_handler(exc, context)
+    if response is not None:
+        response.data = {
+            'error': {
+                'message': str(exc),
+                'code': getattr(exc, 'default_code', 'error'),
+                'details': response.data if isinstance(response.data, dict) else {'detail': response.data},
+            }
+        }
+    return response
+
+
+def slot_conflict_from_integrity_error(error: IntegrityError) -> Optional[SlotConflictError]:
+    """
+    SlotConflictError, если IntegrityError - нарушение exclusion constraint
+    записей; иначе None (другая ошибка целостности, ее пробрасывают дальше).
+
+    Пример:
+        try:
+            Booking.objects.create(...)
+        except IntegrityError as e:
+            conflict = slot_conflict_from_integrity_error(e)
+            if conflict is None:
+                raise
+            raise conflict from e
+    """
+    cause = error.__cause__
+    if getattr(cause, 'pgcode', None) != EXCLUSION_VIOLATION:
+        return None
+    constraint = getattr(getattr(cause, 'diag', None), 'constraint_name', None)
+    if constraint not in OVERLAP_CONSTRAINTS:
+        return None
+    return SlotConflictError(OVERLAP_CONSTRAINTS[constraint])
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookings.benchmarks.lock_contention import run_contention
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест блокировки слота: N процессов борются за один слот.
+
+    Печатает получения блокировки в секунду, перцентили ожидания и
+    проверки корректности (уникальность токенов, отсутствие пересечений
+    владения, потерянные аренды).
+
+    Запуск (против Redis из REDIS_URL):
+        python manage.py benchmark_lock_contention --workers 1 4 16 --duration 10 --hold-ms 2
+
+    LOCK_BACKEND=memory - участники-потоки одного процесса (без Redis).
+    """
+    help = 'Замеряет throughput и время ожидания распределенной блокировки при конкуренции'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--duration', type=float, default=10, help='Длительность прогона (сек)')
+        parser.add_argument('--hold-ms', type=float, default=2, help='Сколько держать блокировку (мс)')
+        parser.add_argument('--wait', type=float, default=None, help='Максимум ожидания (сек)')
+        parser.add_argument('--output', help='Сохранить результаты в JSON файл')
+
+    def handle(self, *args, **options):
+        use_processes = settings.LOCK_BACKEND != 'memory'
+        wait = settings.BOOKING_SETTINGS['LOCK_WAIT'] if options['wait'] is None else options['wait']
+        results = []
+        for workers in options['workers']:
+            try:
+                result = run_contention(
+                    f'benchmark:{uuid4().hex}',
+                    workers=workers,
+                    duration=options['duration'],
+                    hold=options['hold_ms'] / 1000,
+                    wait=wait,
+                    use_processes=use_processes,
+                )
+            except Exception as e:
+                raise CommandError(f'Не удалось выполнить нагрузочный тест: {e}')
+            results.append(result)
+
+        self.print_results(results)
+        if options['output']:
+            report = {
+                'meta': {
+                    'recorded_at': timezone.now().isoformat(),
+                    'backend': settings.LOCK_BACKEND,
+                    'duration': options['duration'],
+                    'hold_ms': options['hold_ms'],
+                    'wait': wait,
+                },
+                'results': results,
+            }
+            Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+        broken = [r for r in results if r['duplicate_tokens'] or r['overlaps']]
+        if broken:
+            raise CommandError('Нарушено взаимное исключение: есть повторные токены или пересечения владения')
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"N":>4} {"получ/с":>9} {"p50 мс":>9} {"p95 мс":>9} {"p99 мс":>9} {"max мс":>9} '
+            f'{"таймаутов":>10} {"пересеч":>8} {"потеряно":>9}'
+        )
+        for r in results:
+            self.stdout.write(
+                f'{r["workers"]:>4} {r["acquisitions_per_sec"]:>9.1f} {r["wait_p50_ms"]:>9.2f} '
+                f'{r["wait_p95_ms"]:>9.2f} {r["wait_p99_ms"]:>9.2f} {r["wait_max_ms"]:>9.2f} '
+                f'{r["timeouts"]:>10} {r["overlaps"]:>8} {r["lost_leases"]:>9}'
+            )
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:29
+
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+import django.contrib.postgres.fields.ranges
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        # Равенство uuid в GiST индексах exclusion constraints
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='LockFence',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Блокировка')),
+                ('token', models.BigIntegerField(verbose_name='Токен')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Fencing token блокировки',
+                'verbose_name_plural': 'Fencing tokens блокировок',
+                'db_table': 'lock_fences',
+            },
+        ),
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('provider_id', models.UUIDField(verbose_name='Исполнитель')),
+                ('resource_id', models.UUIDField(blank=True, null=True, verbose_name='Ресурс')),
+                ('client_id', models.UUIDField(verbose_name='Клиент')),
+                ('service_id', models.UUIDField(verbose_name='Услуга')),
+                ('slot', django.contrib.postgres.fields.ranges.DateTimeRangeField(verbose_name='Время')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает подтверждения'), ('confirmed', 'Подтверждена'), ('cancelled', 'Отменена'), ('completed', 'Завершена'), ('expired', 'Истекла (не подтверждена вовремя)')], default='pending', max_length=20, verbose_name='Статус')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Запись',
+                'verbose_name_plural': 'Записи',
+                'db_table': 'bookings',
+                'indexes': [models.Index(models.F('provider_id'), django.contrib.postgres.fields.ranges.RangeStartsWith('slot'), name='booking_provider_start_idx'), models.Index(models.F('client_id'), django.contrib.postgres.fields.ranges.RangeStartsWith('slot'), condition=models.Q(('status__in', ('pending', 'confirmed'))), name='booking_client_upcoming_idx'), models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='booking_pending_created_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('slot__isempty', False), ('slot__lower_inf', False), ('slot__upper_inf', False)), name='booking_slot_bounded'), django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ('pending', 'confirmed'))), expressions=[('provider_id', '='), ('slot', '&&')], name='booking_no_provider_overlap'), django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('resource_id__isnull', False), ('status__in', ('pending', 'confirmed'))), expressions=[('resource_id', '='), ('slot', '&&')], name='booking_no_resource_overlap')],
+            },
+        ),
+    ]
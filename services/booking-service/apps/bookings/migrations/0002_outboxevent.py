@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:31
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255, unique=True, verbose_name='Id события')),
+                ('event_type', models.CharField(max_length=100, verbose_name='Тип события')),
+                ('aggregate_id', models.UUIDField(verbose_name='UUID исполнителя')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные')),
+                ('occurred_at', models.DateTimeField(verbose_name='Произошло')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('published_at', models.DateTimeField(blank=True, null=True, verbose_name='Опубликовано')),
+            ],
+            options={
+                'verbose_name': 'Событие outbox',
+                'verbose_name_plural': 'События outbox',
+                'db_table': 'outbox_events',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('published_at__isnull', True)), fields=['id'], name='outbox_unpublished_idx'), models.Index(fields=['published_at'], name='outbox_published_at_idx')],
+            },
+        ),
+    ]
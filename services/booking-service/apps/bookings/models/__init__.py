@@ -0,0 +1,3 @@
+from bookings.models.booking import Booking
+from bookings.models.lock_fence import LockFence
+from bookings.models.outbox_event import OutboxEvent
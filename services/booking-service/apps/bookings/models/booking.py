@@ -0,0 +1,117 @@
+from uuid import uuid4
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.fields.ranges import RangeStartsWith
+from django.db import models
+from django.db.models import F, Q
+
+
+# Записи в этих статусах занимают время исполнителя и ресурса. На уровне
+# модуля, чтобы на них ссылались и Booking.ACTIVE_STATUSES, и условия
+# constraints/indexes в Meta (Meta не видит атрибутов класса)
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+
+class Booking(models.Model):
+    """
+    Запись клиента к исполнителю.
+
+    Время записи - полуинтервал [начало, конец) в поле slot (tstzrange),
+    поэтому записи "10:00-11:00" и "11:00-12:00" не пересекаются.
+    Пересечение активных записей одного исполнителя или ресурса запрещает
+    сама БД (exclusion constraint), проверка и вставка - один INSERT.
+
+    Исполнитель и клиент - uuid пользователей users-service, услуга -
+    uuid услуги catalog-service.
+
+    Требует расширения btree_gist (равенство uuid в GiST индексе): его
+    создает BtreeGistExtension() в migrations/0001_initial перед таблицей.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_COMPLETED = 'completed'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает подтверждения'),
+        (STATUS_CONFIRMED, 'Подтверждена'),
+        (STATUS_CANCELLED, 'Отменена'),
+        (STATUS_COMPLETED, 'Завершена'),
+        (STATUS_EXPIRED, 'Истекла (не подтверждена вовремя)'),
+    ]
+    ACTIVE_STATUSES = ACTIVE_STATUSES
+
+    uuid = models.UUIDField(default=uuid4, editable=False, unique=True)
+    provider_id = models.UUIDField('Исполнитель')
+    # Кабинет, оборудование и т.п., если услуге он нужен
+    resource_id = models.UUIDField('Ресурс', blank=True, null=True)
+    client_id = models.UUIDField('Клиент')
+    service_id = models.UUIDField('Услуга')
+    slot = DateTimeRangeField('Время')
+    status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    comment = models.TextField('Комментарий', blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'bookings'
+        verbose_name = 'Запись'
+        verbose_name_plural = 'Записи'
+        constraints = [
+            # Ограниченный непустой интервал: иначе && с ним ведет себя неожиданно
+            models.CheckConstraint(
+                condition=Q(slot__isempty=False, slot__lower_inf=False, slot__upper_inf=False),
+                name='booking_slot_bounded',
+            ),
+            ExclusionConstraint(
+                name='booking_no_provider_overlap',
+                index_type='GIST',
+                expressions=[
+                    ('provider_id', RangeOperators.EQUAL),
+                    ('slot', RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status__in=ACTIVE_STATUSES),
+            ),
+            ExclusionConstraint(
+                name='booking_no_resource_overlap',
+                index_type='GIST',
+                expressions=[
+                    ('resource_id', RangeOperators.EQUAL),
+                    ('slot', RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status__in=ACTIVE_STATUSES, resource_id__isnull=False),
+            ),
+        ]
+        indexes = [
+            # День исполнителя (агенда, включая отмененные):
+            # provider_id = ? AND lower(slot) >= ? AND lower(slot) < ?
+            models.Index(F('provider_id'), RangeStartsWith('slot'), name='booking_provider_start_idx'),
+            # Предстоящие записи клиента: только активные, по времени начала
+            models.Index(
+                F('client_id'), RangeStartsWith('slot'),
+                name='booking_client_upcoming_idx',
+                condition=Q(status__in=ACTIVE_STATUSES),
+            ),
+            # Sweeper неподтвержденных записей: status = 'pending' AND created_at < ?
+            models.Index(
+                fields=['created_at'],
+                name='booking_pending_created_idx',
+                condition=Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'Запись {self.uuid} ({self.get_status_display()})'
+
+    @property
+    def starts_at(self):
+        return self.slot.lower if self.slot else None
+
+    @property
+    def ends_at(self):
+        return self.slot.upper if self.slot else None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
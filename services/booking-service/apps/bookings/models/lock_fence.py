@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class LockFence(models.Model):
+    """
+    Наибольший принятый fencing token распределенной блокировки.
+
+    Запись под блокировкой проверяет свой токен против этой строки в той
+    же транзакции (DistributedLockService.check_fencing_token).
+    """
+    name = models.CharField('Блокировка', max_length=255, primary_key=True)
+    token = models.BigIntegerField('Токен')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'lock_fences'
+        verbose_name = 'Fencing token блокировки'
+        verbose_name_plural = 'Fencing tokens блокировок'
+
+    def __str__(self):
+        return f'{self.name}: {self.token}'
@@ -0,0 +1,36 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+
+class OutboxEvent(models.Model):
+    """
+    Событие booking-service для публикации в брокер.
+
+    Пишется в той же транзакции, что и изменение записи, и публикуется
+    задачей publish_outbox_events (transactional outbox). event_id
+    детерминирован (например 'booking-expired:<uuid>'): повторная запись
+    того же события игнорируется, потребитель дедуплицирует по нему же.
+    """
+    event_id = models.CharField('Id события', max_length=255, unique=True)
+    event_type = models.CharField('Тип события', max_length=100)
+    aggregate_id = models.UUIDField('UUID исполнителя')
+    payload = models.JSONField('Данные', encoder=DjangoJSONEncoder)
+    occurred_at = models.DateTimeField('Произошло')
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField('Опубликовано', blank=True, null=True)
+
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Событие outbox'
+        verbose_name_plural = 'События outbox'
+        ordering = ['id']
+        indexes = [
+            # Выборка неопубликованных событий релеем
+            models.Index(fields=['id'], condition=Q(published_at__isnull=True), name='outbox_unpublished_idx'),
+            # Очистка опубликованных событий
+            models.Index(fields=['published_at'], name='outbox_published_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} {self.event_id}'
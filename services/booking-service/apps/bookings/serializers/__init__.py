@@ -0,0 +1,4 @@
+from bookings.serializers.booking_serializers import BookingSerializer, HoldConfirmSerializer
+from bookings.serializers.slot_serializers import (
+    SlotHoldCreateSerializer, SlotHoldSerializer, BusyRangesQuerySerializer, BusyRangeSerializer
+)
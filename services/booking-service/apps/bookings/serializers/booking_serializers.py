@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from bookings.models import Booking
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    """Serializer для вывода записи."""
+    starts_at = serializers.DateTimeField(read_only=True)
+    ends_at = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = [
+            'uuid', 'provider_id', 'resource_id', 'client_id', 'service_id',
+            'starts_at', 'ends_at', 'status', 'comment', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class HoldConfirmSerializer(serializers.Serializer):
+    """Serializer для подтверждения удержания записью."""
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
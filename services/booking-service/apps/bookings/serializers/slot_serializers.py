@@ -0,0 +1,45 @@
+from datetime import timedelta
+from rest_framework import serializers
+
+
+class SlotHoldCreateSerializer(serializers.Serializer):
+    """Serializer для удержания слота."""
+    provider_id = serializers.UUIDField()
+    service_id = serializers.UUIDField()
+    resource_id = serializers.UUIDField(required=False, allow_null=True)
+    starts_at = serializers.DateTimeField()
+    ends_at = serializers.DateTimeField()
+
+
+class SlotHoldSerializer(serializers.Serializer):
+    """Serializer для вывода удержания слота (SlotHold)."""
+    hold_id = serializers.CharField(read_only=True)
+    provider_id = serializers.UUIDField(read_only=True)
+    service_id = serializers.UUIDField(read_only=True)
+    resource_id = serializers.UUIDField(read_only=True, allow_null=True)
+    starts_at = serializers.DateTimeField(read_only=True)
+    ends_at = serializers.DateTimeField(read_only=True)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+
+class BusyRangesQuerySerializer(serializers.Serializer):
+    """Параметры запроса занятого времени исполнителя."""
+    provider_id = serializers.UUIDField()
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    # Ограничение окна: ответ и запрос к БД не растут без предела
+    MAX_RANGE = timedelta(days=31)
+
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError({'end': 'Конец периода должен быть позже начала'})
+        if attrs['end'] - attrs['start'] > self.MAX_RANGE:
+            raise serializers.ValidationError({'end': f'Период не длиннее {self.MAX_RANGE.days} дней'})
+        return attrs
+
+
+class BusyRangeSerializer(serializers.Serializer):
+    """Занятый интервал [starts_at, ends_at)."""
+    starts_at = serializers.DateTimeField(read_only=True)
+    ends_at = serializers.DateTimeField(read_only=True)
@@ -0,0 +1,6 @@
+from bookings.services.booking_service import BookingService
+from bookings.services.slot_validation_service import SlotValidationService
+from bookings.services.distributed_lock_service import DistributedLockService, DistributedLock
+from bookings.services.slot_hold_service import SlotHoldService, SlotHold
+from bookings.services.external_api_client import ExternalAPIClient, get_service_client
+from bookings.services.outbox_service import OutboxService
@@ -0,0 +1,277 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from bookings.exceptions import (
+    BookingStateError, SlotConflictError, SlotHeldError, InvalidSlotError, HoldNotFoundError, HoldLimitError,
+    HoldConfirmInProgressError, slot_conflict_from_integrity_error
+)
+from bookings.models import Booking
+from bookings.services.outbox_service import OutboxService
+from bookings.services.slot_hold_service import SlotHold, SlotHoldService, HOLD_CONFLICT, HOLD_LIMIT_EXCEEDED
+from bookings.services.slot_validation_service import SlotValidationService
+from utils.datetime_helpers import day_bounds
+
+logger = logging.getLogger(__name__)
+
+
+class BookingService:
+    """
+    Сервис для работы с записями.
+
+    Содержит бизнес-логику создания, подтверждения и отмены записей.
+
+    Запись в два шага: hold_slot удерживает время в Redis на HOLD_TTL
+    секунд, confirm_hold превращает удержание в запись в БД. Брошенное
+    удержание истекает само, без записи в БД.
+    """
+
+    @staticmethod
+    def create_booking(
+        client_id: UUID,
+        provider_id: UUID,
+        service_id: UUID,
+        starts_at: datetime,
+        ends_at: datetime,
+        resource_id: Optional[UUID] = None,
+        comment: str = '',
+        hold_id: Optional[str] = None,
+    ) -> Booking:
+        """
+        Создает запись на интервал [starts_at, ends_at).
+
+        Занятость записями не проверяется заранее и ничего не блокируется:
+        INSERT либо проходит, либо нарушает exclusion constraint - тогда
+        SlotConflictError (409). Так две параллельные записи на одно время
+        не могут пройти обе.
+
+        Время, удержанное другим клиентом, не записывается (SlotHeldError);
+        hold_id - собственное удержание, которое подтверждается этой записью.
+
+        Пример: booking = BookingService.create_booking(
+                    client_id, provider_id, service_id, starts_at, ends_at
+                )
+        """
+        SlotValidationService.validate_slot(starts_at, ends_at)
+        if SlotHoldService.is_held(provider_id, starts_at, ends_at, resource_id, exclude_hold_id=hold_id):
+            raise SlotHeldError()
+        try:
+            # Savepoint: при конфликте внешняя транзакция остается рабочей
+            with transaction.atomic():
+                booking = Booking.objects.create(
+                    client_id=client_id,
+                    provider_id=provider_id,
+                    service_id=service_id,
+                    resource_id=resource_id,
+                    slot=DateTimeTZRange(starts_at, ends_at, '[)'),
+                    comment=comment,
+                )
+        except IntegrityError as e:
+            conflict = slot_conflict_from_integrity_error(e)
+            if conflict is None:
+                raise
+            logger.info(f'Конфликт записи: исполнитель {provider_id}, {starts_at} - {ends_at}')
+            raise conflict from e
+
+        logger.info(f'Создана запись {booking.uuid}: исполнитель {provider_id}, {starts_at} - {ends_at}')
+        return booking
+
+    @staticmethod
+    def hold_slot(
+        client_id: UUID,
+        provider_id: UUID,
+        service_id: UUID,
+        starts_at: datetime,
+        ends_at: datetime,
+        resource_id: Optional[UUID] = None,
+    ) -> SlotHold:
+        """
+        Удерживает [starts_at, ends_at) за клиентом на HOLD_TTL секунд.
+
+        Проверка пересечения с чужими удержаниями и запись удержания -
+        один Lua скрипт, поэтому два клиента не удержат одно время. Занятое
+        записями время не удерживается (проверка в БД - только чтение).
+
+        Пример: hold = BookingService.hold_slot(client_id, provider_id, service_id, starts_at, ends_at)
+        """
+        SlotValidationService.validate_slot(starts_at, ends_at)
+        if SlotValidationService.is_booked(provider_id, starts_at, ends_at, resource_id):
+            raise SlotConflictError()
+
+        result, hold = SlotHoldService.create(client_id, provider_id, service_id, starts_at, ends_at, resource_id)
+        if result == HOLD_CONFLICT:
+            raise SlotHeldError()
+        if result == HOLD_LIMIT_EXCEEDED:
+            raise HoldLimitError()
+
+        logger.info(f'Удержание {hold.hold_id}: исполнитель {provider_id}, {starts_at} - {ends_at}, '
+                    f'до {hold.expires_at}')
+        return hold
+
+    @staticmethod
+    def get_hold(hold_id: str, client_id: UUID) -> SlotHold:
+        """Живое удержание клиента; чужое или истекшее - HoldNotFoundError."""
+        hold = SlotHoldService.get(hold_id)
+        if hold is None or hold.client_id != str(client_id):
+            raise HoldNotFoundError()
+        return hold
+
+    @staticmethod
+    def confirm_hold(hold_id: str, client_id: UUID, comment: str = '') -> Booking:
+        """
+        Превращает удержание клиента в запись.
+
+        Удержание продлевается на HOLD_CONFIRM_GRACE секунд и помечается
+        как подтверждаемое (повторный confirm - HoldConfirmInProgressError).
+        Запись создается обычным INSERT: если время все же занято (запись
+        без удержания успела раньше), exclusion constraint вернет
+        SlotConflictError, и удержание снимается.
+        """
+        hold = BookingService.get_hold(hold_id, client_id)
+        claim_error = SlotHoldService.claim(hold)
+        if claim_error == 'expired':
+            raise HoldNotFoundError()
+        if claim_error == 'claimed':
+            raise HoldConfirmInProgressError()
+
+        try:
+            booking = BookingService.create_booking(
+                client_id=hold.client_id,
+                provider_id=hold.provider_id,
+                service_id=hold.service_id,
+                starts_at=hold.starts_at,
+                ends_at=hold.ends_at,
+                resource_id=hold.resource_id,
+                comment=comment,
+                hold_id=hold.hold_id,
+            )
+        except (SlotConflictError, InvalidSlotError):
+            # Слот уже не получить: удержание бесполезно
+            SlotHoldService.release(hold)
+            raise
+        except Exception:
+            # Временная ошибка: удержание остается, confirm можно повторить
+            SlotHoldService.unclaim(hold)
+            raise
+
+        # Удержание снимаем после коммита: до него время держит удержание
+        transaction.on_commit(lambda: SlotHoldService.release(hold))
+        logger.info(f'Удержание {hold.hold_id} подтверждено записью {booking.uuid}')
+        return booking
+
+    @staticmethod
+    def release_hold(hold_id: str, client_id: UUID) -> None:
+        """Отменяет удержание клиента; время сразу освобождается."""
+        hold = BookingService.get_hold(hold_id, client_id)
+        SlotHoldService.release(hold)
+        logger.info(f'Удержание {hold.hold_id} отменено')
+
+    @staticmethod
+    def confirm_booking(booking: Booking) -> Booking:
+        """Подтверждает ожидающую запись."""
+        return BookingService._change_status(booking, (Booking.STATUS_PENDING,), Booking.STATUS_CONFIRMED)
+
+    @staticmethod
+    def cancel_booking(booking: Booking) -> Booking:
+        """Отменяет активную запись; ее время сразу освобождается."""
+        return BookingService._change_status(booking, Booking.ACTIVE_STATUSES, Booking.STATUS_CANCELLED)
+
+    @staticmethod
+    def _change_status(booking: Booking, allowed, new_status: str) -> Booking:
+        # Условный UPDATE вместо чтения с блокировкой: из двух
+        # параллельных переходов выигрывает один
+        updated = Booking.objects.filter(pk=booking.pk, status__in=allowed).update(
+            status=new_status, updated_at=timezone.now()
+        )
+        if not updated:
+            raise BookingStateError()
+        booking.refresh_from_db(fields=['status', 'updated_at'])
+        logger.info(f'Запись {booking.uuid}: статус {new_status}')
+        return booking
+
+    @staticmethod
+    def expire_pending_batch(batch_size: int, now: Optional[datetime] = None) -> List[Booking]:
+        """
+        Переводит в expired до batch_size записей, не подтвержденных за
+        PENDING_TTL_MINUTES, и возвращает их; время записей освобождается.
+
+        SELECT ... FOR UPDATE SKIP LOCKED: параллельные sweeper-ы берут
+        разные строки, а строку, которую сейчас подтверждают, пропускают
+        (confirm_booking ждет блокировку sweeper-а и получает
+        BookingStateError). Повторный запуск не трогает уже истекшие.
+        Индекс booking_pending_created_idx.
+
+        События slot.released пишутся в outbox в той же транзакции.
+        """
+        now = now or timezone.now()
+        cutoff = now - timedelta(minutes=settings.BOOKING_SETTINGS['PENDING_TTL_MINUTES'])
+        with transaction.atomic():
+            bookings = list(
+                Booking.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=Booking.STATUS_PENDING, created_at__lt=cutoff)
+                .order_by('created_at')[:batch_size]
+            )
+            if bookings:
+                Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(
+                    status=Booking.STATUS_EXPIRED, updated_at=now
+                )
+                for booking in bookings:
+                    booking.status = Booking.STATUS_EXPIRED
+                    booking.updated_at = now
+                OutboxService.record_many([OutboxService.booking_released(booking) for booking in bookings])
+        return bookings
+
+    @staticmethod
+    def expire_holds_batch(batch_size: int) -> List[SlotHold]:
+        """
+        Забирает до batch_size истекших удержаний и пишет в outbox
+        освобождение их времени.
+
+        Если записать события не удалось, удержания возвращаются в индекс
+        истечения и достанутся следующему запуску sweeper-а.
+        """
+        holds = SlotHoldService.pop_expired(batch_size)
+        if not holds:
+            return holds
+        try:
+            with transaction.atomic():
+                OutboxService.record_many([OutboxService.hold_released(hold) for hold in holds])
+        except Exception:
+            SlotHoldService.requeue_expired(holds)
+            raise
+        return holds
+
+    @staticmethod
+    def get_provider_day(provider_id: UUID, day: date, tz_name: str) -> QuerySet:
+        """
+        Записи исполнителя, начинающиеся в сутки day по его часовому поясу.
+
+        Индекс booking_provider_start_idx (provider_id, lower(slot)).
+        """
+        start, end = day_bounds(day, tz_name)
+        return (
+            Booking.objects
+            .filter(provider_id=provider_id, slot__startswith__gte=start, slot__startswith__lt=end)
+            .order_by('slot__startswith')
+        )
+
+    @staticmethod
+    def get_client_upcoming(client_id: UUID, limit: Optional[int] = None) -> QuerySet:
+        """
+        Ближайшие активные записи клиента.
+
+        Частичный индекс booking_client_upcoming_idx (client_id, lower(slot)).
+        """
+        limit = limit or settings.BOOKING_SETTINGS['UPCOMING_LIMIT']
+        return (
+            Booking.objects
+            .filter(client_id=client_id, status__in=Booking.ACTIVE_STATUSES, slot__startswith__gte=timezone.now())
+            .order_by('slot__startswith')[:limit]
+        )
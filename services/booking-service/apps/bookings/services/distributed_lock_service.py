@@ -0,0 +1,329 @@
+"""
+Распределенные блокировки (per-slot, per-provider) на Redis.
+
+Блокировка - аренда на LOCK_TTL секунд: ключ ставится SET NX PX и
+продлевается фоновым потоком, пока владелец ее держит. Если процесс
+завис или упал, аренда истекает сама.
+
+Блокировка в Redis не защищает от владельца, который "проспал" истечение
+аренды (пауза GC, сеть) и продолжил писать. Поэтому каждое получение
+выдает fencing token - возрастающий номер, а запись в БД проверяет его
+(DistributedLockService.check_fencing_token): запись с токеном меньше
+уже принятого отклоняется.
+
+Пример:
+    with DistributedLockService.slot_lock(provider_id, starts_at) as lock:
+        ...  # долгая подготовка
+        with transaction.atomic():
+            DistributedLockService.check_fencing_token(lock)
+            Booking.objects.create(...)
+"""
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+
+from bookings.exceptions import LockTimeoutError, LockLostError, StaleFencingTokenError
+from bookings.models import LockFence
+from utils.redis_client import get_redis, redis_key
+
+logger = logging.getLogger(__name__)
+
+
+FENCE_COUNTER_KEY = redis_key('lock', 'fence')
+
+# KEYS: ключ блокировки, счетчик fencing token; ARGV: владелец, аренда (мс).
+# Возвращает новый токен, 0 - блокировка занята, -1 - счетчика нет
+# (блокировка не ставится, счетчик нужно сначала восстановить)
+ACQUIRE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return -1
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+# KEYS: ключ блокировки; ARGV: владелец, аренда (мс)
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS: ключ блокировки; ARGV: владелец
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLockBackend:
+    """
+    Блокировки в общем Redis. Каждая операция - один Lua скрипт, поэтому
+    проверка владельца и изменение ключа атомарны.
+
+    Счетчик токенов один на все блокировки и не истекает: токены растут
+    и для каждой блокировки в отдельности, а ключи слотов не копятся.
+    Если счетчик пропал (сброс или failover Redis), он восстанавливается
+    из наибольшего токена в lock_fences - иначе новые токены оказались бы
+    меньше принятых и записи под блокировкой отклонялись бы.
+    """
+
+    def __init__(self):
+        self._scripts = {}
+
+    def script(self, source: str):
+        if source not in self._scripts:
+            self._scripts[source] = get_redis().register_script(source)
+        return self._scripts[source]
+
+    def acquire(self, name: str, owner: str, ttl_ms: int) -> int:
+        keys = [redis_key('lock', name), FENCE_COUNTER_KEY]
+        token = int(self.script(ACQUIRE_SCRIPT)(keys=keys, args=[owner, ttl_ms]))
+        if token < 0:
+            self.seed_counter()
+            token = int(self.script(ACQUIRE_SCRIPT)(keys=keys, args=[owner, ttl_ms]))
+        return max(token, 0)
+
+    @staticmethod
+    def seed_counter() -> None:
+        """
+        Восстанавливает счетчик токенов из наибольшего принятого в БД.
+
+        SET NX: если счетчик уже восстановил другой процесс и выдал с него
+        токены, он не откатывается назад.
+        """
+        max_token = LockFence.objects.aggregate(max_token=Max('token'))['max_token'] or 0
+        if get_redis().set(FENCE_COUNTER_KEY, max_token, nx=True):
+            logger.warning(f'Счетчик fencing token восстановлен из БД: {max_token}')
+
+    def renew(self, name: str, owner: str, ttl_ms: int) -> bool:
+        return bool(self.script(RENEW_SCRIPT)(keys=[redis_key('lock', name)], args=[owner, ttl_ms]))
+
+    def release(self, name: str, owner: str) -> bool:
+        return bool(self.script(RELEASE_SCRIPT)(keys=[redis_key('lock', name)], args=[owner]))
+
+
+class InMemoryLockBackend:
+    """
+    Блокировки в памяти процесса с той же семантикой (аренда, токены).
+
+    Для тестов и локального запуска в одном процессе: между процессами
+    ничего не разделяется. Включается LOCK_BACKEND=memory.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._locks = {}
+        self._token = 0
+
+    def acquire(self, name: str, owner: str, ttl_ms: int) -> int:
+        now = time.monotonic()
+        with self._mutex:
+            current = self._locks.get(name)
+            if current is not None and current[1] > now:
+                return 0
+            self._locks[name] = (owner, now + ttl_ms / 1000)
+            self._token += 1
+            return self._token
+
+    def renew(self, name: str, owner: str, ttl_ms: int) -> bool:
+        now = time.monotonic()
+        with self._mutex:
+            current = self._locks.get(name)
+            if current is None or current[0] != owner or current[1] <= now:
+                return False
+            self._locks[name] = (owner, now + ttl_ms / 1000)
+            return True
+
+    def release(self, name: str, owner: str) -> bool:
+        with self._mutex:
+            current = self._locks.get(name)
+            if current is None or current[0] != owner:
+                return False
+            del self._locks[name]
+            return True
+
+
+_backends = {}
+_backends_mutex = threading.Lock()
+
+
+def get_lock_backend():
+    """Backend по settings.LOCK_BACKEND (один на процесс)."""
+    name = settings.LOCK_BACKEND
+    with _backends_mutex:
+        if name not in _backends:
+            backend_classes = {'redis': RedisLockBackend, 'memory': InMemoryLockBackend}
+            if name not in backend_classes:
+                raise ValueError(f'Неизвестный LOCK_BACKEND: {name}')
+            _backends[name] = backend_classes[name]()
+        return _backends[name]
+
+
+class DistributedLock:
+    """
+    Одна блокировка: получение с ограниченным ожиданием, продление аренды
+    в фоне, освобождение. Используется как context manager.
+
+    ttl - аренда (сек), wait - максимум ожидания (сек, 0 - одна попытка).
+    После acquire() доступны token (fencing token) и wait_time (сколько ждали).
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None, wait: Optional[float] = None,
+                 backend=None, auto_renew: bool = True):
+        booking_settings = settings.BOOKING_SETTINGS
+        self.name = name
+        self.ttl = ttl or booking_settings['LOCK_TTL']
+        self.wait = booking_settings['LOCK_WAIT'] if wait is None else wait
+        self.retry_base = booking_settings['LOCK_RETRY_BASE']
+        self.retry_max = booking_settings['LOCK_RETRY_MAX']
+        self.backend = backend or get_lock_backend()
+        self.auto_renew = auto_renew
+        self.owner = uuid4().hex
+        self.token = None
+        self.wait_time = 0.0
+        self._lease_until = 0.0
+        self._lost = threading.Event()
+        self._stop = threading.Event()
+        self._renewer = None
+
+    @property
+    def ttl_ms(self) -> int:
+        return int(self.ttl * 1000)
+
+    def acquire(self) -> int:
+        """
+        Получает блокировку, ожидая не дольше wait секунд.
+
+        Повторные попытки - с экспоненциальной паузой и полным случайным
+        разбросом (full jitter), чтобы ожидающие не стучались в Redis
+        одновременно. По истечении ожидания - LockTimeoutError.
+        """
+        started = time.monotonic()
+        deadline = started + self.wait
+        attempt = 0
+        while True:
+            # Аренду отсчитываем от отправки запроса - с запасом
+            requested_at = time.monotonic()
+            token = self.backend.acquire(self.name, self.owner, self.ttl_ms)
+            if token:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.wait_time = time.monotonic() - started
+                raise LockTimeoutError()
+            delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+            time.sleep(min(delay, remaining))
+            attempt += 1
+
+        self.token = token
+        self.wait_time = time.monotonic() - started
+        self._lease_until = requested_at + self.ttl
+        self._lost.clear()
+        self._stop.clear()
+        if self.auto_renew:
+            self._renewer = threading.Thread(target=self._renew_loop, name=f'lock-renew:{self.name}', daemon=True)
+            self._renewer.start()
+        return token
+
+    def _renew_loop(self) -> None:
+        # Продлеваем с запасом: три попытки за время аренды
+        interval = self.ttl / 3
+        while not self._stop.wait(interval):
+            requested_at = time.monotonic()
+            try:
+                renewed = self.backend.renew(self.name, self.owner, self.ttl_ms)
+            except Exception as e:
+                # Временная ошибка Redis: аренда еще может быть жива, пробуем снова
+                logger.warning(f'Не удалось продлить блокировку {self.name}: {e}')
+                continue
+            if not renewed:
+                logger.warning(f'Блокировка {self.name} потеряна (аренда истекла)')
+                self._lost.set()
+                return
+            self._lease_until = requested_at + self.ttl
+
+    def is_held(self) -> bool:
+        return self.token is not None and not self._lost.is_set() and time.monotonic() < self._lease_until
+
+    def ensure_held(self) -> None:
+        """LockLostError, если аренда истекла или блокировку перехватили."""
+        if not self.is_held():
+            raise LockLostError()
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join()
+            self._renewer = None
+        if self.token is None:
+            return
+        try:
+            self.backend.release(self.name, self.owner)
+        except Exception as e:
+            # Ключ истечет сам по окончании аренды
+            logger.warning(f'Не удалось освободить блокировку {self.name}: {e}')
+        self.token = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class DistributedLockService:
+    """
+    Блокировки исполнителя и слота.
+
+    Пример:
+        with DistributedLockService.provider_lock(provider_id, wait=1) as lock:
+            ...
+    """
+
+    @staticmethod
+    def provider_lock(provider_id: UUID, **kwargs) -> DistributedLock:
+        """Блокировка всего расписания исполнителя."""
+        return DistributedLock(f'provider:{provider_id}', **kwargs)
+
+    @staticmethod
+    def slot_lock(provider_id: UUID, starts_at: datetime, **kwargs) -> DistributedLock:
+        """Блокировка одного слота исполнителя (по времени начала)."""
+        return DistributedLock(f'slot:{provider_id}:{int(starts_at.timestamp())}', **kwargs)
+
+    @staticmethod
+    def check_fencing_token(lock: DistributedLock) -> None:
+        """
+        Проверяет fencing token в БД. Вызывать в транзакции записи.
+
+        Строка lock_fences хранит наибольший принятый токен блокировки и
+        остается заблокированной до коммита: запись владельца, чей токен
+        меньше (аренду уже получил другой), отклоняется StaleFencingTokenError.
+        """
+        if not connection.in_atomic_block:
+            raise RuntimeError('check_fencing_token должен вызываться внутри transaction.atomic')
+        lock.ensure_held()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {LockFence._meta.db_table} (name, token, updated_at) VALUES (%s, %s, now()) '
+                f'ON CONFLICT (name) DO UPDATE SET token = EXCLUDED.token, updated_at = EXCLUDED.updated_at '
+                f'WHERE {LockFence._meta.db_table}.token <= EXCLUDED.token '
+                f'RETURNING token',
+                [lock.name, lock.token],
+            )
+            if cursor.fetchone() is None:
+                logger.warning(f'Отклонена запись с устаревшим токеном {lock.token} блокировки {lock.name}')
+                raise StaleFencingTokenError()
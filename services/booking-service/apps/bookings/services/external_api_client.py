@@ -0,0 +1,258 @@
+"""
+HTTP клиент для вызовов catalog-, schedule- и users-service.
+
+Все вызовы идут через один requests.Session на процесс: пул keep-alive
+соединений (HTTP_POOL_SIZE на каждый хост), так что запрос не платит за
+TCP handshake. У каждого вызова таймауты на соединение и на чтение.
+
+Устойчивость:
+    - повторы с экспоненциальной паузой и случайным разбросом (full
+      jitter) - только для идемпотентных вызовов (GET, HEAD, PUT, DELETE
+      или idempotent=True): неидемпотентный POST мог дойти до сервиса;
+    - circuit breaker на каждый сервис: после HTTP_BREAKER_THRESHOLD
+      сбоев подряд вызовы сразу падают CircuitOpenError, не ожидая
+      таймаутов, а через HTTP_BREAKER_RESET_TIMEOUT секунд пропускается
+      одна пробная попытка.
+
+Сбой - ошибка соединения, таймаут или ответ 5xx; ответы 4xx возвращаются
+вызывающему как есть. Время каждого вызова пишется в метрику
+external_api_request_duration_seconds с меткой сервиса.
+
+Пример:
+    response = get_service_client('catalog').get(f'/api/v1/services/{service_id}/')
+    users = ExternalAPIClient.get_users([client_id, provider_id])
+
+В тестах HTTP подменяется библиотекой responses (HTTPAdapter.send):
+    @responses.activate
+    def test_users():
+        responses.post('http://users-service:8000/api/v1/users/internal/batch/', json={...})
+"""
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from uuid import UUID
+
+import requests
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+from requests.adapters import HTTPAdapter
+
+from bookings.exceptions import ExternalServiceError, CircuitOpenError
+from common.metrics import LATENCY_BUCKETS, InstrumentedSession
+
+logger = logging.getLogger(__name__)
+
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Ответы, которые считаются сбоем сервиса (повторяются и открывают breaker)
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+EXTERNAL_REQUEST_DURATION = Histogram(
+    'external_api_request_duration_seconds',
+    'Время вызова другого сервиса (одна попытка)',
+    ['dependency', 'method', 'outcome'],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_RETRIES = Counter(
+    'external_api_retries_total',
+    'Повторы вызовов других сервисов',
+    ['dependency'],
+)
+EXTERNAL_REJECTED = Counter(
+    'external_api_circuit_rejected_total',
+    'Вызовы, отклоненные открытым circuit breaker',
+    ['dependency'],
+)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker одного сервиса (в памяти процесса).
+
+    closed - вызовы идут; open - отклоняются до истечения reset_timeout;
+    half-open - пропускается одна пробная попытка: успех закрывает
+    breaker, сбой снова открывает его.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, threshold: int, reset_timeout: float):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._mutex = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._mutex:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Пробную попытку получает один вызов, остальные отклоняются.
+                # Если ее результат не пришел (исключение вне HTTP), через
+                # reset_timeout пропускается следующая
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._mutex:
+            if self.state != self.CLOSED:
+                logger.info(f'Circuit breaker {self.name} закрыт')
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._mutex:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f'Circuit breaker {self.name} открыт после {self.failures} сбоев подряд')
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Общий Session процесса с пулом keep-alive соединений.
+
+    Повторы urllib3 выключены (max_retries=0): повторяет ServiceClient,
+    различая идемпотентные вызовы.
+    """
+    booking_settings = settings.BOOKING_SETTINGS
+    adapter = HTTPAdapter(
+        pool_connections=len(settings.EXTERNAL_SERVICES),
+        pool_maxsize=booking_settings['HTTP_POOL_SIZE'],
+        max_retries=0,
+    )
+    session = InstrumentedSession()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class ServiceClient:
+    """Вызовы одного сервиса: таймауты, повторы, circuit breaker, метрики."""
+
+    def __init__(self, name: str, base_url: str, headers: Optional[Dict[str, str]] = None):
+        booking_settings = settings.BOOKING_SETTINGS
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers or {}
+        self.timeout = (booking_settings['HTTP_CONNECT_TIMEOUT'], booking_settings['HTTP_READ_TIMEOUT'])
+        self.retries = booking_settings['HTTP_RETRIES']
+        self.backoff_base = booking_settings['HTTP_BACKOFF_BASE']
+        self.backoff_max = booking_settings['HTTP_BACKOFF_MAX']
+        self.breaker = CircuitBreaker(
+            name, booking_settings['HTTP_BREAKER_THRESHOLD'], booking_settings['HTTP_BREAKER_RESET_TIMEOUT']
+        )
+
+    def request(self, method: str, path: str, idempotent: Optional[bool] = None,
+                timeout: Optional[Timeout] = None, **kwargs) -> requests.Response:
+        """
+        Вызывает сервис; ответ < 500 возвращается как есть.
+
+        timeout - (connect, read) или одно число, по умолчанию из настроек.
+        idempotent - можно ли повторять вызов (по умолчанию - по методу).
+        Сервис недоступен - ExternalServiceError, breaker открыт - CircuitOpenError.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = 1 + (self.retries if idempotent else 0)
+        url = f'{self.base_url}/{path.lstrip("/")}'
+        headers = {**self.headers, **(kwargs.pop('headers', None) or {})}
+
+        error = None
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                EXTERNAL_REJECTED.labels(self.name).inc()
+                raise CircuitOpenError(f'Сервис {self.name} временно недоступен')
+            if attempt:
+                EXTERNAL_RETRIES.labels(self.name).inc()
+
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                response = get_session().request(
+                    method, url, headers=headers, timeout=timeout or self.timeout, **kwargs
+                )
+                outcome = str(response.status_code)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            finally:
+                EXTERNAL_REQUEST_DURATION.labels(self.name, method, outcome).observe(time.perf_counter() - started)
+
+            if outcome != 'error' and response.status_code < 500:
+                self.breaker.record_success()
+                return response
+
+            self.breaker.record_failure()
+            if outcome != 'error':
+                error = f'HTTP {response.status_code}'
+                if response.status_code not in RETRY_STATUSES:
+                    break
+            if attempt + 1 < attempts:
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+        logger.warning(f'Вызов {self.name} {method} {path} не удался: {error}')
+        raise ExternalServiceError(f'Сервис {self.name} недоступен')
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+
+_clients = {}
+_clients_mutex = threading.Lock()
+
+
+def get_service_client(name: str) -> ServiceClient:
+    """Клиент сервиса из settings.EXTERNAL_SERVICES (один на процесс: общий breaker)."""
+    with _clients_mutex:
+        if name not in _clients:
+            if name not in settings.EXTERNAL_SERVICES:
+                raise ValueError(f'Неизвестный сервис: {name}')
+            headers = {'X-Internal-Token': settings.INTERNAL_API_TOKEN} if settings.INTERNAL_API_TOKEN else {}
+            _clients[name] = ServiceClient(name, settings.EXTERNAL_SERVICES[name], headers=headers)
+        return _clients[name]
+
+
+class ExternalAPIClient:
+    """
+    Вызовы других сервисов, нужные записям.
+
+    Пример: users = ExternalAPIClient.get_users([client_id, provider_id], fields=['uuid', 'full_name'])
+    """
+
+    @staticmethod
+    def get_users(uuids: Iterable[Union[UUID, str]], fields: Optional[List[str]] = None) -> Dict[str, dict]:
+        """
+        Пользователи по uuid одним вызовом users-service (internal batch).
+
+        Возвращает {uuid: пользователь}; отсутствующих в ответе нет.
+        POST только читает, поэтому повторяется как идемпотентный.
+        """
+        body = {'uuids': [str(uuid) for uuid in uuids]}
+        if fields:
+            # по uuid строится результат, поэтому он запрашивается всегда
+            body['fields'] = list(fields) if 'uuid' in fields else ['uuid', *fields]
+        response = get_service_client('users').post(
+            '/api/v1/users/internal/batch/', json=body, idempotent=True
+        )
+        if response.status_code != 200:
+            logger.warning(f'users-service вернул {response.status_code} на пакетный запрос пользователей')
+            raise ExternalServiceError('Не удалось получить пользователей')
+        return {str(user['uuid']): user for user in response.json()['results']}
@@ -0,0 +1,85 @@
+import logging
+from typing import List
+from django.db import transaction
+
+from bookings.models import Booking, OutboxEvent
+from bookings.services.slot_hold_service import SlotHold
+
+logger = logging.getLogger(__name__)
+
+
+SLOT_RELEASED = 'slot.released'
+
+
+class OutboxService:
+    """
+    Запись событий booking-service в outbox.
+
+    Пример:
+        with transaction.atomic():
+            Booking.objects.filter(pk__in=ids).update(status=Booking.STATUS_EXPIRED)
+            OutboxService.record_many([OutboxService.booking_released(booking) for booking in bookings])
+    """
+
+    @staticmethod
+    def booking_released(booking: Booking) -> OutboxEvent:
+        """Освобождение времени истекшей записи."""
+        return OutboxEvent(
+            event_id=f'booking-expired:{booking.uuid}',
+            event_type=SLOT_RELEASED,
+            aggregate_id=booking.provider_id,
+            occurred_at=booking.updated_at,
+            payload={
+                'reason': 'booking_expired',
+                'booking_id': str(booking.uuid),
+                'provider_id': str(booking.provider_id),
+                'resource_id': str(booking.resource_id) if booking.resource_id else None,
+                'starts_at': booking.starts_at.isoformat(),
+                'ends_at': booking.ends_at.isoformat(),
+            },
+        )
+
+    @staticmethod
+    def hold_released(hold: SlotHold) -> OutboxEvent:
+        """Освобождение времени истекшего удержания."""
+        return OutboxEvent(
+            event_id=f'hold-expired:{hold.hold_id}',
+            event_type=SLOT_RELEASED,
+            aggregate_id=hold.provider_id,
+            occurred_at=hold.expires_at,
+            payload={
+                'reason': 'hold_expired',
+                'hold_id': hold.hold_id,
+                'provider_id': hold.provider_id,
+                'resource_id': hold.resource_id,
+                'starts_at': hold.starts_at.isoformat(),
+                'ends_at': hold.ends_at.isoformat(),
+            },
+        )
+
+    @staticmethod
+    def record_many(events: List[OutboxEvent]) -> None:
+        """
+        Пишет события одним INSERT. Вызывать внутри транзакции изменения.
+
+        Уже записанные события (тот же event_id) пропускаются. После
+        коммита будится релей, чтобы события ушли без ожидания beat.
+        """
+        if not events:
+            return
+        if not transaction.get_connection().in_atomic_block:
+            raise RuntimeError('OutboxService.record_many должен вызываться внутри transaction.atomic')
+
+        OutboxEvent.objects.bulk_create(events, ignore_conflicts=True)
+        transaction.on_commit(OutboxService._wake_relay)
+        logger.debug(f'Событий записано в outbox: {len(events)}')
+
+    @staticmethod
+    def _wake_relay():
+        # Импорт здесь: bookings.tasks при загрузке импортирует bookings.services
+        from bookings.tasks.outbox_tasks import publish_outbox_events
+        try:
+            publish_outbox_events.delay()
+        except Exception as e:
+            # Событие уже в outbox, его заберет периодический запуск релея
+            logger.warning(f'Не удалось запустить релей outbox: {e}')
@@ -0,0 +1,345 @@
+"""
+Временные удержания слотов (holds) в Redis.
+
+Удержание резервирует время исполнителя на HOLD_TTL секунд, пока клиент
+заполняет форму и платит, и не пишет в БД ничего. Истекшее удержание
+освобождается само: ключ удаляется по TTL, а записи в индексах
+исполнителя и ресурса с прошедшим сроком не учитываются и вычищаются
+при следующем удержании или sweeper-ом (expire_stale_holds), который
+по индексу истечения публикует освобождение слота.
+
+Структуры:
+    booking-service:hold:<hold_id>               JSON удержания, PX = TTL
+    booking-service:holds:provider:<uuid>        ZSET hold_id:start_ms:end_ms -> истекает_ms
+    booking-service:holds:resource:<uuid>        то же для ресурса
+    booking-service:holds:client:<uuid>          ZSET удержаний клиента (для лимита)
+    booking-service:holds:expiry                 ZSET всех удержаний -> истекает_ms
+    booking-service:hold:<hold_id>:claim         идет подтверждение (защита от двойного)
+"""
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+from django.conf import settings
+
+from utils.redis_client import get_redis, redis_key
+
+
+HOLD_OK = 1
+HOLD_CONFLICT = 0
+HOLD_LIMIT_EXCEEDED = -1
+
+# Все удержания по сроку истечения: по нему sweeper находит истекшие
+EXPIRY_INDEX_KEY = redis_key('holds', 'expiry')
+
+# KEYS: ключ удержания, индекс истечения, ZSET клиента, ZSET исполнителя[, ZSET ресурса].
+# ARGV: now_ms, start_ms, end_ms, ttl_ms, member, payload, max_holds, expiry_member.
+# Проверяет пересечение с живыми удержаниями и лимит клиента и только
+# тогда записывает удержание во все индексы.
+HOLD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local start_ms = tonumber(ARGV[2])
+local end_ms = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+for i = 3, #KEYS do
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now)
+end
+if redis.call('ZCARD', KEYS[3]) >= tonumber(ARGV[7]) then
+    return -1
+end
+for i = 4, #KEYS do
+    for _, member in ipairs(redis.call('ZRANGE', KEYS[i], 0, -1)) do
+        local held_start, held_end = string.match(member, ':(%d+):(%d+)$')
+        if tonumber(held_start) < end_ms and start_ms < tonumber(held_end) then
+            return 0
+        end
+    end
+end
+for i = 3, #KEYS do
+    redis.call('ZADD', KEYS[i], now + ttl, ARGV[5])
+    if redis.call('PTTL', KEYS[i]) < ttl then
+        redis.call('PEXPIRE', KEYS[i], ttl)
+    end
+end
+redis.call('ZADD', KEYS[2], now + ttl, ARGV[8])
+redis.call('SET', KEYS[1], ARGV[6], 'PX', ttl)
+return 1
+"""
+
+# KEYS: ключ удержания, ключ подтверждения, индекс истечения, ZSET-ы удержания.
+# ARGV: now_ms, grace_ms, member, expiry_member.
+# Начинает подтверждение: удержание живо и еще не подтверждается. Продлевает
+# его на grace_ms, чтобы оно не истекло посреди INSERT. Возвращает JSON или
+# nil (истекло) или 'claimed' (уже подтверждается).
+CLAIM_SCRIPT = """
+local payload = redis.call('GET', KEYS[1])
+if not payload then
+    return nil
+end
+if not redis.call('SET', KEYS[2], '1', 'NX', 'PX', ARGV[2]) then
+    return 'claimed'
+end
+local grace = tonumber(ARGV[2])
+local until_ms = tonumber(ARGV[1]) + grace
+if redis.call('PTTL', KEYS[1]) < grace then
+    redis.call('PEXPIRE', KEYS[1], grace)
+    redis.call('ZADD', KEYS[3], 'GT', until_ms, ARGV[4])
+    for i = 4, #KEYS do
+        redis.call('ZADD', KEYS[i], 'GT', until_ms, ARGV[3])
+        if redis.call('PTTL', KEYS[i]) < grace then
+            redis.call('PEXPIRE', KEYS[i], grace)
+        end
+    end
+end
+return payload
+"""
+
+# KEYS: ключ удержания, ключ подтверждения, индекс истечения, ZSET-ы удержания.
+# ARGV: member, expiry_member
+RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[3], ARGV[2])
+for i = 4, #KEYS do
+    redis.call('ZREM', KEYS[i], ARGV[1])
+end
+return redis.call('DEL', KEYS[1], KEYS[2])
+"""
+
+# KEYS: индекс истечения; ARGV: now_ms, limit.
+# Забирает из индекса до limit истекших удержаний: параллельные sweeper-ы
+# получают разные удержания, каждое - ровно один раз.
+POP_EXPIRED_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #expired, 2 do
+    redis.call('ZREM', KEYS[1], expired[i])
+end
+return expired
+"""
+
+
+def to_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def from_ms(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000, tz=dt_timezone.utc)
+
+
+@dataclass
+class SlotHold:
+    """Удержание слота клиентом."""
+    hold_id: str
+    client_id: str
+    provider_id: str
+    service_id: str
+    resource_id: Optional[str]
+    starts_at: datetime
+    ends_at: datetime
+    expires_at: datetime
+
+    @property
+    def member(self) -> str:
+        # Время в члене ZSET: пересечения проверяются без чтения удержаний
+        return f'{self.hold_id}:{to_ms(self.starts_at)}:{to_ms(self.ends_at)}'
+
+    @property
+    def expiry_member(self) -> str:
+        # Член индекса истечения: по нему восстанавливается удержание без ключа
+        return '|'.join([
+            self.member, self.client_id, self.provider_id, self.service_id, self.resource_id or ''
+        ])
+
+    @classmethod
+    def from_expiry_member(cls, expiry_member: str, expires_ms: float) -> 'SlotHold':
+        member, client_id, provider_id, service_id, resource_id = expiry_member.split('|')
+        hold_id, start_ms, end_ms = member.rsplit(':', 2)
+        return cls(
+            hold_id=hold_id,
+            client_id=client_id,
+            provider_id=provider_id,
+            service_id=service_id,
+            resource_id=resource_id or None,
+            starts_at=from_ms(int(start_ms)),
+            ends_at=from_ms(int(end_ms)),
+            expires_at=from_ms(int(expires_ms)),
+        )
+
+    def index_keys(self) -> List[str]:
+        keys = [
+            redis_key('holds', 'client', self.client_id),
+            redis_key('holds', 'provider', self.provider_id),
+        ]
+        if self.resource_id:
+            keys.append(redis_key('holds', 'resource', self.resource_id))
+        return keys
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for field in ('starts_at', 'ends_at', 'expires_at'):
+            data[field] = to_ms(data[field])
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'SlotHold':
+        data = json.loads(payload)
+        for field in ('starts_at', 'ends_at', 'expires_at'):
+            data[field] = from_ms(data[field])
+        return cls(**data)
+
+
+def hold_key(hold_id: str) -> str:
+    return redis_key('hold', hold_id)
+
+
+def claim_key(hold_id: str) -> str:
+    return redis_key('hold', hold_id, 'claim')
+
+
+class SlotHoldService:
+    """
+    Атомарные операции с удержаниями (каждая - один Lua скрипт).
+
+    Бизнес-логика (проверки слота и БД, подтверждение в запись) - в
+    BookingService.hold_slot / confirm_hold / release_hold.
+    """
+    _scripts = {}
+
+    @staticmethod
+    def script(source: str):
+        if source not in SlotHoldService._scripts:
+            SlotHoldService._scripts[source] = get_redis().register_script(source)
+        return SlotHoldService._scripts[source]
+
+    @staticmethod
+    def create(client_id: UUID, provider_id: UUID, service_id: UUID, starts_at: datetime,
+               ends_at: datetime, resource_id: Optional[UUID] = None) -> Tuple[int, Optional[SlotHold]]:
+        """
+        Удерживает [starts_at, ends_at) на HOLD_TTL секунд.
+
+        Возвращает (HOLD_OK, удержание), (HOLD_CONFLICT, None) - время
+        удержано другим, или (HOLD_LIMIT_EXCEEDED, None) - у клиента
+        слишком много удержаний.
+        """
+        booking_settings = settings.BOOKING_SETTINGS
+        ttl_ms = int(booking_settings['HOLD_TTL'] * 1000)
+        now_ms = int(time.time() * 1000)
+        hold = SlotHold(
+            hold_id=uuid4().hex,
+            client_id=str(client_id),
+            provider_id=str(provider_id),
+            service_id=str(service_id),
+            resource_id=str(resource_id) if resource_id else None,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            expires_at=from_ms(now_ms + ttl_ms),
+        )
+        result = int(SlotHoldService.script(HOLD_SCRIPT)(
+            keys=[hold_key(hold.hold_id), EXPIRY_INDEX_KEY, *hold.index_keys()],
+            args=[now_ms, to_ms(starts_at), to_ms(ends_at), ttl_ms, hold.member, hold.to_json(),
+                  booking_settings['MAX_HOLDS_PER_CLIENT'], hold.expiry_member],
+        ))
+        return result, hold if result == HOLD_OK else None
+
+    @staticmethod
+    def get(hold_id: str) -> Optional[SlotHold]:
+        payload = get_redis().get(hold_key(hold_id))
+        return SlotHold.from_json(payload) if payload else None
+
+    @staticmethod
+    def claim(hold: SlotHold) -> Optional[str]:
+        """
+        Начинает подтверждение удержания.
+
+        Возвращает None при успехе, 'expired' или 'claimed' (подтверждение
+        уже идет в другом запросе).
+        """
+        grace_ms = int(settings.BOOKING_SETTINGS['HOLD_CONFIRM_GRACE'] * 1000)
+        result = SlotHoldService.script(CLAIM_SCRIPT)(
+            keys=[hold_key(hold.hold_id), claim_key(hold.hold_id), EXPIRY_INDEX_KEY, *hold.index_keys()[1:]],
+            args=[int(time.time() * 1000), grace_ms, hold.member, hold.expiry_member],
+        )
+        if result is None:
+            return 'expired'
+        if result == 'claimed':
+            return 'claimed'
+        return None
+
+    @staticmethod
+    def unclaim(hold: SlotHold) -> None:
+        """Снимает отметку подтверждения (подтверждение не удалось по временной причине)."""
+        get_redis().delete(claim_key(hold.hold_id))
+
+    @staticmethod
+    def release(hold: SlotHold) -> bool:
+        """Удаляет удержание из всех индексов. False - его уже не было."""
+        return bool(SlotHoldService.script(RELEASE_SCRIPT)(
+            keys=[hold_key(hold.hold_id), claim_key(hold.hold_id), EXPIRY_INDEX_KEY, *hold.index_keys()],
+            args=[hold.member, hold.expiry_member],
+        ))
+
+    @staticmethod
+    def pop_expired(limit: int) -> List[SlotHold]:
+        """
+        Забирает до limit истекших удержаний из индекса истечения и
+        вычищает их из индексов исполнителя, ресурса и клиента.
+
+        Забор атомарен (Lua), поэтому sweeper можно запускать на всех
+        воркерах: каждое удержание достается одному. Ключи самих удержаний
+        к этому моменту уже удалены Redis по TTL.
+        """
+        expired = SlotHoldService.script(POP_EXPIRED_SCRIPT)(
+            keys=[EXPIRY_INDEX_KEY], args=[int(time.time() * 1000), limit]
+        )
+        holds = [
+            SlotHold.from_expiry_member(member, float(score))
+            for member, score in zip(expired[::2], expired[1::2])
+        ]
+        if holds:
+            # Истекшие члены и так не учитываются (по score); удаляем, чтобы не копились
+            pipe = get_redis().pipeline(transaction=False)
+            for hold in holds:
+                for key in hold.index_keys():
+                    pipe.zrem(key, hold.member)
+            pipe.execute()
+        return holds
+
+    @staticmethod
+    def requeue_expired(holds: List[SlotHold]) -> None:
+        """Возвращает забранные pop_expired удержания в индекс истечения."""
+        get_redis().zadd(EXPIRY_INDEX_KEY, {hold.expiry_member: to_ms(hold.expires_at) for hold in holds})
+
+    @staticmethod
+    def get_held_ranges(provider_id: UUID, start: datetime, end: datetime,
+                        exclude_hold_id: Optional[str] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Живые удержания исполнителя, пересекающие [start, end), по возрастанию.
+
+        Только чтение: истекшие отсекаются по времени, а не удаляются.
+        """
+        return SlotHoldService._live_ranges(
+            redis_key('holds', 'provider', provider_id), start, end, exclude_hold_id
+        )
+
+    @staticmethod
+    def is_held(provider_id: UUID, starts_at: datetime, ends_at: datetime,
+                resource_id: Optional[UUID] = None, exclude_hold_id: Optional[str] = None) -> bool:
+        """Пересекается ли [starts_at, ends_at) с чужим живым удержанием исполнителя или ресурса."""
+        keys = [redis_key('holds', 'provider', provider_id)]
+        if resource_id:
+            keys.append(redis_key('holds', 'resource', resource_id))
+        return any(SlotHoldService._live_ranges(key, starts_at, ends_at, exclude_hold_id) for key in keys)
+
+    @staticmethod
+    def _live_ranges(key: str, start: datetime, end: datetime,
+                     exclude_hold_id: Optional[str]) -> List[Tuple[datetime, datetime]]:
+        now_ms = int(time.time() * 1000)
+        start_ms, end_ms = to_ms(start), to_ms(end)
+        ranges = []
+        for member in get_redis().zrangebyscore(key, now_ms, '+inf'):
+            hold_id, held_start, held_end = member.rsplit(':', 2)
+            if hold_id == exclude_hold_id:
+                continue
+            if int(held_start) < end_ms and start_ms < int(held_end):
+                ranges.append((from_ms(int(held_start)), from_ms(int(held_end))))
+        return sorted(ranges)
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+from django.conf import settings
+from django.utils import timezone
+
+from bookings.exceptions import InvalidSlotError
+from bookings.models import Booking
+from bookings.services.slot_hold_service import SlotHoldService
+from utils.datetime_helpers import is_aware
+
+
+class SlotValidationService:
+    """
+    Проверки времени записи, не требующие блокировок.
+
+    Занятость здесь не проверяется перед вставкой: пересечение записей
+    запрещает exclusion constraint, и BookingService.create_booking
+    превращает его нарушение в SlotConflictError. Чтение занятости
+    (get_busy_ranges, is_booked) нужно для показа свободного времени и
+    для отказа в удержании заведомо занятого слота.
+    """
+
+    @staticmethod
+    def validate_slot(starts_at: datetime, ends_at: datetime, now: Optional[datetime] = None) -> None:
+        """
+        Проверяет интервал [starts_at, ends_at): часовой пояс, порядок,
+        длительность и горизонт записи. Ошибка - InvalidSlotError.
+        """
+        booking_settings = settings.BOOKING_SETTINGS
+        if not is_aware(starts_at) or not is_aware(ends_at):
+            raise InvalidSlotError('Время записи должно быть с часовым поясом')
+        if ends_at <= starts_at:
+            raise InvalidSlotError('Время окончания должно быть позже времени начала')
+
+        duration = ends_at - starts_at
+        if duration < timedelta(minutes=booking_settings['MIN_DURATION_MINUTES']):
+            raise InvalidSlotError(f'Запись не короче {booking_settings["MIN_DURATION_MINUTES"]} мин')
+        if duration > timedelta(minutes=booking_settings['MAX_DURATION_MINUTES']):
+            raise InvalidSlotError(f'Запись не длиннее {booking_settings["MAX_DURATION_MINUTES"]} мин')
+
+        now = now or timezone.now()
+        if starts_at < now + timedelta(minutes=booking_settings['MIN_LEAD_MINUTES']):
+            raise InvalidSlotError('Это время уже недоступно для записи')
+        if starts_at > now + timedelta(days=booking_settings['MAX_ADVANCE_DAYS']):
+            raise InvalidSlotError(f'Запись не дальше чем на {booking_settings["MAX_ADVANCE_DAYS"]} дней вперед')
+
+    @staticmethod
+    def is_booked(provider_id: UUID, starts_at: datetime, ends_at: datetime,
+                  resource_id: Optional[UUID] = None) -> bool:
+        """Пересекается ли [starts_at, ends_at) с активной записью исполнителя или ресурса."""
+        active = Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES, slot__overlap=(starts_at, ends_at))
+        if active.filter(provider_id=provider_id).exists():
+            return True
+        return bool(resource_id) and active.filter(resource_id=resource_id).exists()
+
+    @staticmethod
+    def get_busy_ranges(provider_id: UUID, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        Занятые интервалы исполнителя, пересекающие [start, end), по возрастанию:
+        активные записи и живые удержания слотов (удержанное время тоже занято).
+
+        Запрос slot && [start, end) по активным записям обслуживает GiST
+        индекс exclusion constraint booking_no_provider_overlap.
+        """
+        slots = (
+            Booking.objects
+            .filter(provider_id=provider_id, status__in=Booking.ACTIVE_STATUSES, slot__overlap=(start, end))
+            .order_by('slot__startswith')
+            .values_list('slot', flat=True)
+        )
+        booked = [(slot.lower, slot.upper) for slot in slots]
+        return sorted(booked + SlotHoldService.get_held_ranges(provider_id, start, end))
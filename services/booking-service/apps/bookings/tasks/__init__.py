@@ -0,0 +1,2 @@
+from bookings.tasks.cleanup_tasks import expire_pending_bookings, expire_stale_holds, purge_lock_fences
+from bookings.tasks.outbox_tasks import publish_outbox_events, purge_published_outbox_events
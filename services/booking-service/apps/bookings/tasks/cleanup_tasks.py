@@ -0,0 +1,123 @@
+import logging
+import time
+from datetime import timedelta
+from typing import Callable
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from prometheus_client import Counter, Histogram
+
+from bookings.models import LockFence
+from bookings.services import BookingService
+from common.metrics import LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+SWEEP_EXPIRED = Counter(
+    'booking_sweeper_expired_total',
+    'Истекшие записи и удержания, освобожденные sweeper-ом',
+    ['kind'],
+)
+SWEEP_DURATION = Histogram(
+    'booking_sweeper_duration_seconds',
+    'Время одного запуска sweeper-а',
+    ['kind'],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def sweep(kind: str, expire_batch: Callable[[int], list]) -> int:
+    """
+    Истекает записи/удержания пачками по SWEEP_BATCH_SIZE, пока они есть,
+    но не дольше SWEEP_TIME_LIMIT секунд. Возвращает количество.
+
+    События освобождения слотов пачка пишет в outbox сама, публикует их
+    релей publish_outbox_events.
+    """
+    booking_settings = settings.BOOKING_SETTINGS
+    batch_size = booking_settings['SWEEP_BATCH_SIZE']
+    time_limit = booking_settings['SWEEP_TIME_LIMIT']
+
+    total = 0
+    started = time.monotonic()
+    try:
+        while time.monotonic() - started < time_limit:
+            items = expire_batch(batch_size)
+            if not items:
+                break
+            total += len(items)
+            SWEEP_EXPIRED.labels(kind).inc(len(items))
+            if len(items) < batch_size:
+                break
+    finally:
+        duration = time.monotonic() - started
+        SWEEP_DURATION.labels(kind).observe(duration)
+
+    if total:
+        logger.info(f'Sweeper {kind}: истекло {total} за {duration:.2f} с')
+    return total
+
+
+@shared_task
+def expire_pending_bookings() -> int:
+    """
+    Истекает записи, не подтвержденные (не оплаченные) за PENDING_TTL_MINUTES.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['expire-pending-bookings']).
+    Блокировка не нужна: пачки берутся FOR UPDATE SKIP LOCKED, поэтому
+    параллельные запуски на разных воркерах делят работу, а повторный
+    запуск ничего не делает.
+    """
+    return sweep('booking', BookingService.expire_pending_batch)
+
+
+@shared_task
+def expire_stale_holds() -> int:
+    """
+    Вычищает истекшие удержания слотов и пишет в outbox освобождение их времени.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['expire-stale-holds']).
+    Удержание освобождается в Redis само по TTL; здесь оно только
+    убирается из индексов. Забор из индекса истечения атомарен, поэтому
+    каждое удержание достается одному воркеру; если событие не записалось,
+    удержание возвращается в индекс.
+    """
+    return sweep('hold', BookingService.expire_holds_batch)
+
+
+@shared_task
+def purge_lock_fences() -> int:
+    """
+    Удаляет fencing token-ы блокировок, не обновлявшиеся LOCK_FENCE_RETENTION_DAYS дней.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['purge-lock-fences']).
+    Строка lock_fences появляется на каждый слот, под блокировкой которого
+    писали, и без очистки таблица растет бесконечно. Старая строка уже не
+    нужна: аренда блокировки - секунды, владельца с таким старым токеном
+    нет. Свежие строки (с наибольшими токенами) остаются, поэтому по ним
+    по-прежнему восстанавливается счетчик токенов в Redis.
+
+    Строки обходятся по первичному ключу, так что таблица просматривается
+    один раз, без отдельного индекса по updated_at.
+    """
+    booking_settings = settings.BOOKING_SETTINGS
+    cutoff = timezone.now() - timedelta(days=booking_settings['LOCK_FENCE_RETENTION_DAYS'])
+    batch_size = booking_settings['SWEEP_BATCH_SIZE'] * 5
+    deleted = 0
+    last_name = ''
+    while True:
+        names = list(
+            LockFence.objects.filter(name__gt=last_name, updated_at__lt=cutoff)
+            .order_by('name')
+            .values_list('name', flat=True)[:batch_size]
+        )
+        if not names:
+            break
+        # updated_at проверяется повторно: строку могли обновить после выборки
+        count, _ = LockFence.objects.filter(name__in=names, updated_at__lt=cutoff).delete()
+        deleted += count
+        last_name = names[-1]
+    if deleted:
+        logger.info(f'Удалено устаревших fencing token-ов: {deleted}')
+    return deleted
@@ -0,0 +1,97 @@
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict
+from uuid import uuid4
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from bookings.models import OutboxEvent
+from utils.rabbitmq_publisher import make_event, publish_events
+from utils.redis_client import get_redis, redis_key
+
+logger = logging.getLogger(__name__)
+
+
+RELAY_LOCK_KEY = redis_key('outbox', 'relay', 'lock')
+
+# KEYS: ключ блокировки; ARGV: владелец.
+# Снимает блокировку, только если она все еще наша: релей, работавший
+# дольше OUTBOX_RELAY_LOCK_TIMEOUT, не снимет блокировку следующего
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def to_message(event: OutboxEvent) -> Dict[str, Any]:
+    return make_event(event.event_type, event.event_id, event.aggregate_id, event.payload,
+                      occurred_at=event.occurred_at)
+
+
+@shared_task
+def publish_outbox_events() -> int:
+    """
+    Релей outbox: публикует неопубликованные события пачками.
+
+    Одновременно работает только один релей (блокировка в Redis), события
+    берутся по возрастанию id. Доставка at-least-once: потребитель
+    дедуплицирует по event_id.
+    """
+    batch_size = settings.OUTBOX_BATCH_SIZE
+    lock_timeout = settings.OUTBOX_RELAY_LOCK_TIMEOUT
+    owner = uuid4().hex
+    if not get_redis().set(RELAY_LOCK_KEY, owner, nx=True, ex=lock_timeout):
+        return 0
+
+    total = 0
+    started = time.monotonic()
+    try:
+        while time.monotonic() - started < lock_timeout / 2:
+            events = list(OutboxEvent.objects.filter(published_at__isnull=True).order_by('id')[:batch_size])
+            if not events:
+                break
+
+            published_ids = []
+            try:
+                publish_events([to_message(event) for event in events], published_ids)
+            except Exception as e:
+                # Неопубликованные события заберет следующий запуск по beat
+                logger.error(f'Ошибка публикации outbox: {e}')
+                break
+            finally:
+                OutboxEvent.objects.filter(event_id__in=published_ids).update(published_at=timezone.now())
+                total += len(published_ids)
+
+            if len(events) < batch_size:
+                break
+    finally:
+        get_redis().register_script(RELEASE_LOCK_SCRIPT)(keys=[RELAY_LOCK_KEY], args=[owner])
+
+    if total:
+        logger.info(f'Опубликовано событий outbox: {total}')
+    return total
+
+
+@shared_task
+def purge_published_outbox_events() -> int:
+    """Удаляет давно опубликованные события outbox пачками."""
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    batch_size = settings.OUTBOX_BATCH_SIZE * 10
+    deleted = 0
+    while True:
+        ids = list(
+            OutboxEvent.objects.filter(published_at__lt=cutoff)
+            .order_by()
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        count, _ = OutboxEvent.objects.filter(id__in=ids).delete()
+        deleted += count
+    if deleted:
+        logger.info(f'Удалено опубликованных событий outbox: {deleted}')
+    return deleted
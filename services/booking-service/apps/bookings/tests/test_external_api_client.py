@@ -0,0 +1,201 @@
+"""
+Тесты HTTP клиента других сервисов без сети: ответы подменяет responses.
+"""
+import json
+from unittest import mock
+
+import requests
+import responses
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from bookings.exceptions import CircuitOpenError, ExternalServiceError
+from bookings.services import external_api_client
+from bookings.services.external_api_client import CircuitBreaker, ExternalAPIClient, get_service_client
+
+CATALOG_URL = 'http://catalog.test'
+USERS_URL = 'http://users.test'
+
+
+@override_settings(
+    EXTERNAL_SERVICES={'catalog': CATALOG_URL, 'users': USERS_URL},
+    INTERNAL_API_TOKEN='internal-token',
+    BOOKING_SETTINGS={
+        **settings.BOOKING_SETTINGS,
+        'HTTP_CONNECT_TIMEOUT': 0.5,
+        'HTTP_READ_TIMEOUT': 3,
+        'HTTP_RETRIES': 2,
+        'HTTP_BREAKER_THRESHOLD': 3,
+        'HTTP_BREAKER_RESET_TIMEOUT': 30,
+    },
+)
+class ServiceClientTests(SimpleTestCase):
+
+    def setUp(self):
+        # Клиенты (и их breaker-ы) живут весь процесс: каждому тесту - новые
+        external_api_client._clients.clear()
+        self.addCleanup(external_api_client._clients.clear)
+        # Паузы между повторами не ждем
+        sleep = mock.patch.object(external_api_client.time, 'sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+        self.client = get_service_client('catalog')
+
+    @responses.activate
+    def test_get_retried_on_gateway_errors(self):
+        responses.get(f'{CATALOG_URL}/services/1/', status=502)
+        responses.get(f'{CATALOG_URL}/services/1/', status=504)
+        responses.get(f'{CATALOG_URL}/services/1/', json={'id': 1})
+
+        response = self.client.get('/services/1/')
+
+        self.assertEqual(response.json(), {'id': 1})
+        self.assertEqual(len(responses.calls), 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    @responses.activate
+    def test_get_retries_are_limited(self):
+        responses.get(f'{CATALOG_URL}/services/1/', status=503)
+
+        with self.assertRaises(ExternalServiceError):
+            self.client.get('/services/1/')
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_other_5xx_not_retried(self):
+        responses.get(f'{CATALOG_URL}/services/1/', status=500)
+
+        with self.assertRaises(ExternalServiceError):
+            self.client.get('/services/1/')
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_4xx_returned_without_retry(self):
+        responses.get(f'{CATALOG_URL}/services/1/', status=404)
+
+        response = self.client.get('/services/1/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    @responses.activate
+    def test_post_not_replayed(self):
+        responses.post(f'{CATALOG_URL}/bookings/', status=503)
+
+        with self.assertRaises(ExternalServiceError):
+            self.client.post('/bookings/', json={'a': 1})
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_post_not_replayed_after_timeout(self):
+        responses.post(f'{CATALOG_URL}/bookings/', body=requests.ReadTimeout())
+
+        with self.assertRaises(ExternalServiceError):
+            self.client.post('/bookings/', json={'a': 1})
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_idempotent_post_retried(self):
+        responses.post(f'{CATALOG_URL}/lookup/', status=503)
+        responses.post(f'{CATALOG_URL}/lookup/', json={'ok': True})
+
+        response = self.client.post('/lookup/', json={}, idempotent=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_default_timeouts_passed_to_requests(self):
+        responses.get(f'{CATALOG_URL}/services/1/', json={})
+
+        self.client.get('/services/1/')
+
+        self.assertEqual(responses.calls[0].request.req_kwargs['timeout'], (0.5, 3))
+
+    @responses.activate
+    def test_call_timeout_overrides_default(self):
+        responses.get(f'{CATALOG_URL}/services/1/', json={})
+
+        self.client.get('/services/1/', timeout=(0.1, 1))
+
+        self.assertEqual(responses.calls[0].request.req_kwargs['timeout'], (0.1, 1))
+
+    @responses.activate
+    def test_timeout_raises_external_service_error(self):
+        responses.get(f'{CATALOG_URL}/services/1/', body=requests.ConnectTimeout())
+
+        with self.assertRaises(ExternalServiceError) as error:
+            self.client.get('/services/1/')
+        self.assertNotIsInstance(error.exception, CircuitOpenError)
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_headers_none_keeps_default_headers(self):
+        responses.get(f'{CATALOG_URL}/services/1/', json={})
+
+        self.client.get('/services/1/', headers=None)
+
+        self.assertEqual(responses.calls[0].request.headers['X-Internal-Token'], 'internal-token')
+
+    @responses.activate
+    def test_breaker_opens_half_opens_and_closes(self):
+        responses.post(f'{CATALOG_URL}/bookings/', status=503)
+        for _ in range(3):
+            with self.assertRaises(ExternalServiceError):
+                self.client.post('/bookings/')
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+
+        # Открытый breaker отклоняет вызов, не обращаясь к сервису
+        with self.assertRaises(CircuitOpenError):
+            self.client.post('/bookings/')
+        self.assertEqual(len(responses.calls), 3)
+
+        # После reset_timeout пропускается одна пробная попытка
+        self.client.breaker.opened_at -= self.client.breaker.reset_timeout
+        responses.replace(responses.POST, f'{CATALOG_URL}/bookings/', json={'ok': True})
+        response = self.client.post('/bookings/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_failed_probe_reopens_breaker(self):
+        responses.post(f'{CATALOG_URL}/bookings/', status=503)
+        for _ in range(3):
+            with self.assertRaises(ExternalServiceError):
+                self.client.post('/bookings/')
+
+        self.client.breaker.opened_at -= self.client.breaker.reset_timeout
+        with self.assertRaises(ExternalServiceError):
+            self.client.post('/bookings/')
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.client.post('/bookings/')
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_get_users_batch(self):
+        responses.post(f'{USERS_URL}/api/v1/users/internal/batch/', status=503)
+        responses.post(
+            f'{USERS_URL}/api/v1/users/internal/batch/',
+            json={'results': [{'uuid': 'a', 'full_name': 'A'}], 'missing': ['b']},
+        )
+
+        users = ExternalAPIClient.get_users(['a', 'b'], fields=['uuid', 'full_name'])
+
+        self.assertEqual(users, {'a': {'uuid': 'a', 'full_name': 'A'}})
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_get_users_always_requests_uuid(self):
+        responses.post(
+            f'{USERS_URL}/api/v1/users/internal/batch/',
+            json={'results': [{'uuid': 'a', 'full_name': 'A'}], 'missing': []},
+        )
+
+        users = ExternalAPIClient.get_users(['a'], fields=['full_name'])
+
+        self.assertEqual(users, {'a': {'uuid': 'a', 'full_name': 'A'}})
+        self.assertEqual(json.loads(responses.calls[0].request.body)['fields'], ['uuid', 'full_name'])
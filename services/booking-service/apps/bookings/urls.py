@@ -0,0 +1,10 @@
+from django.urls import path
+
+from bookings.views.booking_views import SlotHoldCreateView, SlotHoldDetailView, SlotHoldConfirmView, BusyRangesView
+
+urlpatterns = [
+    path('holds/', SlotHoldCreateView.as_view(), name='slot-hold-create'),
+    path('holds/<str:hold_id>/', SlotHoldDetailView.as_view(), name='slot-hold-detail'),
+    path('holds/<str:hold_id>/confirm/', SlotHoldConfirmView.as_view(), name='slot-hold-confirm'),
+    path('busy/', BusyRangesView.as_view(), name='busy-ranges'),
+]
@@ -0,0 +1,99 @@
+from uuid import UUID
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from bookings.serializers import (
+    BookingSerializer, HoldConfirmSerializer, SlotHoldCreateSerializer, SlotHoldSerializer,
+    BusyRangesQuerySerializer, BusyRangeSerializer
+)
+from bookings.services import BookingService, SlotValidationService
+
+
+def get_client_id(request) -> UUID:
+    """uuid клиента из access токена users-service (claim uuid)."""
+    client_id = getattr(request.user, 'uuid', None)
+    if not client_id:
+        raise PermissionDenied('В токене нет uuid пользователя')
+    return UUID(client_id)
+
+
+class SlotHoldCreateView(generics.GenericAPIView):
+    """
+    Удержание слота на время оформления записи.
+
+    POST /api/v1/bookings/holds/
+    Body: {
+        "provider_id": "uuid",
+        "service_id": "uuid",
+        "resource_id": "uuid",  # необязательно
+        "starts_at": "2026-10-20T10:00:00+03:00",
+        "ends_at": "2026-10-20T11:00:00+03:00"
+    }
+
+    Ответ 201: hold_id и expires_at. До expires_at время считается занятым;
+    запись создается POST /holds/{hold_id}/confirm/.
+    """
+    serializer_class = SlotHoldCreateSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        hold = BookingService.hold_slot(client_id=get_client_id(request), **serializer.validated_data)
+        return Response(SlotHoldSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+
+class SlotHoldDetailView(generics.GenericAPIView):
+    """
+    Удержание клиента.
+
+    GET    /api/v1/bookings/holds/{hold_id}/ - удержание и срок его действия
+    DELETE /api/v1/bookings/holds/{hold_id}/ - отменить, время освобождается
+    """
+    serializer_class = SlotHoldSerializer
+
+    def get(self, request, hold_id, *args, **kwargs):
+        hold = BookingService.get_hold(hold_id, get_client_id(request))
+        return Response(self.get_serializer(hold).data)
+
+    def delete(self, request, hold_id, *args, **kwargs):
+        BookingService.release_hold(hold_id, get_client_id(request))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SlotHoldConfirmView(generics.GenericAPIView):
+    """
+    Подтверждение удержания: создает запись.
+
+    POST /api/v1/bookings/holds/{hold_id}/confirm/
+    Body: {
+        "comment": "текст"  # необязательно
+    }
+
+    Ответ 201 - запись; 404 - удержание истекло; 409 - время занято.
+    """
+    serializer_class = HoldConfirmSerializer
+
+    def post(self, request, hold_id, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking = BookingService.confirm_hold(
+            hold_id, get_client_id(request), comment=serializer.validated_data['comment']
+        )
+        return Response(BookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+
+class BusyRangesView(generics.GenericAPIView):
+    """
+    Занятое время исполнителя: записи и живые удержания.
+
+    GET /api/v1/bookings/busy/?provider_id=uuid&start=...&end=...
+    """
+    serializer_class = BusyRangesQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        ranges = SlotValidationService.get_busy_ranges(**serializer.validated_data)
+        data = BusyRangeSerializer([{'starts_at': s, 'ends_at': e} for s, e in ranges], many=True).data
+        return Response(data)
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+# Приложения сервиса (apps/) и общий пакет common (services/) импортируются
+# без префикса. config импортируется первым из manage.py, wsgi, asgi и
+# celery -A config, поэтому пути добавляются здесь
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+for path in (SERVICE_DIR / 'apps', SERVICE_DIR.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from config.celery import app as celery_app
+
+__all__ = ("celery_app",)
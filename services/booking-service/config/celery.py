@@ -0,0 +1,12 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+app = Celery("booking_service")
+
+# Все настройки Celery берутся из Django settings с префиксом CELERY_
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+app.autodiscover_tasks()
@@ -0,0 +1,22 @@
+from datetime import date, datetime, time, timedelta
+from typing import Tuple
+from zoneinfo import ZoneInfo
+
+
+def day_bounds(day: date, tz_name: str) -> Tuple[datetime, datetime]:
+    """
+    Границы суток [начало, начало следующих суток) в часовом поясе tz_name.
+
+    Сутки берутся по местному времени исполнителя, поэтому в дни перехода
+    на летнее/зимнее время они длятся 23 или 25 часов.
+
+    Пример: day_bounds(date(2025, 3, 30), 'Europe/Berlin')
+    """
+    tz = ZoneInfo(tz_name)
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
+
+
+def is_aware(value: datetime) -> bool:
+    return value.tzinfo is not None and value.utcoffset() is not None
@@ -0,0 +1,76 @@
+"""
+Публикация событий booking-service в RabbitMQ.
+
+События уходят в topic exchange EVENTS_EXCHANGE, routing key - тип
+события (например slot.released). Формат тела тот же, что у событий
+users-service: event_id, event_type, aggregate_id, occurred_at, data.
+
+event_id детерминирован (например 'booking-expired:<uuid>'): повторная
+публикация того же события (ретрай задачи) дедуплицируется потребителем.
+
+Пример:
+    from utils.rabbitmq_publisher import make_event, publish_events
+
+    published = []
+    publish_events([make_event('slot.released', event_id, provider_id, data)], published)
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.utils import timezone
+from kombu import Connection, Exchange, pools
+
+
+def get_exchange() -> Exchange:
+    return Exchange(settings.EVENTS_EXCHANGE, type='topic', durable=True)
+
+
+@lru_cache(maxsize=1)
+def get_connection() -> Connection:
+    """
+    Соединение с RabbitMQ с publisher confirms (один пул на процесс).
+
+    С confirm_publish publish() возвращается только после подтверждения
+    брокером: событие в published_ids действительно принято.
+    """
+    return Connection(
+        settings.EVENTS_BROKER_URL,
+        transport_options={'confirm_publish': True},
+        connect_timeout=5,
+    )
+
+
+def make_event(event_type: str, event_id: str, aggregate_id: Any, data: Dict[str, Any],
+               occurred_at: Optional[datetime] = None) -> Dict[str, Any]:
+    return {
+        'event_id': event_id,
+        'event_type': event_type,
+        'aggregate_id': str(aggregate_id),
+        'occurred_at': (occurred_at or timezone.now()).isoformat(),
+        'data': data,
+    }
+
+
+def publish_events(events: Iterable[Dict[str, Any]], published_ids: List[str]) -> None:
+    """
+    Публикует события по порядку через пул producer-ов kombu.
+
+    event_id подтвержденных брокером событий добавляются в published_ids -
+    при ошибке посередине видно, что уже ушло.
+    """
+    exchange = get_exchange()
+    with pools.producers[get_connection()].acquire(block=True, timeout=10) as producer:
+        for event in events:
+            producer.publish(
+                event,
+                exchange=exchange,
+                declare=[exchange],
+                routing_key=event['event_type'],
+                serializer='json',
+                delivery_mode=2,
+                message_id=event['event_id'],
+                retry=True,
+                retry_policy={'max_retries': 3, 'interval_start': 0.5, 'interval_step': 1},
+            )
+            published_ids.append(event['event_id'])
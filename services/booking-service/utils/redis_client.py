@@ -0,0 +1,34 @@
+"""
+Клиент Redis booking-service.
+
+Один пул соединений на процесс; после fork (воркеры gunicorn/celery)
+redis-py сам открывает новые соединения.
+
+Пример:
+    from utils.redis_client import get_redis, redis_key
+
+    get_redis().set(redis_key('holds', hold_id), 1, px=30000)
+"""
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+KEY_PREFIX = 'booking-service:'
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30,
+        decode_responses=True,
+    )
+
+
+def redis_key(*parts) -> str:
+    """Ключ с префиксом сервиса: redis_key('lock', 'slot', 42) -> 'booking-service:lock:slot:42'."""
+    return KEY_PREFIX + ':'.join(str(part) for part in parts)
@@ -0,0 +1,118 @@
+"""
+Аутентификация по JWT users-service для остальных сервисов.
+
+Токены проверяются локально по публичным ключам из JWKS users-service
+(/.well-known/jwks.json). Набор ключей кэшируется в процессе, поэтому
+на запрос не нужен ни вызов users-service, ни запрос в БД.
+
+Подключение (settings.py сервиса, каталог services/ в PYTHONPATH):
+
+    USERS_JWKS_URL = 'http://users-service:8000/.well-known/jwks.json'
+    USERS_JWT_ISSUER = 'users-service'
+
+    REST_FRAMEWORK = {
+        'DEFAULT_AUTHENTICATION_CLASSES': [
+            'common.authentication.UsersServiceJWTAuthentication',
+        ],
+    }
+"""
+import logging
+from functools import lru_cache
+
+import jwt
+from django.conf import settings
+from rest_framework import authentication, exceptions
+
+logger = logging.getLogger(__name__)
+
+
+ALLOWED_ALGORITHMS = ['RS256', 'EdDSA']
+
+
+class TokenPrincipal:
+    """
+    Легковесный пользователь, построенный из claims токена.
+
+    Не связан с БД: атрибуты берутся из payload, выданного users-service.
+    """
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.id = payload.get('user_id')
+        self.pk = self.id
+        self.uuid = payload.get('uuid')
+        self.email = payload.get('email', '')
+        self.is_staff = payload.get('is_staff', False)
+        self.is_email_verified = payload.get('is_email_verified', False)
+
+    def __str__(self):
+        return f'TokenPrincipal {self.uuid}'
+
+    def __eq__(self, other):
+        return isinstance(other, TokenPrincipal) and self.uuid == other.uuid
+
+    def __hash__(self):
+        return hash(self.uuid)
+
+
+@lru_cache(maxsize=1)
+def get_jwks_client():
+    """
+    Клиент JWKS с кэшем набора ключей в процессе.
+
+    Набор ключей перечитывается раз в USERS_JWKS_LIFESPAN секунд или сразу,
+    если пришел токен с неизвестным kid (ротация ключа).
+    """
+    return jwt.PyJWKClient(
+        settings.USERS_JWKS_URL,
+        cache_jwk_set=True,
+        lifespan=getattr(settings, 'USERS_JWKS_LIFESPAN', 300),
+        timeout=getattr(settings, 'USERS_JWKS_TIMEOUT', 5),
+    )
+
+
+class UsersServiceJWTAuthentication(authentication.BaseAuthentication):
+    """
+    DRF аутентификация по access токену users-service.
+
+    Заголовок: Authorization: Bearer <token>
+    request.user - TokenPrincipal, request.auth - payload токена.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Некорректный заголовок Authorization')
+
+        payload = self.decode(header[1].decode())
+        if payload.get('token_type') != 'access':
+            raise exceptions.AuthenticationFailed('Ожидается access токен')
+
+        return TokenPrincipal(payload), payload
+
+    def decode(self, token):
+        try:
+            signing_key = get_jwks_client().get_signing_key_from_jwt(token)
+            return jwt.decode(
+                token,
+                signing_key.key,
+                algorithms=ALLOWED_ALGORITHMS,
+                issuer=getattr(settings, 'USERS_JWT_ISSUER', None),
+                leeway=getattr(settings, 'USERS_JWT_LEEWAY', 0),
+            )
+        except jwt.ExpiredSignatureError:
+            raise exceptions.AuthenticationFailed('Токен истек')
+        except jwt.PyJWKClientError as e:
+            logger.warning(f'Не удалось получить ключ проверки токена: {e}')
+            raise exceptions.AuthenticationFailed('Токен невалиден')
+        except jwt.InvalidTokenError:
+            raise exceptions.AuthenticationFailed('Токен невалиден')
+
+    def authenticate_header(self, request):
+        return self.keyword
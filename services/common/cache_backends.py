@@ -0,0 +1,44 @@
+"""
+Cache backends с учетом попаданий и промахов в метриках запроса.
+
+Пример (settings.py):
+    CACHES = {
+        'default': {
+            'BACKEND': 'common.cache_backends.InstrumentedRedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+"""
+from django.core.cache.backends.locmem import LocMemCache
+from django_redis.cache import RedisCache
+
+from common.metrics import record_cache_access
+
+
+_MISSING = object()
+
+
+class CacheMetricsMixin:
+    """Считает попадания/промахи get и get_many."""
+
+    def get(self, key, default=None, version=None, **kwargs):
+        value = super().get(key, _MISSING, version=version, **kwargs)
+        if value is _MISSING:
+            record_cache_access(hits=0, misses=1)
+            return default
+        record_cache_access(hits=1, misses=0)
+        return value
+
+    def get_many(self, keys, version=None, **kwargs):
+        keys = list(keys)
+        values = super().get_many(keys, version=version, **kwargs)
+        record_cache_access(hits=len(values), misses=len(keys) - len(values))
+        return values
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(CacheMetricsMixin, RedisCache):
+    pass
@@ -0,0 +1,285 @@
+"""
+Метрики производительности запросов в формате Prometheus.
+
+Для каждого view собираются: время ответа, количество и время SQL
+запросов, попадания/промахи кэша и время исходящих HTTP запросов.
+Метрики отдаются текстом Prometheus на /metrics.
+
+Подключение (settings.py сервиса, каталог services/ в PYTHONPATH):
+
+    MIDDLEWARE = [
+        'common.metrics.PerformanceMetricsMiddleware',
+        ...
+    ]
+
+    # Попадания/промахи кэша считает backend с CacheMetricsMixin
+    CACHES = {'default': {'BACKEND': 'common.cache_backends.InstrumentedRedisCache', ...}}
+
+    # urls.py
+    path('metrics', metrics_view, name='metrics')
+
+Исходящие HTTP запросы учитываются, если они идут через
+InstrumentedSession.
+
+Под gunicorn с несколькими воркерами каждый процесс пишет значения в
+файлы каталога PROMETHEUS_MULTIPROC_DIR, а /metrics суммирует их по
+всем воркерам (см. config/gunicorn.conf.py).
+"""
+import contextvars
+import glob
+import hmac
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки запроса',
+    ['view', 'method', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Количество SQL запросов на запрос',
+    ['view'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'http_request_db_duration_seconds',
+    'Суммарное время SQL запросов на запрос',
+    ['view'],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'http_request_cache_requests_total',
+    'Обращения к кэшу при обработке запросов',
+    ['view', 'result'],
+)
+OUTBOUND_DURATION = Histogram(
+    'http_request_outbound_duration_seconds',
+    'Суммарное время исходящих HTTP запросов на запрос',
+    ['view'],
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_REQUESTS = Counter(
+    'http_request_outbound_requests_total',
+    'Исходящие HTTP запросы при обработке запросов',
+    ['view'],
+)
+
+
+@dataclass
+class RequestStats:
+    """Счетчики одного входящего запроса."""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    outbound_requests: int = 0
+    outbound_seconds: float = 0.0
+
+
+_current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Счетчики текущего запроса или None вне запроса (celery, shell)."""
+    return _current_stats.get()
+
+
+def record_cache_access(hits: int, misses: int) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+def record_outbound_request(seconds: float) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.outbound_requests += 1
+        stats.outbound_seconds += seconds
+
+
+class InstrumentedSession(requests.Session):
+    """
+    requests.Session, учитывающий время исходящих запросов в метриках view.
+
+    Пример:
+        session = InstrumentedSession()
+        session.get('http://catalog-service:8000/api/v1/items/')
+    """
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            record_outbound_request(time.perf_counter() - started)
+
+
+def track_query(execute, sql, params, many, context):
+    """execute_wrapper: учитывает SQL запрос в счетчиках текущего запроса."""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def install_query_tracker(sender=None, connection=None, **kwargs):
+    """
+    Подключает track_query к соединению с БД (один раз).
+
+    Обертка стоит на соединении постоянно и берет счетчики из contextvar,
+    поэтому учитывает и запросы async views, которые ORM выполняет в
+    потоке sync_to_async. Вставляется в начало списка: execute_wrapper()
+    снимает обертки с конца.
+    """
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, track_query)
+
+
+connection_created.connect(install_query_tracker, dispatch_uid='common.metrics.install_query_tracker')
+
+
+def get_view_label(request) -> str:
+    """
+    Имя view для метки: имя url или путь к функции view.
+
+    Сам путь запроса в метку не попадает - иначе каждый /users/<id>/
+    порождал бы свою серию.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name or match._func_path
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Собирает метрики производительности каждого запроса.
+
+    Должен стоять первым в MIDDLEWARE, чтобы время ответа включало
+    остальные middleware. Работает и в sync (WSGI), и в async (ASGI)
+    цепочке без переключения потоков.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        for connection in connections.all(initialized_only=True):
+            install_query_tracker(connection=connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def observe(self, request, response, stats: RequestStats, duration: float) -> None:
+        view = get_view_label(request)
+        REQUEST_DURATION.labels(view, request.method, str(response.status_code)).observe(duration)
+        DB_QUERIES.labels(view).observe(stats.db_queries)
+        DB_DURATION.labels(view).observe(stats.db_seconds)
+        if stats.cache_hits:
+            CACHE_REQUESTS.labels(view, 'hit').inc(stats.cache_hits)
+        if stats.cache_misses:
+            CACHE_REQUESTS.labels(view, 'miss').inc(stats.cache_misses)
+        if stats.outbound_requests:
+            OUTBOUND_REQUESTS.labels(view).inc(stats.outbound_requests)
+            OUTBOUND_DURATION.labels(view).observe(stats.outbound_seconds)
+
+
+def get_registry():
+    """
+    Реестр для выдачи метрик.
+
+    В multiprocess режиме (задан PROMETHEUS_MULTIPROC_DIR) значения
+    собираются из файлов всех воркеров, иначе - из памяти процесса.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    Если задан settings.METRICS_TOKEN, требуется заголовок
+    Authorization: Bearer <token>.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(header, f'Bearer {token}'):
+            return HttpResponseForbidden()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def clear_multiprocess_dir() -> None:
+    """Удаляет файлы метрик прошлых запусков (при старте gunicorn)."""
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, '*.db')):
+        os.remove(filename)
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Освобождает файлы метрик завершившегося воркера gunicorn."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
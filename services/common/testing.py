@@ -0,0 +1,83 @@
+"""
+Помощники для тестов: бюджет SQL запросов на endpoint.
+
+Ловят N+1 регрессии вроде пропавшего select_related('profile'):
+при превышении бюджета тест падает со списком выполненных запросов,
+повторяющиеся запросы перечислены отдельно.
+
+Пример:
+    from common.testing import assert_max_queries, assert_endpoint_queries
+
+    def test_user_list(api_client):
+        with assert_max_queries(3):
+            api_client.get('/api/v1/users/')
+
+    def test_query_budgets(api_client):
+        assert_endpoint_queries(api_client, [
+            ('get', '/api/v1/users/me/', 2),
+            ('get', '/api/v1/users/', 3),
+        ])
+"""
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Iterable, List, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+_LITERALS_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL без литералов: запросы N+1 отличаются только параметрами."""
+    return _LITERALS_RE.sub('?', sql)
+
+
+def format_queries(queries: List[str]) -> str:
+    lines = [f'{number}. {sql}' for number, sql in enumerate(queries, start=1)]
+    repeated = [
+        (count, sql) for sql, count in Counter(normalize_sql(sql) for sql in queries).most_common()
+        if count > 1
+    ]
+    if repeated:
+        lines.append('Повторяющиеся запросы (возможен N+1):')
+        lines.extend(f'  x{count}: {sql}' for count, sql in repeated)
+    return '\n'.join(lines)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, using=DEFAULT_DB_ALIAS, label: str = ''):
+    """
+    Проверяет, что в блоке выполнено не больше max_queries SQL запросов.
+
+    using - алиас БД или список алиасов (например, ['default', 'replica']),
+    запросы по всем алиасам суммируются.
+    """
+    aliases = [using] if isinstance(using, str) else list(using)
+    with ExitStack() as stack:
+        contexts = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in aliases]
+        yield contexts[0] if len(contexts) == 1 else contexts
+
+    queries = [query['sql'] for context in contexts for query in context.captured_queries]
+    if len(queries) > max_queries:
+        prefix = f'{label}: ' if label else ''
+        raise AssertionError(
+            f'{prefix}выполнено {len(queries)} SQL запросов, допустимо {max_queries}\n'
+            f'{format_queries(queries)}'
+        )
+
+
+def assert_endpoint_queries(client, budgets: Iterable[Tuple[str, str, int]], using=DEFAULT_DB_ALIAS) -> None:
+    """
+    Проверяет бюджеты запросов для списка endpoint-ов.
+
+    budgets - кортежи (метод, путь, максимум запросов); client - тестовый
+    клиент Django или DRF APIClient с нужной аутентификацией.
+    """
+    for method, path, max_queries in budgets:
+        with assert_max_queries(max_queries, using=using, label=f'{method.upper()} {path}'):
+            response = getattr(client, method.lower())(path)
+        if response.status_code >= 400:
+            raise AssertionError(f'{method.upper()} {path}: ответ {response.status_code}')
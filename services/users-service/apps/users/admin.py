@@ -1,8 +1,53 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.db.models.functions import Now
 from django.utils.html import format_html
+from django.utils.text import smart_split, unescape_string_literal
 
-from users.models import User, UserProfile, EmailVerificationToken, PasswordResetToken
+from users.models import (
+    User, UserProfile, EmailVerificationToken, PasswordResetToken, OutboxEvent, UserErasureJob
+)
+from users.services.erasure_service import UserErasureService
+from users.utils.admin_paginator import EstimatedCountPaginator
+
+
+class FastChangelistMixin:
+    """
+    Настройки changelist для больших таблиц.
+
+    Количество строк оценивается по статистике PostgreSQL вместо COUNT(*),
+    а второй COUNT по всей таблице на отфильтрованных страницах не делается.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class TokenAdminMixin(FastChangelistMixin):
+    """
+    Общее для админок токенов.
+
+    Пользователь подгружается JOIN-ом (для __str__ и колонки user),
+    истечение считается в БД, выбор пользователя - через autocomplete.
+    """
+    list_display = ['user', 'token', 'is_used', 'is_expired', 'created_at', 'expires_at']
+    list_filter = ['is_used', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['user__email', 'token']
+    readonly_fields = ['token', 'created_at']
+    autocomplete_fields = ['user']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            expired=ExpressionWrapper(Q(expires_at__lt=Now()), output_field=BooleanField())
+        )
+
+    def is_expired(self, obj):
+        """Показывает истек ли токен."""
+        return obj.expired
+    is_expired.boolean = True
+    is_expired.short_description = 'Истек'
+    is_expired.admin_order_field = 'expires_at'
 
 
 class UserProfileInline(admin.StackedInline):
@@ -18,7 +63,7 @@ class UserProfileInline(admin.StackedInline):
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(FastChangelistMixin, BaseUserAdmin):
     """
     Админка для модели User.
 
@@ -38,10 +83,11 @@ class UserAdmin(BaseUserAdmin):
         (None, {'fields': ('email', 'password')}),
         ('Личная информация', {'fields': ('first_name', 'last_name', 'phone')}),
         ('Права доступа', {'fields': ('is_active', 'is_staff', 'is_superuser', 'is_email_verified')}),
-        ('Важные даты', {'fields': ('last_login', 'last_login_at', 'created_at', 'updated_at')}),
+        ('Важные даты', {'fields': ('last_login', 'last_login_at_display', 'created_at', 'updated_at')}),
     )
 
-    readonly_fields = ['created_at', 'updated_at', 'last_login', 'last_login_at', 'uuid']
+    readonly_fields = ['created_at', 'updated_at', 'last_login', 'last_login_at_display', 'uuid']
+    actions = ['anonymize_in_background', 'delete_in_background']
 
     add_fieldsets = (
         (None, {
@@ -50,41 +96,118 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    def last_login_at_display(self, obj):
+        """Время последнего входа с учетом буфера write-behind."""
+        return obj.fresh_last_login_at
+    last_login_at_display.short_description = 'Последний вход'
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищем через индексированный UserQuerySet.search вместо
+        стандартной цепочки icontains по search_fields: как и в админке,
+        каждое слово (фраза в кавычках) должно найтись в одном из полей.
+        """
+        terms = [unescape_string_literal(bit) if bit[0] in '"\'' and bit[-1] == bit[0] else bit
+                 for bit in smart_split(search_term)]
+        if not terms:
+            return queryset, False
+        return queryset.search(*terms), False
+
+    @admin.action(description='Анонимизировать в фоне', permissions=['delete'])
+    def anonymize_in_background(self, request, queryset):
+        self.create_erasure_job(request, queryset, UserErasureJob.MODE_ANONYMIZE)
+
+    @admin.action(description='Удалить в фоне', permissions=['delete'])
+    def delete_in_background(self, request, queryset):
+        self.create_erasure_job(request, queryset, UserErasureJob.MODE_DELETE)
+
+    def create_erasure_job(self, request, queryset, mode):
+        """
+        Вместо стандартного delete_selected (каскад одной транзакцией)
+        создает задачу, которая обрабатывает пользователей пачками.
+        """
+        try:
+            job = UserErasureService.create_job(
+                queryset.values_list('pk', flat=True), mode, requested_by=request.user, reason='admin'
+            )
+        except ValueError as e:
+            self.message_user(request, str(e), messages.WARNING)
+            return
+        self.message_user(
+            request,
+            f'Создана задача #{job.pk} ({job.get_mode_display().lower()}, пользователей: {job.total})',
+            messages.SUCCESS,
+        )
+
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(FastChangelistMixin, admin.ModelAdmin):
     """Админка для профилей пользователей."""
     list_display = ['user', 'country', 'city', 'language', 'created_at']
     list_filter = ['language', 'country']
+    list_select_related = ['user']
     search_fields = ['user__email', 'city', 'country']
     readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['user']
 
 
 @admin.register(EmailVerificationToken)
-class EmailVerificationTokenAdmin(admin.ModelAdmin):
+class EmailVerificationTokenAdmin(TokenAdminMixin, admin.ModelAdmin):
     """Админка для токенов верификации email."""
-    list_display = ['user', 'token', 'is_used', 'is_expired', 'created_at', 'expires_at']
-    list_filter = ['is_used', 'created_at']
-    search_fields = ['user__email', 'token']
-    readonly_fields = ['token', 'created_at']
-
-    def is_expired(self, obj):
-        """Показывает истек ли токен."""
-        return obj.is_expired
-    is_expired.boolean = True
-    is_expired.short_description = 'Истек'
 
 
 @admin.register(PasswordResetToken)
-class PasswordResetTokenAdmin(admin.ModelAdmin):
+class PasswordResetTokenAdmin(TokenAdminMixin, admin.ModelAdmin):
     """Админка для токенов сброса пароля."""
-    list_display = ['user', 'token', 'is_used', 'is_expired', 'created_at', 'expires_at']
-    list_filter = ['is_used', 'created_at']
-    search_fields = ['user__email', 'token']
-    readonly_fields = ['token', 'created_at']
 
-    def is_expired(self, obj):
-        """Показывает истек ли токен."""
-        return obj.is_expired
-    is_expired.boolean = True
-    is_expired.short_description = 'Истек'
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(FastChangelistMixin, admin.ModelAdmin):
+    """Админка для событий outbox (только просмотр)."""
+    list_display = ['id', 'event_type', 'aggregate_id', 'created_at', 'published_at']
+    list_filter = ['event_type']
+    search_fields = ['=aggregate_id']
+    readonly_fields = ['aggregate_id', 'event_type', 'payload', 'created_at', 'published_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(UserErasureJob)
+class UserErasureJobAdmin(FastChangelistMixin, admin.ModelAdmin):
+    """Админка для задач удаления пользователей (просмотр, отмена, возобновление)."""
+    list_display = [
+        'id', 'mode', 'status', 'progress_display', 'total', 'deactivated', 'processed',
+        'requested_by', 'created_at', 'finished_at'
+    ]
+    list_filter = ['status', 'mode']
+    list_select_related = ['requested_by']
+    readonly_fields = [
+        'mode', 'status', 'reason', 'requested_by', 'total', 'deactivated', 'processed',
+        'progress_display', 'error_count', 'last_error', 'created_at', 'started_at',
+        'finished_at', 'heartbeat_at'
+    ]
+    actions = ['cancel_jobs', 'resume_jobs']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def progress_display(self, obj):
+        return f'{obj.progress:.0%}'
+    progress_display.short_description = 'Прогресс'
+
+    @admin.action(description='Отменить')
+    def cancel_jobs(self, request, queryset):
+        cancelled = sum(UserErasureService.cancel(job) for job in queryset)
+        self.message_user(request, f'Отменено задач: {cancelled}')
+
+    @admin.action(description='Возобновить после ошибки')
+    def resume_jobs(self, request, queryset):
+        resumed = sum(UserErasureService.resume(job) for job in queryset)
+        self.message_user(request, f'Возобновлено задач: {resumed}')
@@ -0,0 +1,267 @@
+"""
+Async реализации горячих endpoint-ов для запуска под ASGI.
+
+DRF 3.14 выполняет views только синхронно: под ASGI каждый запрос к
+DRF view - это переход из event loop в поток и обратно. Здесь те же
+endpoint-ы на async views Django: async ORM и async API кэша, без DRF
+стека. URL, формат ответов и ошибок совпадают с sync версиями.
+
+Включаются настройкой USERS_ASYNC_VIEWS=True (см. users.api.urls и
+профиль запуска в config/asgi.py).
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from config.db_router import allow_replica_reads
+from users.api.mixins import ConditionalGetMixin
+from users.api.permissions import IsInternalService
+from users.api.renderers import MessagePackRenderer
+from users.api.serializers import (
+    UserSerializer, EmailVerificationSerializer, UserBatchLookupSerializer,
+    UserTokenRefreshSerializer, awith_fresh_last_login
+)
+from users.api.views import UserViewSet
+from users.services import UserService, UserCacheService
+
+
+User = get_user_model()
+
+
+class AsyncAPIView(View):
+    """
+    Базовый async view: аутентификация по JWT, permissions, JSON.
+
+    Ошибки - исключения DRF (ValidationError, AuthenticationFailed, ...),
+    ответ с ними в том же формате, что у users.api.exceptions.custom_exception_handler.
+
+    authentication_required - нужен access токен (как IsAuthenticated)
+    permission_classes - permissions DRF, проверяются по has_permission
+    replica_reads - чтения запроса (включая загрузку пользователя) из реплики
+    sync_methods/sync_view - методы, которые обслуживает sync view
+    """
+    authentication_required = True
+    permission_classes = ()
+    renderer_classes = (JSONRenderer,)
+    replica_reads = False
+    sync_methods = ()
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Как и DRF APIView: аутентификация по токену, CSRF не нужен
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method in self.sync_methods:
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+        try:
+            if self.replica_reads and request.method in ('GET', 'HEAD'):
+                allow_replica_reads()
+            if self.authentication_required:
+                request.user = await self.authenticate(request)
+            self.check_permissions(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+
+    async def authenticate(self, request):
+        """Проверяет access токен и загружает пользователя через async ORM."""
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+        if raw_token is None:
+            raise exceptions.NotAuthenticated()
+
+        # Подпись проверяется локально (ключи в памяти процесса) - без I/O
+        token = authentication.get_validated_token(raw_token)
+        try:
+            user_id = token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит идентификатор пользователя')
+
+        user = await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None:
+            raise exceptions.AuthenticationFailed('Пользователь не найден', code='user_not_found')
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed('Пользователь неактивен', code='user_inactive')
+        if jwt_settings.CHECK_REVOKE_TOKEN and (
+            token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise exceptions.AuthenticationFailed('Пароль пользователя изменен', code='password_changed')
+        return user
+
+    def check_permissions(self, request):
+        for permission_class in self.permission_classes:
+            permission = permission_class()
+            if not permission.has_permission(request, self):
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def parse_body(self, request):
+        if not request.body:
+            return {}
+        if request.content_type != 'application/json':
+            raise exceptions.UnsupportedMediaType(request.content_type)
+        try:
+            return json.loads(request.body)
+        except ValueError as e:
+            raise exceptions.ParseError(f'JSON parse error - {e}')
+
+    def get_renderer(self, request):
+        """Выбор формата по ?format= или Accept (первый renderer - по умолчанию)."""
+        requested_format = request.GET.get('format')
+        accept = request.headers.get('Accept', '')
+        for renderer_class in self.renderer_classes:
+            if requested_format == renderer_class.format or renderer_class.media_type in accept:
+                return renderer_class()
+        return self.renderer_classes[0]()
+
+    def render(self, request, data, status_code=status.HTTP_200_OK):
+        renderer = self.get_renderer(request)
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        return HttpResponse(renderer.render(data), status=status_code, content_type=content_type)
+
+    def handle_exception(self, request, exc):
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        data = {
+            'error': {
+                'message': str(exc),
+                'code': getattr(exc, 'default_code', 'error'),
+                'details': detail if isinstance(detail, dict) else {'detail': detail},
+            }
+        }
+        response = HttpResponse(
+            JSONRenderer().render(data),
+            status=exc.status_code,
+            content_type='application/json',
+        )
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+        return response
+
+
+class AsyncMeView(ConditionalGetMixin, AsyncAPIView):
+    """
+    Async GET /api/v1/users/me/.
+
+    Conditional GET (304 по ETag/Last-Modified) и read-through кэш как в
+    UserViewSet.me. PATCH обслуживает sync UserViewSet.me.
+    """
+    replica_reads = True
+    sync_methods = ('PATCH',)
+    sync_view = staticmethod(UserViewSet.as_view({'get': 'me', 'patch': 'me'}))
+
+    async def get(self, request):
+        user_id = request.user.pk
+        not_modified, state = await self.acheck_not_modified(request, user_id)
+        if not_modified is not None:
+            return not_modified
+
+        data = await UserCacheService.aget_or_set(user_id, lambda: self.serialize_user(user_id))
+        data = await awith_fresh_last_login(data, user_id)
+        return self.set_validators(self.render(request, data), state)
+
+    async def serialize_user(self, user_id):
+        try:
+            user = await User.objects.select_related('profile').aget(pk=user_id)
+        except User.DoesNotExist:
+            # Пользователя удалили после аутентификации (или реплика отстает)
+            raise exceptions.NotFound('Пользователь не найден')
+        # last_login_at читает буфер входов синхронным клиентом Redis
+        return await sync_to_async(lambda: UserSerializer(user).data)()
+
+
+class AsyncEmailVerificationView(AsyncAPIView):
+    """
+    Async POST /api/v1/users/verify-email/.
+
+    Body: {"token": "uuid-token"}
+    """
+    authentication_required = False
+
+    async def post(self, request):
+        serializer = EmailVerificationSerializer(data=self.parse_body(request))
+        serializer.is_valid(raise_exception=True)
+        try:
+            user = await UserService.averify_email(str(serializer.validated_data['token']))
+        except ValueError as e:
+            raise exceptions.ValidationError({'token': [str(e)]})
+
+        user = await User.objects.select_related('profile').aget(pk=user.pk)
+        data = await sync_to_async(lambda: UserSerializer(user).data)()
+        return self.render(request, {'detail': 'Email успешно подтвержден', 'user': data})
+
+
+class AsyncTokenRefreshView(AsyncAPIView):
+    """
+    Async POST /api/v1/users/token/refresh/.
+
+    Body: {"refresh": "<refresh token>"}
+
+    С ротацией refresh токенов или blacklist (нужны записи в БД) запрос
+    обслуживает sync TokenRefreshView.
+    """
+    authentication_required = False
+    sync_view = staticmethod(TokenRefreshView.as_view())
+
+    @staticmethod
+    def requires_sync() -> bool:
+        return jwt_settings.ROTATE_REFRESH_TOKENS or (
+            'rest_framework_simplejwt.token_blacklist' in settings.INSTALLED_APPS
+        )
+
+    async def post(self, request):
+        if self.requires_sync():
+            return await sync_to_async(self.sync_view)(request)
+
+        raw_token = self.parse_body(request).get('refresh')
+        if not raw_token or not isinstance(raw_token, str):
+            raise exceptions.ValidationError({'refresh': ['Обязательное поле.']})
+        try:
+            refresh = UserTokenRefreshSerializer.token_class(raw_token)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        if user_id:
+            user = await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).afirst()
+            if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+                raise exceptions.AuthenticationFailed(
+                    'Не найдено активной учетной записи для этого токена', code='no_active_account'
+                )
+        return self.render(request, {'access': str(refresh.access_token)})
+
+
+class AsyncInternalUserBatchView(AsyncAPIView):
+    """
+    Async POST /api/v1/users/internal/batch/ (см. InternalUserBatchView).
+
+    Headers: X-Internal-Token: <INTERNAL_API_TOKEN>
+             Accept: application/json | application/msgpack
+    """
+    authentication_required = False
+    permission_classes = (IsInternalService,)
+    renderer_classes = (JSONRenderer, MessagePackRenderer)
+
+    async def post(self, request):
+        serializer = UserBatchLookupSerializer(data=self.parse_body(request))
+        serializer.is_valid(raise_exception=True)
+
+        data = await UserService.alookup_batch(
+            serializer.validated_data['uuids'], fields=serializer.validated_data.get('fields')
+        )
+        return self.render(request, data)
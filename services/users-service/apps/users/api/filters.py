@@ -0,0 +1,21 @@
+from rest_framework.filters import SearchFilter
+
+
+class UserSearchFilter(SearchFilter):
+    """
+    Поиск пользователей через индексированный UserQuerySet.ranked_search.
+
+    В отличие от стандартного SearchFilter не строит цепочку icontains по
+    search_fields, а отдает ранжированный queryset, упорядоченный по
+    (-search_rank, -id), который затем режется UserSearchPagination.
+
+    Каждое слово запроса должно найтись в одном из полей.
+
+    GET /api/v1/users/?search=ivan petrov
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return queryset.ranked_search(*terms)
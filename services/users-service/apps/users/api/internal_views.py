@@ -0,0 +1,40 @@
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.api.permissions import IsInternalService
+from users.api.renderers import MessagePackRenderer
+from users.api.serializers import UserBatchLookupSerializer
+from users.services import UserService
+
+
+class InternalUserBatchView(APIView):
+    """
+    Пакетное получение пользователей по uuid для других сервисов.
+
+    POST /api/v1/users/internal/batch/
+    Headers: X-Internal-Token: <INTERNAL_API_TOKEN>
+             Accept: application/json | application/msgpack
+    Body: {
+        "uuids": ["uuid-1", "uuid-2", ...],
+        "fields": ["full_name", "email"]
+    }
+
+    uuid есть в каждой строке results, даже если не указан в fields.
+
+    Один запрос в БД на весь список: booking-service рендерит агенду
+    из 200 записей одним вызовом вместо 200.
+    """
+    authentication_classes = []
+    permission_classes = [IsInternalService]
+    renderer_classes = [JSONRenderer, MessagePackRenderer]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = UserBatchLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = UserService.lookup_batch(
+            serializer.validated_data['uuids'], fields=serializer.validated_data.get('fields')
+        )
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,74 @@
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS
+
+from config.db_router import allow_replica_reads
+from users.services import UserService
+
+
+class ReplicaReadMixin:
+    """
+    Mixin для ViewSet: читающие actions обслуживаются из реплики БД.
+
+    Пример:
+        class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+            replica_read_actions = ('list', 'retrieve')
+    """
+    replica_read_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        # Выставляем до аутентификации, чтобы и загрузка пользователя
+        # по токену шла в реплику
+        if request.method in SAFE_METHODS and self.action in self.replica_read_actions:
+            allow_replica_reads()
+        super().initial(request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin для conditional GET данных пользователя (ETag/Last-Modified).
+
+    Валидаторы считаются по временным меткам (UserService.get_resource_state),
+    поэтому на If-None-Match/If-Modified-Since ответ 304 отдается без
+    загрузки модели и сериализации.
+
+    Пример:
+        not_modified, state = self.check_not_modified(request, user_id)
+        if not_modified:
+            return not_modified
+        response = Response(data)
+        return self.set_validators(response, state)
+    """
+
+    def check_not_modified(self, request, user_id):
+        """Возвращает (ответ 304 или None, состояние для заголовков)."""
+        state = UserService.get_resource_state(user_id)
+        return self.get_not_modified_response(request, state), state
+
+    async def acheck_not_modified(self, request, user_id):
+        """Async версия check_not_modified (для async views)."""
+        state = await UserService.aget_resource_state(user_id)
+        return self.get_not_modified_response(request, state), state
+
+    def get_not_modified_response(self, request, state):
+        if state is None:
+            return None
+        etag, last_modified = state
+        not_modified = get_conditional_response(
+            request,
+            etag=quote_etag(etag),
+            last_modified=int(last_modified.timestamp()),
+        )
+        if not_modified is not None:
+            self.set_validators(not_modified, state)
+        return not_modified
+
+    def set_validators(self, response, state):
+        if state is not None:
+            etag, last_modified = state
+            response['ETag'] = quote_etag(etag)
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Ответ зависит от пользователя: только приватный кэш с ревалидацией
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
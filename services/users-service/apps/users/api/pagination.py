@@ -0,0 +1,125 @@
+import base64
+import json
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class UserSearchPagination(BasePagination):
+    """
+    Keyset пагинация для результатов поиска пользователей.
+
+    Ожидает queryset, упорядоченный по (-search_rank, -id)
+    (см. UserQuerySet.ranked_search). Курсор хранит (rank, id) последней
+    строки страницы, поэтому следующая страница - это
+    WHERE (rank, id) < (cursor) без OFFSET: глубокие страницы стоят
+    столько же, сколько первая.
+
+    GET /api/v1/users/?search=ivan&cursor=<token>
+    """
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Некорректный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = self.filter_after_cursor(queryset, cursor)
+
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def filter_after_cursor(self, queryset, cursor):
+        """Строки строго после курсора в порядке (-search_rank, -id)."""
+        rank, last_id = cursor
+        return queryset.filter(Q(search_rank__lt=rank) | Q(search_rank=rank, id__lt=last_id))
+
+    def parse_cursor(self, values):
+        rank, last_id = values
+        return float(rank), int(last_id)
+
+    def cursor_values(self, item):
+        return [item.search_rank, item.id]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return self.parse_cursor(json.loads(base64.urlsafe_b64decode(encoded.encode()).decode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, item):
+        raw = json.dumps(self.cursor_values(item))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class UserCursorPagination(UserSearchPagination):
+    """
+    Keyset пагинация списка пользователей по (created_at, id).
+
+    Ожидает queryset, упорядоченный по (-created_at, -id). Следующая
+    страница - WHERE (created_at, id) < (cursor), что ложится на индекс
+    по created_at: глубокие страницы стоят столько же, сколько первая.
+
+    GET /api/v1/users/?cursor=<token>&page_size=50
+    """
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return super().paginate_queryset(queryset.order_by(*self.ordering), request, view)
+
+    def filter_after_cursor(self, queryset, cursor):
+        created_at, last_id = cursor
+        return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id))
+
+    def parse_cursor(self, values):
+        created_at, last_id = values
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError('Некорректная дата в курсоре')
+        return created_at, int(last_id)
+
+    def cursor_values(self, item):
+        return [item.created_at.isoformat(), item.id]
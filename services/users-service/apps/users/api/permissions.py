@@ -1,3 +1,5 @@
+import hmac
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -57,3 +59,23 @@ class IsNotAuthenticated(permissions.BasePermission):
         """Проверяет что пользовател не авторизован."""
         return not (request.user and request.user.is_authenticated)
 
+
+
+class IsInternalService(permissions.BasePermission):
+    """
+    Permission: доступ только для других сервисов по общему токену.
+
+    Сервис передает заголовок X-Internal-Token со значением INTERNAL_API_TOKEN.
+
+    Пример:
+        class InternalUserBatchView(APIView):
+            permission_classes = [IsInternalService]
+    """
+    
+    message = 'Доступ только для внутренних сервисов'
+    
+    def has_permission(self, request, view):
+        """Сравнивает токен из заголовка с INTERNAL_API_TOKEN."""
+        expected = getattr(settings, 'INTERNAL_API_TOKEN', '')
+        provided = request.headers.get('X-Internal-Token', '')
+        return bool(expected) and hmac.compare_digest(provided, expected)
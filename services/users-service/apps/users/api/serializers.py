@@ -1,30 +1,108 @@
 from rest_framework import serializers
+from django.conf import settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth.password_validation import validate_password
 
-from users.models import User, UserProfile
+from users.models import User, UserProfile, UserErasureJob
 from users.services import UserService
+from users.services.user_service import COMPACT_USER_FIELDS
 from users.utils.validators import validate_phone_number
+from users.utils.last_login_buffer import (
+    get_buffered_login, aget_buffered_login, get_buffered_logins, latest_login
+)
+from users.utils.avatars import thumbnail_urls
+from users.api.tokens import KeyRingRefreshToken
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer для профиля пользователя."""
     age = serializers.CharField(read_only=True)
+    # {размер: URL} миниатюр; пусто, пока аватар обрабатывается
+    avatar_urls = serializers.SerializerMethodField()
     
     class Meta:
         model = UserProfile
         fields = [
-            'avatar', 'bio', 'birth_date', 'age', 'country', 'city',
+            'avatar', 'avatar_urls', 'bio', 'birth_date', 'age', 'country', 'city',
             'address', 'language', 'timezone'
         ]
 
-class UserSerializer(serializers.ModelSerializer):
+    def get_avatar_urls(self, profile):
+        return thumbnail_urls(profile.avatar_thumbnails)
+
+class SparseFieldsetMixin:
+    """
+    Mixin для отдачи только запрошенных полей (sparse fieldsets).
+
+    Поля берутся из context:
+    - fields - набор полей верхнего уровня (None - все поля)
+    - expand - набор раскрываемых вложенных полей из expandable_fields
+      (None - раскрываются все, как раньше)
+
+    Пример:
+        UserSerializer(users, many=True, context={'fields': {'id', 'email'}, 'expand': set()})
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        expand = self.context.get('expand')
+        for name in list(self.fields):
+            if name in self.expandable_fields:
+                keep = expand is None or name in expand
+            else:
+                keep = not fields or name in fields
+            if not keep:
+                self.fields.pop(name)
+
+
+class LastLoginField(serializers.DateTimeField):
+    """
+    Время последнего входа с учетом буфера write-behind.
+
+    Если в context есть buffered_logins (заполняет UserListSerializer для
+    всей страницы), Redis не вызывается; иначе - User.fresh_last_login_at.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        buffered = self.context.get('buffered_logins')
+        if buffered is None:
+            return instance.fresh_last_login_at
+        return latest_login(instance.last_login_at, buffered.get(str(instance.pk)))
+
+
+class UserListSerializer(serializers.ListSerializer):
+    """Список пользователей: буфер входов читается одним запросом на страницу."""
+
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, 'all') else data)
+        if settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False) and 'last_login_at' in self.child.fields:
+            self.context['buffered_logins'] = get_buffered_logins(user.pk for user in users)
+        return super().to_representation(users)
+
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer для чтения информации о пользователе."""
+    expandable_fields = ('profile',)
+    # Колонки модели, нужные вычисляемым полям (для QuerySet.only)
+    field_sources = {
+        'full_name': ('first_name', 'last_name', 'email'),
+        'is_profile_complete': ('first_name', 'last_name', 'phone', 'is_email_verified'),
+    }
+
     profile = UserProfileSerializer(read_only=True)
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     is_profile_complete = serializers.BooleanField(read_only=True)
+    last_login_at = LastLoginField()
     
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields = [
             'id', 'uuid', 'email', 'first_name', 'last_name', 'full_name',
             'phone', 'is_email_verified', 'is_profile_complete', 'is_active',
@@ -34,13 +112,27 @@ class UserSerializer(serializers.ModelSerializer):
             'id', 'uuid', 'email', 'is_email_verified', 'is_active',
             'created_at', 'last_login_at'
         ]
+
+    @classmethod
+    def get_model_fields(cls, fields) -> list:
+        """
+        Колонки модели, которые нужно загрузить для запрошенных полей.
+
+        id и created_at нужны всегда - по ним строится курсор пагинации.
+        """
+        model_fields = {'id', 'created_at'}
+        for name in fields:
+            if name in cls.expandable_fields:
+                continue
+            model_fields.update(cls.field_sources.get(name, (name,)))
+        return sorted(model_fields)
         
         
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer для регистрации нового пользователя."""
     password = serializers.CharField(write_only=True, required=True, style={'input_type': 'password'},
                                      validators=[validate_password])
-    password_confirm = serializers.CharField(writy_only=True, required=True, style={'input_type': 'password'})
+    password_confirm = serializers.CharField(write_only=True, required=True, style={'input_type': 'password'})
     
     class Meta:
         model = User
@@ -64,6 +156,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['first_name', 'last_name', 'phone']
+    
+    def update(self, instance, validated_data):
+        return UserService.update_user(instance, **validated_data)
         
 
 class UserProfileUpdateSerializer(serializers.ModelSerializer):
@@ -75,6 +170,12 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
             'address', 'language', 'timezone'
         ]
     
+    def validate_avatar(self, value):
+        max_size = settings.USER_SETTINGS.get('AVATAR_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+        if value and value.size > max_size:
+            raise serializers.ValidationError(f'Размер файла не должен превышать {max_size // (1024 * 1024)} МБ')
+        return value
+    
     def update(self, instance, validated_data):
         user = instance.user
         UserService.update_profile(user, **validated_data)
@@ -131,3 +232,111 @@ class EmailVerificationSerializer(serializers.Serializer):
 
     def save(self, **kwargs):
         return UserService.verify_email(token_value=str(self.validated_data['token']))
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Serializer для получения пары JWT токенов.
+
+    Токены подписываются асимметричным ключом (см. JWTKeyService) и несут
+    claims, которых другим сервисам достаточно без запроса к users-service.
+    """
+    token_class = KeyRingRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        self.user.update_last_login()
+        return data
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['uuid'] = str(user.uuid)
+        token['email'] = user.email
+        token['is_staff'] = user.is_staff
+        token['is_email_verified'] = user.is_email_verified
+        return token
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """Serializer для обновления access токена."""
+    token_class = KeyRingRefreshToken
+
+
+class UserBatchLookupSerializer(serializers.Serializer):
+    """Serializer для пакетного запроса пользователей по uuid."""
+    uuids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    fields = serializers.ListField(
+        child=serializers.ChoiceField(choices=[*COMPACT_USER_FIELDS, 'full_name']),
+        required=False,
+        allow_empty=False
+    )
+
+    def validate_uuids(self, value):
+        max_uuids = settings.USER_SETTINGS.get('INTERNAL_BATCH_MAX_UUIDS', 500)
+        if len(value) > max_uuids:
+            raise serializers.ValidationError(f'Не больше {max_uuids} uuid за запрос')
+        return list(dict.fromkeys(value))
+
+
+class UserErasureJobSerializer(serializers.ModelSerializer):
+    """Serializer для задачи удаления пользователей (без списка id)."""
+    progress = serializers.FloatField(read_only=True)
+    requested_by = serializers.UUIDField(source='requested_by.uuid', read_only=True, default=None)
+
+    class Meta:
+        model = UserErasureJob
+        fields = [
+            'id', 'mode', 'status', 'reason', 'requested_by', 'total', 'deactivated',
+            'processed', 'progress', 'error_count', 'last_error', 'created_at',
+            'started_at', 'finished_at', 'heartbeat_at'
+        ]
+        read_only_fields = fields
+
+
+class UserErasureJobCreateSerializer(serializers.Serializer):
+    """
+    Serializer для создания задачи удаления.
+
+    Пользователи задаются списком id или uuid (одним из двух).
+    """
+    mode = serializers.ChoiceField(choices=UserErasureJob.MODE_CHOICES)
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    uuids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    reason = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if ('user_ids' in attrs) == ('uuids' in attrs):
+            raise serializers.ValidationError('Укажите user_ids или uuids')
+        max_users = settings.USER_SETTINGS.get('ERASURE_MAX_USERS', 100_000)
+        if len(attrs.get('user_ids') or attrs.get('uuids')) > max_users:
+            raise serializers.ValidationError(f'Не больше {max_users} пользователей в одной задаче')
+        return attrs
+
+    def get_user_ids(self):
+        if 'user_ids' in self.validated_data:
+            return self.validated_data['user_ids']
+        return User.objects.filter(uuid__in=self.validated_data['uuids']).values_list('pk', flat=True)
+
+
+def with_fresh_last_login(data, user_id):
+    """
+    Подставляет в готовые (например, закэшированные) данные пользователя
+    время входа из буфера write-behind, если оно свежее.
+    """
+    if not settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False):
+        return data
+    buffered = get_buffered_login(user_id)
+    if buffered is None:
+        return data
+    return {**data, 'last_login_at': serializers.DateTimeField().to_representation(buffered)}
+
+
+async def awith_fresh_last_login(data, user_id):
+    """Async версия with_fresh_last_login (для async views)."""
+    if not settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False):
+        return data
+    buffered = await aget_buffered_login(user_id)
+    if buffered is None:
+        return data
+    return {**data, 'last_login_at': serializers.DateTimeField().to_representation(buffered)}
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from users.utils import rate_limiter
+
+
+class AuthRateThrottle(BaseThrottle):
+    """
+    Sliding window лимит для auth endpoints (Redis + Lua).
+
+    Лимиты берутся из settings.AUTH_RATE_LIMITS[view.throttle_scope]:
+    по IP, по email из тела запроса, по текущему пользователю и общий
+    на весь endpoint. Ответ 429 содержит заголовок Retry-After.
+
+    Пример:
+        class RegisterView(generics.CreateAPIView):
+            throttle_classes = [AuthRateThrottle]
+            throttle_scope = 'register'
+    """
+
+    def allow_request(self, request, view):
+        if not settings.AUTH_RATE_LIMITS_ENABLED:
+            return True
+        scope = getattr(view, 'throttle_scope', None)
+        rates = settings.AUTH_RATE_LIMITS.get(scope)
+        if not rates:
+            return True
+
+        limits = []
+        for dimension, rate in rates.items():
+            ident = self.get_dimension_ident(dimension, request)
+            if ident is None:
+                continue
+            limit, window = rate_limiter.parse_rate(rate)
+            limits.append((f'{scope}:{dimension}:{ident}', limit, window))
+
+        self.wait_seconds = rate_limiter.hit(limits)
+        return self.wait_seconds == 0
+
+    def get_dimension_ident(self, dimension, request):
+        if dimension == 'ip':
+            return self.get_ident(request)
+        if dimension == 'email':
+            email = request.data.get('email') if hasattr(request.data, 'get') else None
+            if not email or not isinstance(email, str):
+                return None
+            # В ключах Redis не храним email в открытом виде
+            return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        if dimension == 'user':
+            return request.user.pk if request.user.is_authenticated else None
+        if dimension == 'global':
+            return 'all'
+        raise ValueError(f'Неизвестное измерение лимита: {dimension}')
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
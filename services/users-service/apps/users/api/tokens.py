@@ -0,0 +1,110 @@
+from typing import Any, Dict
+
+import jwt
+from jwt import ExpiredSignatureError, InvalidTokenError
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users.services.jwt_key_service import JWTKeyService
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    TokenBackend, подписывающий токены активным ключом из JWTKeyService.
+
+    В заголовок токена пишется kid, по нему при проверке выбирается
+    публичный ключ. Пока набор ключей пуст (локальная разработка),
+    используется обычная HS256 подпись из SIMPLE_JWT.
+    """
+
+    def __init__(self):
+        super().__init__(
+            api_settings.ALGORITHM,
+            api_settings.SIGNING_KEY,
+            api_settings.VERIFYING_KEY,
+            api_settings.AUDIENCE,
+            api_settings.ISSUER,
+            None,
+            api_settings.LEEWAY,
+            api_settings.JSON_ENCODER,
+        )
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        key = JWTKeyService.get_active_key()
+        if key is None:
+            return super().encode(payload)
+
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={'kid': key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify: bool = True) -> Dict[str, Any]:
+        if not JWTKeyService.get_keys():
+            return super().decode(token, verify=verify)
+
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except InvalidTokenError as e:
+            raise TokenBackendError('Токен невалиден') from e
+
+        key = JWTKeyService.get_key(kid) if kid else None
+        if key is None:
+            raise TokenBackendError('Неизвестный ключ подписи токена')
+
+        try:
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    'verify_aud': self.audience is not None,
+                    'verify_signature': verify,
+                },
+            )
+        except ExpiredSignatureError as e:
+            raise TokenBackendExpiredToken('Токен истек') from e
+        except InvalidTokenError as e:
+            raise TokenBackendError('Токен невалиден') from e
+
+
+_token_backend = None
+
+
+def get_token_backend() -> KeyRingTokenBackend:
+    """Ленивый singleton backend: settings читаются при первом использовании."""
+    global _token_backend
+    if _token_backend is None:
+        _token_backend = KeyRingTokenBackend()
+    return _token_backend
+
+
+class KeyRingAccessToken(AccessToken):
+    """Access токен, подписанный ключом из JWTKeyService."""
+
+    @property
+    def token_backend(self) -> KeyRingTokenBackend:
+        return get_token_backend()
+
+
+class KeyRingRefreshToken(RefreshToken):
+    """Refresh токен, подписанный ключом из JWTKeyService."""
+    access_token_class = KeyRingAccessToken
+
+    @property
+    def token_backend(self) -> KeyRingTokenBackend:
+        return get_token_backend()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.urls import path, re_path, include
+from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from users.api.internal_views import InternalUserBatchView
+from users.api.views import (
+    UserViewSet, RegisterView, EmailVerificationView, PasswordResetRequestView,
+    PasswordResetConfirmView, ResendVerificationEmailView, UserBulkImportView, UserBulkImportStatusView, UserExportView,
+    UserTokenObtainPairView, AvatarThumbnailView, UserErasureJobViewSet
+)
+
+router = DefaultRouter()
+# Раньше UserViewSet: иначе erasure-jobs/ совпадет с маршрутом /{pk}/
+router.register('erasure-jobs', UserErasureJobViewSet, basename='user-erasure-job')
+router.register('', UserViewSet, basename='user')
+
+urlpatterns = [
+    path('register/', RegisterView.as_view(), name='user-register'),
+    path('verify-email/', EmailVerificationView.as_view(), name='user-verify-email'),
+    path('password-reset/', PasswordResetRequestView.as_view(), name='user-password-reset'),
+    path('password-reset/confirm/', PasswordResetConfirmView.as_view(), name='user-password-reset-confirm'),
+    path('resend-verification/', ResendVerificationEmailView.as_view(), name='user-resend-verification'),
+    path('token/', UserTokenObtainPairView.as_view(), name='token-obtain-pair'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('bulk/import/', UserBulkImportView.as_view(), name='user-bulk-import'),
+    path('bulk/import/<str:import_id>/', UserBulkImportStatusView.as_view(), name='user-bulk-import-status'),
+    path('bulk/export/', UserExportView.as_view(), name='user-bulk-export'),
+    path('internal/batch/', InternalUserBatchView.as_view(), name='internal-user-batch'),
+    re_path(r'^avatars/(?P<name>[0-9a-f]{2}/[0-9a-f]{64}\.(?:webp|jpg))$', AvatarThumbnailView.as_view(),
+            name='user-avatar-thumbnail'),
+    path('', include(router.urls)),
+]
+
+if settings.USERS_ASYNC_VIEWS:
+    from users.api.async_views import (
+        AsyncMeView, AsyncEmailVerificationView, AsyncTokenRefreshView, AsyncInternalUserBatchView
+    )
+
+    # Под ASGI горячие endpoint-ы обслуживают async views: те же пути и
+    # имена, стоят раньше sync вариантов
+    urlpatterns = [
+        path('me/', AsyncMeView.as_view(), name='user-me'),
+        path('verify-email/', AsyncEmailVerificationView.as_view(), name='user-verify-email'),
+        path('token/refresh/', AsyncTokenRefreshView.as_view(), name='token-refresh'),
+        path('internal/batch/', AsyncInternalUserBatchView.as_view(), name='internal-user-batch'),
+    ] + urlpatterns
@@ -1,30 +1,66 @@
-from rest_framework import viewsets, status, generics
+from uuid import uuid4
+from rest_framework import viewsets, status, generics, mixins
 from rest_framework.decorators import action
+from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse, FileResponse, Http404
 
-from users.models import User
+from users.models import User, UserProfile, UserErasureJob
 from users.api.serializers import (
     UserSerializer, UserRegistrationSerializer, UserUpdateSerializer,
     UserProfileUpdateSerializer, ChangePasswordSerializer,
     PasswordResetRequestSerializer, PasswordResetConfirmSerializer,
-    EmailVerificationSerializer
+    EmailVerificationSerializer, UserErasureJobSerializer, UserErasureJobCreateSerializer,
+    with_fresh_last_login
 )
 from users.api.permissions import IsOwnerOrAdmin
-from users.services import UserService
+from users.api.mixins import ReplicaReadMixin, ConditionalGetMixin
+from users.api.throttling import AuthRateThrottle
+from users.api.filters import UserSearchFilter
+from users.api.pagination import UserSearchPagination, UserCursorPagination
+from users.services import UserService, UserCacheService
+from users.services.jwt_key_service import JWTKeyService
+from users.services.bulk_user_service import BulkUserService
+from users.services.erasure_service import UserErasureService
+from users.tasks.import_tasks import import_users_file, set_import_status, get_import_status
+from users.utils.avatars import get_thumbnail_storage
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet для управления пользователями."""
     
+    # GET запросы этих actions читают из реплики БД (см. config/db_router.py).
+    # retrieve и me - только из primary: их ответ кладется в кэш под текущей
+    # версией и дает ETag, а отстающая реплика сразу после PATCH закэшировала
+    # бы старый снимок
+    replica_read_actions = ('list',)
     queryset = User.objects.select_related('profile').active()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, UserSearchFilter]
     filterset_fields = ['is_email_verified', 'is_active']
     search_fields = ['email', 'first_name', 'last_name']
+    pagination_class = UserCursorPagination
+    
+    @property
+    def paginator(self):
+        """
+        Для поисковых запросов используем keyset пагинацию по рангу.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.action == 'list' and self.request.query_params.get(UserSearchFilter.search_param):
+                self._paginator = UserSearchPagination()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_queryset(self):
         """
@@ -33,9 +69,51 @@ class UserViewSet(viewsets.ModelViewSet):
         Обычные пользователи видят только себя.
         Админы видят всех.
         """
-        if self.request.is_staff:
-            return super().get_queryset()
-        return super().get_queryset().filter(id=self.request.user.id)
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = self.apply_sparse_fieldset(queryset)
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(id=self.request.user.id)
+    
+    def get_sparse_fieldset(self):
+        """
+        Разбирает ?fields=id,email и ?expand=profile для list.
+
+        Возвращает (fields, expand): fields - None, если не ограничены.
+        Профиль в списке отдается только по ?expand=profile.
+        """
+        if not hasattr(self, '_sparse_fieldset'):
+            fields = self.parse_fields_param('fields', UserSerializer.Meta.fields)
+            expand = self.parse_fields_param('expand', UserSerializer.expandable_fields) or set()
+            self._sparse_fieldset = (fields, expand)
+        return self._sparse_fieldset
+    
+    def parse_fields_param(self, param, allowed):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(allowed)
+        if unknown:
+            raise ValidationError({param: f'Неизвестные поля: {", ".join(sorted(unknown))}'})
+        return names
+    
+    def apply_sparse_fieldset(self, queryset):
+        """Не делаем JOIN профиля и не грузим лишние колонки, если они не запрошены."""
+        fields, expand = self.get_sparse_fieldset()
+        if 'profile' not in expand:
+            queryset = queryset.select_related(None)
+        if fields:
+            # Раскрываемые связи тоже перечисляем, иначе only() отложит их загрузку
+            queryset = queryset.only(*UserSerializer.get_model_fields(fields), *expand)
+        return queryset
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            context['fields'], context['expand'] = self.get_sparse_fieldset()
+        return context
     
     def get_serializer_class(self):
         """
@@ -49,6 +127,48 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserUpdateSerializer
         return UserSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Получить пользователя по ID.
+
+        Данные отдаются из кэша, если пользователь имеет к ним доступ:
+        админ - к любому, обычный пользователь - только к себе.
+        На If-None-Match/If-Modified-Since отвечаем 304 без сериализации.
+        """
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        state = None
+        version = None
+        if request.user.is_staff or str(request.user.pk) == str(pk):
+            not_modified, state = self.check_not_modified(request, pk)
+            if not_modified is not None:
+                return not_modified
+            version, data = UserCacheService.lookup(pk)
+            if data is not None and data.get('is_active'):
+                return self.set_validators(Response(with_fresh_last_login(data, pk)), state)
+        
+        instance = self.get_object()
+        data = UserSerializer(instance).data
+        UserCacheService.set(instance.pk, data, version)
+        return self.set_validators(Response(data), state)
+    
+    def perform_update(self, serializer):
+        serializer.save()
+        UserCacheService.invalidate(serializer.instance.pk)
+    
+    def perform_destroy(self, instance):
+        UserService.delete_user(instance)
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
+    def deactivate(self, request, pk=None):
+        """
+        Деактивировать пользователя (только для админов).
+
+        POST /api/v1/users/{id}/deactivate/
+        """
+        user = self.get_object()
+        UserService.deactivate_user(user)
+        return Response({'detail': 'Пользователь деактивирован'}, status=status.HTTP_200_OK)
+    
     @action(detail=False, methods=['get', 'patch'], url_path='me')
     def me(self, request):
         """
@@ -62,8 +182,14 @@ class UserViewSet(viewsets.ModelViewSet):
         methods - какие HTTP методы разрешены
         """
         if request.method == 'GET':
-            serializer = UserSerializer(request.user)
-            return Response(serializer.data)
+            not_modified, state = self.check_not_modified(request, request.user.pk)
+            if not_modified is not None:
+                return not_modified
+            data = UserCacheService.get_or_set(
+                request.user.pk,
+                lambda: UserSerializer(request.user).data
+            )
+            return self.set_validators(Response(with_fresh_last_login(data, request.user.pk)), state)
         
         elif request.method == 'PATCH':
             serializer = UserUpdateSerializer(
@@ -73,7 +199,17 @@ class UserViewSet(viewsets.ModelViewSet):
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            UserCacheService.invalidate(request.user.pk)
             return Response(UserSerializer(request.user).data)
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """
+        Счетчики попаданий и промахов кэша пользователей.
+
+        GET /api/v1/users/cache-stats/
+        """
+        return Response(UserCacheService.get_stats())
         
     @action(detail=False, methods=['patch'], url_path='me/profile')
     def update_profile(self, request):
@@ -81,16 +217,19 @@ class UserViewSet(viewsets.ModelViewSet):
         Обновить профиль текущего пользователя.
 
         PATCH /api/v1/users/me/profile/
+        Аватар загружается multipart/form-data в поле avatar,
+        миниатюры (avatar_urls) появляются после обработки воркером.
         """   
-        profile = request.user
-        serializer = UserUpdateSerializer(
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        serializer = UserProfileUpdateSerializer(
             profile,
             data=request.data,
             partial=True
         )   
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(UserSerializer(request.data).data)
+        profile = serializer.save()
+        UserCacheService.invalidate(request.user.pk)
+        return Response(UserSerializer(profile.user).data)
     
     @action(detail=False, methods=['post'], url_path='me/change-password')
     def change_password(self, request):
@@ -116,6 +255,20 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
+class UserTokenObtainPairView(TokenObtainPairView):
+    """
+    Получение пары JWT токенов.
+
+    POST /api/v1/users/token/
+    Body: {
+        "email": "user@example.com",
+        "password": "SecurePass123"
+    }
+    """
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'login'
+
+
 class RegisterView(generics.CreateAPIView):
     """
     Регистрация нового пользователя.
@@ -137,6 +290,8 @@ class RegisterView(generics.CreateAPIView):
     """
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'register'
     
     def create(self, request, *args, **kwargs):
         """Переопределяем create для кастомного ответа."""
@@ -168,11 +323,14 @@ class EmailVerificationView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        try:
+            user = serializer.save()
+        except ValueError as e:
+            raise ValidationError({'token': [str(e)]})
         
         return Response(
             {
-                'detail': 'Email успешно подтверждене',
+                'detail': 'Email успешно подтвержден',
                 'user': UserSerializer(user).data
             },
             status=status.HTTP_200_OK
@@ -190,6 +348,8 @@ class PasswordResetRequestView(generics.GenericAPIView):
     """
     serializer_class = PasswordResetRequestSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'password_reset'
     
     def post(self, request, *args, **kwargs):
         """Обрабатываем запрос на сброс пароля."""
@@ -238,6 +398,8 @@ class ResendVerificationEmailView(generics.GenericAPIView):
     POST /api/v1/users/resend-verification/
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [AuthRateThrottle]
+    throttle_scope = 'resend_verification'
     
     def post(self, request, *args, **kwargs):
         try:
@@ -251,3 +413,160 @@ class ResendVerificationEmailView(generics.GenericAPIView):
                 {'detail': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class JWKSView(APIView):
+    """
+    Публичные ключи для проверки JWT (JWKS).
+
+    GET /.well-known/jwks.json
+
+    Другие сервисы кэшируют этот ответ и проверяют токены локально.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    def get(self, request, *args, **kwargs):
+        response = Response(JWTKeyService.get_jwks())
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
+
+class UserBulkImportView(APIView):
+    """
+    Массовый импорт пользователей (только админ).
+
+    POST /api/v1/users/bulk/import/
+    multipart: file=<users.csv|users.ndjson>, format=csv|ndjson
+
+    Файл сохраняется, а импортирует его задача Celery import_users_file:
+    ответ 202 с import_id, прогресс - GET /api/v1/users/bulk/import/{import_id}/.
+    Для очень больших файлов используйте manage.py import_users.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        fmt = request.data.get('format', 'ndjson')
+        if upload is None or fmt not in ('csv', 'ndjson'):
+            return Response(
+                {'detail': 'Нужны file и format (csv или ndjson)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        import_id = uuid4().hex
+        name = default_storage.save(f'imports/{import_id}.{fmt}', upload)
+        set_import_status(import_id, 'queued')
+        try:
+            import_users_file.delay(import_id, name, fmt)
+        except Exception:
+            default_storage.delete(name)
+            raise
+        return Response(get_import_status(import_id), status=status.HTTP_202_ACCEPTED)
+
+
+class UserBulkImportStatusView(APIView):
+    """
+    Статус массового импорта (только админ).
+
+    GET /api/v1/users/bulk/import/{import_id}/
+    status: queued | running | completed | failed; created - сколько
+    пользователей уже сохранено (в том числе при failed).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, import_id, *args, **kwargs):
+        data = get_import_status(import_id)
+        if data is None:
+            raise Http404
+        return Response(data)
+
+
+class UserExportView(APIView):
+    """
+    Потоковая выгрузка пользователей (только админ).
+
+    GET /api/v1/users/bulk/export/?format=csv|ndjson
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, *args, **kwargs):
+        fmt = request.query_params.get('format', 'ndjson')
+        if fmt not in ('csv', 'ndjson'):
+            return Response({'detail': 'format должен быть csv или ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(BulkUserService.export_users(fmt), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="users.{fmt}"'
+        return response
+
+
+class UserErasureJobViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Фоновая деактивация и удаление/анонимизация пользователей (только админ).
+
+    POST /api/v1/users/erasure-jobs/ - создать задачу
+    Body: {"mode": "anonymize" | "delete", "user_ids": [1, 2, ...] | "uuids": [...], "reason": "..."}
+    GET /api/v1/users/erasure-jobs/{id}/ - статус и прогресс
+    POST /api/v1/users/erasure-jobs/{id}/cancel/ - отменить
+    POST /api/v1/users/erasure-jobs/{id}/resume/ - возобновить после ошибки
+    """
+    queryset = UserErasureJob.objects.select_related('requested_by')
+    serializer_class = UserErasureJobSerializer
+    permission_classes = [IsAdminUser]
+
+    def create(self, request, *args, **kwargs):
+        serializer = UserErasureJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job = UserErasureService.create_job(
+                serializer.get_user_ids(),
+                serializer.validated_data['mode'],
+                requested_by=request.user,
+                reason=serializer.validated_data['reason'],
+            )
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+        return Response(UserErasureJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        if not UserErasureService.cancel(job):
+            raise ValidationError({'detail': 'Задача уже завершена'})
+        job.refresh_from_db()
+        return Response(UserErasureJobSerializer(job).data)
+
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        job = self.get_object()
+        if not UserErasureService.resume(job):
+            raise ValidationError({'detail': 'Возобновить можно только задачу с ошибкой'})
+        job.refresh_from_db()
+        return Response(UserErasureJobSerializer(job).data)
+
+
+class AvatarThumbnailView(APIView):
+    """
+    Отдача миниатюр аватаров из STORAGES['avatars'].
+
+    GET /api/v1/users/avatars/ab/ab12...ef.webp
+
+    Имя файла - хэш содержимого, поэтому ответ кэшируется браузером и CDN
+    навсегда (immutable). В production миниатюры лучше отдавать напрямую
+    из хранилища/CDN, указав его base_url в STORAGES['avatars'].
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = []
+    
+    def get(self, request, name):
+        storage = get_thumbnail_storage()
+        if not storage.exists(name):
+            raise Http404
+        response = FileResponse(storage.open(name, 'rb'))
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        digest = name.rsplit('/', 1)[-1].split('.')[0]
+        response['ETag'] = f'"{digest}"'
+        return response
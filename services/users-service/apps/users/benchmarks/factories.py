@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+import factory
+from django.contrib.auth.hashers import make_password
+
+from users.models import User, UserProfile
+
+
+BENCHMARK_PASSWORD = 'BenchmarkPass123'
+BENCHMARK_STAFF_EMAIL = 'bench-staff@example.com'
+
+
+@lru_cache(maxsize=1)
+def benchmark_password_hash() -> str:
+    """Один хэш на всех: хэширование при сидинге не то, что мы меряем."""
+    return make_password(BENCHMARK_PASSWORD)
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    """
+    Пользователь для нагрузочных тестов.
+
+    Пример: users = UserFactory.build_batch(1000)
+    """
+
+    class Meta:
+        model = User
+
+    email = factory.Sequence(lambda n: f'bench{n}@example.com')
+    first_name = factory.Faker('first_name', locale='ru_RU')
+    last_name = factory.Faker('last_name', locale='ru_RU')
+    phone = factory.Faker('numerify', text='+79#########')
+    is_active = True
+    is_email_verified = factory.Faker('boolean', chance_of_getting_true=80)
+    password = factory.LazyFunction(benchmark_password_hash)
+
+
+class UserProfileFactory(factory.django.DjangoModelFactory):
+    """Профиль пользователя для нагрузочных тестов."""
+
+    class Meta:
+        model = UserProfile
+
+    user = factory.SubFactory(UserFactory)
+    bio = factory.Faker('sentence', locale='ru_RU')
+    country = 'Россия'
+    city = factory.Faker('city', locale='ru_RU')
+    address = factory.Faker('street_address', locale='ru_RU')
+    language = factory.Iterator(['ru', 'en'])
+    timezone = 'Europe/Moscow'
@@ -0,0 +1,39 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from common.metrics import current_stats
+
+
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+
+
+class QueryCountHeaderMiddleware:
+    """
+    Добавляет в ответ заголовок X-DB-Query-Count с числом SQL запросов.
+
+    Число берется из счетчиков common.metrics, поэтому middleware стоит
+    сразу после PerformanceMetricsMiddleware. Включается только для
+    нагрузочных тестов (BENCHMARK_QUERY_COUNT=True), в production не
+    подключается.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.add_header(self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_header(await self.get_response(request))
+
+    def add_header(self, response):
+        stats = current_stats()
+        if stats is not None:
+            response[QUERY_COUNT_HEADER] = str(stats.db_queries)
+        return response
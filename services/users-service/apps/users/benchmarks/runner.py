@@ -0,0 +1,222 @@
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+import requests
+
+from users.benchmarks.factories import BENCHMARK_PASSWORD, BENCHMARK_STAFF_EMAIL
+from users.benchmarks.middleware import QUERY_COUNT_HEADER
+
+
+# Сравниваемые с baseline метрики: (имя, True - больше значит лучше)
+COMPARED_METRICS = [('throughput_rps', True), ('p95_ms', False)]
+
+
+@dataclass
+class Scenario:
+    """Один замеряемый endpoint."""
+    name: str
+    method: str
+    path: str
+    auth: Optional[str] = 'user'  # 'user', 'staff', 'internal' или None
+    # (номер запроса, контекст прогона) -> тело запроса
+    body: Optional[Callable[[int, Dict[str, Any]], Dict]] = None
+    expected_status: int = 200
+
+
+SCENARIOS = [
+    Scenario(
+        'register', 'POST', '/api/v1/users/register/', auth=None, expected_status=201,
+        body=lambda i, ctx: {
+            'email': f'bench-register-{uuid4().hex}@example.com',
+            'password': BENCHMARK_PASSWORD,
+            'password_confirm': BENCHMARK_PASSWORD,
+            'first_name': 'Бенч',
+            'last_name': 'Марк',
+        },
+    ),
+    Scenario(
+        'token_obtain', 'POST', '/api/v1/users/token/', auth=None,
+        body=lambda i, ctx: {'email': f'bench{i % 100}@example.com', 'password': BENCHMARK_PASSWORD},
+    ),
+    Scenario('me', 'GET', '/api/v1/users/me/'),
+    Scenario(
+        'profile_patch', 'PATCH', '/api/v1/users/me/profile/',
+        body=lambda i, ctx: {'city': f'Город {i}'},
+    ),
+    Scenario('list', 'GET', '/api/v1/users/?page_size=20', auth='staff'),
+]
+
+# Горячие endpoint-ы с async реализацией (сравнение sync и ASGI профилей,
+# см. benchmark_asgi). Контекст прогона: refresh_tokens (заполняет
+# prepare), user_uuids, verification_tokens и internal_token
+HOT_SCENARIOS = [
+    Scenario('me', 'GET', '/api/v1/users/me/'),
+    Scenario(
+        'token_refresh', 'POST', '/api/v1/users/token/refresh/', auth=None,
+        body=lambda i, ctx: {'refresh': ctx['refresh_tokens'][i % len(ctx['refresh_tokens'])]},
+    ),
+    Scenario(
+        'internal_batch', 'POST', '/api/v1/users/internal/batch/', auth='internal',
+        body=lambda i, ctx: {
+            'uuids': [ctx['user_uuids'][(i * 50 + k) % len(ctx['user_uuids'])] for k in range(50)],
+            'fields': ['uuid', 'full_name', 'avatar_thumbnails'],
+        },
+    ),
+    Scenario(
+        'verify_email', 'POST', '/api/v1/users/verify-email/', auth=None,
+        body=lambda i, ctx: {'token': ctx['verification_tokens'][i]},
+    ),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class BenchmarkRunner:
+    """
+    Гоняет сценарии против запущенного сервера конкурентными клиентами.
+
+    Каждый поток работает со своим requests.Session (keep-alive) и своим
+    пользователем. Количество SQL запросов берется из заголовка
+    X-DB-Query-Count (сервер запущен с BENCHMARK_QUERY_COUNT=True).
+
+    Пример:
+        runner = BenchmarkRunner('http://localhost:8000', concurrency=8, requests_per_scenario=200)
+        results = runner.run(SCENARIOS)
+    """
+
+    def __init__(self, base_url: str, concurrency: int, requests_per_scenario: int, warmup: int = 10,
+                 timeout: float = 30, context: Optional[Dict[str, Any]] = None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.requests_per_scenario = requests_per_scenario
+        self.warmup = warmup
+        self.timeout = timeout
+        self.local = threading.local()
+        self.tokens = {}
+        self.context = context or {}
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def obtain_tokens(self, email: str) -> Dict[str, str]:
+        response = requests.post(
+            f'{self.base_url}/api/v1/users/token/',
+            json={'email': email, 'password': BENCHMARK_PASSWORD},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def prepare(self) -> None:
+        """Получает токены: по пользователю на поток и один для админа."""
+        pairs = [self.obtain_tokens(f'bench{i}@example.com') for i in range(self.concurrency)]
+        self.tokens['user'] = [pair['access'] for pair in pairs]
+        self.tokens['staff'] = [self.obtain_tokens(BENCHMARK_STAFF_EMAIL)['access']]
+        self.context['refresh_tokens'] = [pair['refresh'] for pair in pairs]
+
+    def request(self, scenario: Scenario, index: int, worker: int):
+        headers = {}
+        if scenario.auth == 'internal':
+            headers['X-Internal-Token'] = self.context['internal_token']
+        elif scenario.auth:
+            tokens = self.tokens[scenario.auth]
+            headers['Authorization'] = f'Bearer {tokens[worker % len(tokens)]}'
+        body = scenario.body(index, self.context) if scenario.body else None
+
+        started = time.perf_counter()
+        response = self.session().request(
+            scenario.method, f'{self.base_url}{scenario.path}',
+            json=body, headers=headers, timeout=self.timeout,
+        )
+        elapsed = time.perf_counter() - started
+        queries = response.headers.get(QUERY_COUNT_HEADER)
+        return elapsed, response.status_code == scenario.expected_status, int(queries) if queries else None
+
+    def run_scenario(self, scenario: Scenario) -> Dict:
+        # Прогрев - номера после основных, чтобы одноразовые данные
+        # (токены верификации) не пересекались с замером
+        for i in range(self.warmup):
+            self.request(scenario, self.requests_per_scenario + i, 0)
+
+        counter = itertools.count()
+        latencies, queries, errors = [], [], []
+        lock = threading.Lock()
+
+        def worker(worker_id):
+            while True:
+                index = next(counter)
+                if index >= self.requests_per_scenario:
+                    return
+                try:
+                    elapsed, ok, query_count = self.request(scenario, index, worker_id)
+                except requests.RequestException:
+                    ok, elapsed, query_count = False, None, None
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors.append(index)
+                    if query_count is not None:
+                        queries.append(query_count)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(worker, range(self.concurrency)))
+        duration = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': self.requests_per_scenario,
+            'errors': len(errors),
+            'throughput_rps': round(len(latencies) / duration, 1) if duration else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'avg_queries': round(statistics.mean(queries), 2) if queries else None,
+        }
+
+    def run(self, scenarios: List[Scenario]) -> Dict[str, Dict]:
+        self.prepare()
+        return {scenario.name: self.run_scenario(scenario) for scenario in scenarios}
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Сравнивает результаты с baseline.
+
+    Регрессия - падение throughput или рост p95 больше чем на max_regression
+    (доля, 0.2 = 20%), рост среднего числа SQL запросов или появление ошибок.
+    Возвращает список описаний регрессий.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            current, reference = result[metric], base[metric]
+            if not reference:
+                continue
+            change = (current - reference) / reference
+            if (higher_is_better and change < -max_regression) or (not higher_is_better and change > max_regression):
+                regressions.append(f'{name}: {metric} {reference} -> {current} ({change:+.0%})')
+        if base.get('avg_queries') is not None and result['avg_queries'] is not None:
+            # Количество запросов детерминировано: любой рост - регрессия
+            if result['avg_queries'] > base['avg_queries'] + 0.5:
+                regressions.append(f'{name}: avg_queries {base["avg_queries"]} -> {result["avg_queries"]}')
+        if result['errors'] > base.get('errors', 0):
+            regressions.append(f'{name}: errors {base.get("errors", 0)} -> {result["errors"]}')
+    return regressions
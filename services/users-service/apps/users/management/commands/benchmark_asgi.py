@@ -0,0 +1,111 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.benchmarks.runner import HOT_SCENARIOS, BenchmarkRunner
+from users.models import EmailVerificationToken, User
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает sync (gunicorn, WSGI) и async (ASGI) профили на горячих endpoint-ах.
+
+    Оба сервера работают с одной БД и запущены заранее:
+
+        python manage.py seed_benchmark_data --users 10000
+        export AUTH_RATE_LIMITS_ENABLED=False INTERNAL_API_TOKEN=bench
+        gunicorn -c config/gunicorn.conf.py -b 127.0.0.1:8000 config.wsgi
+        USERS_ASYNC_VIEWS=True GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \\
+            gunicorn -c config/gunicorn.conf.py -b 127.0.0.1:8001 config.asgi:application
+
+    Запуск (с тем же INTERNAL_API_TOKEN):
+        python manage.py benchmark_asgi --sync-url http://127.0.0.1:8000 \\
+            --async-url http://127.0.0.1:8001 --concurrency 64
+
+    Клиент - потоки одного процесса: при высокой конкурентности запускайте
+    его на отдельной машине, чтобы он не делил CPU с серверами.
+    """
+    help = 'Сравнивает throughput sync и async профилей при высокой конкурентности'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--async-url', default='http://127.0.0.1:8001')
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--requests', type=int, default=2000, help='Запросов на endpoint')
+        parser.add_argument('--warmup', type=int, default=50)
+        parser.add_argument('--scenarios', nargs='+', choices=[scenario.name for scenario in HOT_SCENARIOS])
+        parser.add_argument('--output', help='Сохранить результаты в JSON файл')
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in HOT_SCENARIOS if not options['scenarios'] or s.name in options['scenarios']]
+        if any(s.auth == 'internal' for s in scenarios) and not settings.INTERNAL_API_TOKEN:
+            raise CommandError('Для internal_batch задайте INTERNAL_API_TOKEN (тот же, что у серверов)')
+
+        user_uuids = [
+            str(uuid) for uuid in
+            User.objects.filter(email__startswith='bench', is_active=True).values_list('uuid', flat=True)[:1000]
+        ]
+        if not user_uuids:
+            raise CommandError('Нет bench пользователей, сначала выполните seed_benchmark_data')
+
+        results = {}
+        for profile, base_url in (('sync', options['sync_url']), ('async', options['async_url'])):
+            context = {
+                'internal_token': settings.INTERNAL_API_TOKEN,
+                'user_uuids': user_uuids,
+                # Токены одноразовые - свои на каждый профиль
+                'verification_tokens': self.create_verification_tokens(options['requests'] + options['warmup']),
+            }
+            runner = BenchmarkRunner(
+                base_url,
+                concurrency=options['concurrency'],
+                requests_per_scenario=options['requests'],
+                warmup=options['warmup'],
+                context=context,
+            )
+            self.stdout.write(f'Профиль {profile}: {base_url}')
+            try:
+                results[profile] = runner.run(scenarios)
+            except Exception as e:
+                raise CommandError(f'Не удалось выполнить нагрузочный тест ({profile}): {e}')
+
+        self.print_comparison(results)
+        if options['output']:
+            report = {
+                'meta': {
+                    'recorded_at': timezone.now().isoformat(),
+                    'sync_url': options['sync_url'],
+                    'async_url': options['async_url'],
+                    'concurrency': options['concurrency'],
+                    'requests': options['requests'],
+                },
+                'profiles': results,
+            }
+            Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    def create_verification_tokens(self, count):
+        users = list(User.objects.filter(email__startswith='bench', is_active=True).order_by('id')[:count])
+        expires_at = timezone.now() + timedelta(hours=1)
+        tokens = EmailVerificationToken.objects.bulk_create([
+            EmailVerificationToken(user=users[i % len(users)], expires_at=expires_at)
+            for i in range(count)
+        ])
+        return [str(token.token) for token in tokens]
+
+    def print_comparison(self, results):
+        self.stdout.write(
+            f'{"endpoint":<15} {"sync rps":>9} {"async rps":>10} {"x":>6} '
+            f'{"sync p95":>9} {"async p95":>10} {"ошибок":>9}'
+        )
+        for name, sync_result in results['sync'].items():
+            async_result = results['async'][name]
+            ratio = async_result['throughput_rps'] / sync_result['throughput_rps'] if sync_result['throughput_rps'] else 0
+            errors = f'{sync_result["errors"]}/{async_result["errors"]}'
+            self.stdout.write(
+                f'{name:<15} {sync_result["throughput_rps"]:>9.1f} {async_result["throughput_rps"]:>10.1f} '
+                f'{ratio:>6.2f} {sync_result["p95_ms"]:>9.2f} {async_result["p95_ms"]:>10.2f} {errors:>9}'
+            )
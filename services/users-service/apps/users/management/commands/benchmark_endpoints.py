@@ -0,0 +1,139 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.benchmarks.runner import SCENARIOS, BenchmarkRunner, compare_with_baseline
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'benchmarks' / 'baseline.json'
+# Нагрузка, если ее нет ни в аргументах, ни в meta baseline
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS = 200
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест основных endpoints против запущенного сервера.
+
+    Для каждого endpoint печатает throughput, p50/p95/p99 и среднее число
+    SQL запросов, сравнивает с baseline и падает при регрессии.
+    --concurrency и --requests по умолчанию берутся из baseline; другие
+    значения при сравнении с baseline - ошибка.
+
+    Baseline записывается на Postgres и gunicorn: на SQLite и runserver
+    цифры несопоставимы с продом. Окружение замера указывается в
+    --environment и сохраняется в baseline.
+
+    Подготовка (Postgres через DATABASE_URL):
+        python manage.py migrate
+        python manage.py seed_benchmark_data --users 10000
+        BENCHMARK_QUERY_COUNT=True AUTH_RATE_LIMITS_ENABLED=False EMAIL_ASYNC=False \\
+            EMAIL_BACKEND=django.core.mail.backends.locmem.EmailBackend \\
+            gunicorn config.wsgi -w 4 --threads 4 -b 127.0.0.1:8000
+
+    Запуск:
+        python manage.py benchmark_endpoints --base-url http://127.0.0.1:8000
+        python manage.py benchmark_endpoints --update-baseline \\
+            --environment 'gunicorn -w 4 --threads 4, PostgreSQL 16, ...'  # записать новый baseline
+    """
+    help = 'Замеряет latency/throughput endpoints и сравнивает с baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        # По умолчанию - значения из meta baseline, иначе сравнение некорректно
+        parser.add_argument('--concurrency', type=int)
+        parser.add_argument('--requests', type=int, help='Запросов на endpoint')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--scenarios', nargs='+', choices=[scenario.name for scenario in SCENARIOS])
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--max-regression', type=float, default=0.2,
+                            help='Допустимое ухудшение throughput/p95 (доля, 0.2 = 20%%)')
+        parser.add_argument('--update-baseline', action='store_true')
+        parser.add_argument('--environment', default='', help='Окружение замера (сервер, БД, данные)')
+        parser.add_argument('--output', help='Сохранить результаты в JSON файл')
+
+    def handle(self, *args, **options):
+        if options['update_baseline'] and not options['environment']:
+            raise CommandError('Для --update-baseline укажите --environment')
+        baseline_path = Path(options['baseline'])
+        baseline = None
+        if not options['update_baseline'] and baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            self.apply_baseline_load(options, baseline.get('meta', {}))
+        options['concurrency'] = options['concurrency'] or DEFAULT_CONCURRENCY
+        options['requests'] = options['requests'] or DEFAULT_REQUESTS
+
+        scenarios = [s for s in SCENARIOS if not options['scenarios'] or s.name in options['scenarios']]
+        runner = BenchmarkRunner(
+            options['base_url'],
+            concurrency=options['concurrency'],
+            requests_per_scenario=options['requests'],
+            warmup=options['warmup'],
+        )
+        try:
+            results = runner.run(scenarios)
+        except Exception as e:
+            raise CommandError(f'Не удалось выполнить нагрузочный тест: {e}')
+
+        self.print_results(results)
+        report = {
+            'meta': {
+                'recorded_at': timezone.now().isoformat(),
+                'base_url': options['base_url'],
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+                'environment': options['environment'],
+            },
+            'endpoints': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+        if options['update_baseline']:
+            baseline_path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline обновлен: {baseline_path}'))
+            return
+
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(f'Baseline не найден: {baseline_path}'))
+            return
+
+        regressions = compare_with_baseline(results, baseline['endpoints'], options['max_regression'])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(f'  {regression}')
+            raise CommandError(f'Найдены регрессии относительно baseline: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий относительно baseline нет'))
+
+    def apply_baseline_load(self, options, meta):
+        """
+        Берет concurrency и requests из meta baseline, если они не заданы.
+
+        Throughput и перцентили зависят от нагрузки, поэтому при
+        несовпадении с baseline сравнивать нечего - команда падает до замера.
+        """
+        for option in ('concurrency', 'requests'):
+            recorded = meta.get(option)
+            if recorded is None:
+                continue
+            if options[option] is None:
+                options[option] = recorded
+            elif options[option] != recorded:
+                raise CommandError(
+                    f'--{option} {options[option]} не совпадает с baseline ({recorded}): '
+                    f'результаты несопоставимы. Запустите с --{option} {recorded} '
+                    f'или запишите новый baseline (--update-baseline)'
+                )
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"endpoint":<15} {"rps":>8} {"p50 мс":>9} {"p95 мс":>9} {"p99 мс":>9} {"SQL":>6} {"ошибок":>7}'
+        )
+        for name, result in results.items():
+            queries = '-' if result['avg_queries'] is None else f'{result["avg_queries"]:.1f}'
+            self.stdout.write(
+                f'{name:<15} {result["throughput_rps"]:>8.1f} {result["p50_ms"]:>9.2f} '
+                f'{result["p95_ms"]:>9.2f} {result["p99_ms"]:>9.2f} {queries:>6} {result["errors"]:>7}'
+            )
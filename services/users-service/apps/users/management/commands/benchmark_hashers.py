@@ -0,0 +1,66 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    """
+    Замеряет скорость проверки паролей для профилей хэширования.
+
+    Для каждого профиля печатает время одной проверки, входы в секунду
+    на одно ядро и суммарно на пуле потоков. По этим цифрам считаем,
+    сколько воркеров нужно под пиковую нагрузку на вход.
+
+    Пример:
+        python manage.py benchmark_hashers --profiles pbkdf2 argon2id --iterations 50
+    """
+    help = 'Замеряет входы/сек на ядро для профилей хэширования паролей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=list(settings.PASSWORD_HASHER_PROFILES))
+        parser.add_argument('--iterations', type=int, default=20, help='Проверок на поток')
+        parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        unknown = set(options['profiles']) - set(settings.PASSWORD_HASHER_PROFILES)
+        if unknown:
+            raise CommandError(f'Неизвестные профили: {", ".join(sorted(unknown))}')
+
+        self.stdout.write(
+            f'{"профиль":<10} {"мс/проверка":>12} {"входов/сек/ядро":>16} '
+            f'{"входов/сек (" + str(options["threads"]) + " потоков)":>26}'
+        )
+        for profile in options['profiles']:
+            try:
+                hasher = import_string(settings.PASSWORD_HASHER_PROFILES[profile])()
+                if hasher.library:
+                    # Проверяем, что библиотека (например, argon2-cffi) установлена
+                    hasher._load_library()
+            except ValueError as e:
+                self.stderr.write(f'{profile:<10} пропущен: {e}')
+                continue
+
+            single = self._measure(hasher, options['iterations'], threads=1)
+            parallel = self._measure(hasher, options['iterations'], threads=options['threads'])
+            self.stdout.write(
+                f'{profile:<10} {1000 / single:>12.1f} {single:>16.1f} {parallel:>26.1f}'
+            )
+
+    def _measure(self, hasher, iterations, threads):
+        """Возвращает количество проверок пароля в секунду."""
+        password = 'BenchmarkPass123'
+        encoded = hasher.encode(password, hasher.salt())
+
+        def worker(_):
+            for _ in range(iterations):
+                hasher.verify(password, encoded)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, range(threads)))
+        elapsed = time.perf_counter() - started
+        return iterations * threads / elapsed
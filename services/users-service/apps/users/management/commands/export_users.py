@@ -0,0 +1,46 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.services.bulk_user_service import BulkUserService
+
+
+class Command(BaseCommand):
+    """
+    Потоковая выгрузка пользователей в CSV или NDJSON.
+
+    Пример:
+        python manage.py export_users --format csv --output users.csv
+    """
+    help = 'Потоковая выгрузка пользователей в CSV или NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default='ndjson')
+        parser.add_argument('--output', default='-', help='Путь к файлу ("-" - stdout)')
+        parser.add_argument('--include-password-hash', action='store_true')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        lines = BulkUserService.export_users(options['format'], options['include_password_hash'])
+
+        if options['output'] == '-':
+            rows = self._write(sys.stdout, lines)
+        else:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+                rows = self._write(stream, lines)
+
+        # Для CSV первая строка - заголовок
+        if options['format'] == 'csv':
+            rows = max(rows - 1, 0)
+
+        seconds = time.monotonic() - started
+        rate = round(rows / seconds, 1) if seconds else 0.0
+        self.stderr.write(self.style.SUCCESS(f'Выгружено: {rows}, время: {seconds:.2f} сек, {rate} строк/сек'))
+
+    def _write(self, stream, lines):
+        rows = 0
+        for line in lines:
+            stream.write(line)
+            rows += 1
+        return rows
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.services.jwt_key_service import JWTKeyService
+
+
+class Command(BaseCommand):
+    """
+    Генерирует новый ключ подписи JWT в JWT_KEYS_DIR.
+
+    Пример:
+        python manage.py generate_jwt_key --algorithm EdDSA
+    """
+    help = 'Генерирует новый ключ подписи JWT (RS256 или EdDSA)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithm', choices=['RS256', 'EdDSA'], default='RS256')
+        parser.add_argument('--kid', help='Идентификатор ключа (по умолчанию - текущая дата и время)')
+
+    def handle(self, *args, **options):
+        kid = options['kid'] or timezone.now().strftime('%Y%m%d%H%M%S')
+        try:
+            path = JWTKeyService.generate_key(kid, algorithm=options['algorithm'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Ключ {kid} сохранен в {path}'))
+        self.stdout.write(
+            'Перезапустите сервис, дождитесь обновления JWKS у других сервисов '
+            f'и переключите JWT_ACTIVE_KID={kid}'
+        )
@@ -0,0 +1,51 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.services.bulk_user_service import BulkUserService
+
+
+class Command(BaseCommand):
+    """
+    Массовый импорт пользователей из CSV или NDJSON.
+
+    Пример:
+        python manage.py import_users users.ndjson --format ndjson --workers 8
+    """
+    help = 'Массовый импорт пользователей из CSV или NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу ("-" - stdin)')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default='ndjson')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None, help='Процессов для хэширования паролей')
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                result = self._import(sys.stdin, options)
+            else:
+                with open(options['path'], encoding='utf-8', newline='') as stream:
+                    result = self._import(stream, options)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors'][:20]:
+            self.stderr.write(f'Строка {error["row"]}: {error["error"]}')
+
+        summary = (
+            f'Создано: {result["created"]}, пропущено: {result["skipped"]}, '
+            f'ошибок: {len(result["errors"])}, время: {result["seconds"]} сек, '
+            f'{result["rows_per_sec"]} строк/сек'
+        )
+        if not result['completed']:
+            # Созданные до сбоя пользователи сохранены: повторный запуск их пропустит
+            raise CommandError(f'Импорт прерван: {result["failure"]}. {summary}')
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _import(self, stream, options):
+        return BulkUserService.import_users(
+            BulkUserService.iter_rows(stream, options['format']),
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+        )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from factory.random import reseed_random
+
+from users.benchmarks.factories import (
+    BENCHMARK_STAFF_EMAIL, UserFactory, UserProfileFactory, benchmark_password_hash
+)
+from users.models import User, UserProfile
+
+
+class Command(BaseCommand):
+    """
+    Заполняет БД пользователями для benchmark_endpoints.
+
+    Пользователи bench<N>@example.com с паролем BenchmarkPass123 и
+    профилями создаются пачками через bulk_create, плюс админ
+    bench-staff@example.com для списка пользователей.
+
+    Пример:
+        python manage.py seed_benchmark_data --users 10000
+    """
+    help = 'Создает тестовых пользователей для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42, help='Seed Faker для повторяемых данных')
+        parser.add_argument('--reset', action='store_true', help='Удалить ранее созданных bench пользователей')
+
+    def handle(self, *args, **options):
+        reseed_random(options['seed'])
+
+        if options['reset']:
+            deleted, _ = User.objects.filter(email__endswith='@example.com', email__startswith='bench').delete()
+            self.stdout.write(f'Удалено объектов: {deleted}')
+
+        User.objects.update_or_create(
+            email=BENCHMARK_STAFF_EMAIL,
+            defaults={'is_staff': True, 'is_active': True, 'password': benchmark_password_hash()},
+        )
+
+        existing = User.objects.filter(email__startswith='bench', email__endswith='@example.com').count() - 1
+        UserFactory.reset_sequence(max(existing, 0))
+
+        created = 0
+        while created < options['users']:
+            size = min(options['batch_size'], options['users'] - created)
+            with transaction.atomic():
+                users = User.objects.bulk_create(UserFactory.build_batch(size))
+                UserProfile.objects.bulk_create([UserProfileFactory.build(user=user) for user in users])
+            created += size
+            self.stdout.write(f'Создано пользователей: {created}/{options["users"]}')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, всего bench пользователей: {existing + created}'))
@@ -1,6 +1,10 @@
 from django.contrib.auth.models import BaseUserManager
-from django.db import models
-from django.db.models import Q
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import models, connections
+from django.db.models import Q, Value, FloatField
+from django.db.models.functions import Greatest
+
+from config.db_router import read_from_replica
 
 class UserQuerySet(models.QuerySet):
     """
@@ -43,17 +47,58 @@ class UserQuerySet(models.QuerySet):
         """
         return self.filter(is_staff=True)
     
-    def search(self, query):
+    def search(self, *terms):
         """
-        Поиск пользователей по email, имени или фамилии.
+        Поиск пользователей по email, имени, фамилии или телефону.
+        
+        Каждое слово должно найтись хотя бы в одном из полей (AND по
+        словам, OR по полям - как search_fields в админке).
+        На Postgres icontains компилируется в UPPER(col) LIKE UPPER(...),
+        что обслуживается триграммными GIN индексами (миграция 0002).
         
         User.objects.search('ivan')
+        User.objects.search('ivan', 'petrov')
+        """
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(email__icontains=term) |
+                Q(first_name__icontains=term) |
+                Q(last_name__icontains=term) |
+                Q(phone__icontains=term)
+            )
+        return self.filter(condition)
+    
+    def ranked_search(self, *terms):
+        """
+        Поиск с ранжированием по релевантности.
+        
+        На Postgres ранг - сумма по словам максимального триграммного
+        сходства (pg_trgm) слова с email, именем, фамилией или телефоном.
+        На остальных БД ранг постоянный, и результаты упорядочены только
+        по id. Порядок (-search_rank, -id) используется для keyset пагинации.
+        
+        User.objects.ranked_search('ivan', 'petrov')
         """
-        return self.filter(
-            Q(email__icontains=query),
-            Q(first_name__icontains=query),
-            Q(last_name__icontains=query)
-        )
+        queryset = self.search(*terms)
+        
+        if connections[self.db].vendor == 'postgresql':
+            rank = sum(
+                (
+                    Greatest(
+                        TrigramWordSimilarity(term, 'email'),
+                        TrigramWordSimilarity(term, 'first_name'),
+                        TrigramWordSimilarity(term, 'last_name'),
+                        TrigramWordSimilarity(term, 'phone'),
+                    )
+                    for term in terms
+                ),
+                Value(0.0, output_field=FloatField()),
+            )
+        else:
+            rank = Value(0.0, output_field=FloatField())
+        
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', '-id')
         
 
 class UserManager(BaseUserManager):
@@ -75,6 +120,7 @@ class UserManager(BaseUserManager):
         Теперь все запросы будут использовать UseQuerySet
         и получат доступ к методам active(), verified(), итд
         """
+        return UserQuerySet(self.model, using=self._db)
         
     def active(self):
         """Proxy метод для UserQuerySet.active()"""
@@ -89,14 +135,17 @@ class UserManager(BaseUserManager):
     def staff(self):
         return self.get_queryset().staff()
     
-    def search(self, query):
-        return self.get_queryset().search(query)
+    def search(self, *terms):
+        return self.get_queryset().search(*terms)
+    
+    def ranked_search(self, *terms):
+        return self.get_queryset().ranked_search(*terms)
 
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('Email обязателен для создания пользователя')
         
-        email = normalize_email(email)
+        email = self.normalize_email(email)
         
         extra_fields.setdefault('is_staff', False)
         extra_fields.setdefault('is_superuser', False)
@@ -143,4 +192,7 @@ class UserManager(BaseUserManager):
             if User.objects.email_exists('test@example.com'):
                 print('Email уже занят')
         """  
-        return self.filter(email__iexact=email).exists()      
+        # Предварительная проверка: читаем из реплики, окончательно
+        # уникальность гарантирует unique индекс в primary
+        with read_from_replica():
+            return self.filter(email__iexact=email).exists()      
@@ -0,0 +1,182 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:35
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('email', models.EmailField(db_index=True, error_messages={'unique': 'Пользователь с таким email уже существует.'}, max_length=254, unique=True)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('is_email_verified', models.BooleanField(default=False)),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_login_at', models.DateTimeField(blank=True, null=True)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'verbose_name': 'Пользователь',
+                'verbose_name_plural': 'Пользователи',
+                'db_table': 'users',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmailVerificationToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('is_used', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(verbose_name='Действителен до')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_verification_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Токен верификации email',
+                'verbose_name_plural': 'Токены верификации email',
+                'db_table': 'email_verification_tokens',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aggregate_id', models.UUIDField(db_index=True, verbose_name='UUID пользователя')),
+                ('event_type', models.CharField(max_length=100, verbose_name='Тип события')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('published_at', models.DateTimeField(blank=True, null=True, verbose_name='Опубликовано')),
+            ],
+            options={
+                'verbose_name': 'Событие outbox',
+                'verbose_name_plural': 'События outbox',
+                'db_table': 'outbox_events',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('published_at__isnull', True)), fields=['id'], name='outbox_unpublished_idx'), models.Index(fields=['published_at'], name='outbox_published_at_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PasswordResetToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('is_used', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(verbose_name='Действителен до')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='password_reset_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Токен сброса пароля',
+                'verbose_name_plural': 'Токены сброса пароля',
+                'db_table': 'password_reset_tokens',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserErasureJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('anonymize', 'Анонимизация'), ('delete', 'Удаление')], max_length=20, verbose_name='Режим')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('completed', 'Завершена'), ('cancelled', 'Отменена'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('reason', models.CharField(blank=True, max_length=255, verbose_name='Причина')),
+                ('user_ids', models.JSONField(default=list, verbose_name='Пользователи')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего')),
+                ('deactivated', models.PositiveIntegerField(default=0, verbose_name='Деактивировано')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('error_count', models.PositiveSmallIntegerField(default=0, verbose_name='Ошибок подряд')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начата')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Инициатор')),
+            ],
+            options={
+                'verbose_name': 'Задача удаления пользователей',
+                'verbose_name_plural': 'Задачи удаления пользователей',
+                'db_table': 'user_erasure_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('avatar', models.ImageField(blank=True, null=True, upload_to='avatars/')),
+                ('avatar_thumbnails', models.JSONField(blank=True, default=dict)),
+                ('bio', models.TextField(blank=True)),
+                ('birth_date', models.DateField(blank=True, null=True)),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('address', models.TextField(blank=True)),
+                ('language', models.CharField(choices=[('ru', 'Русский'), ('en', 'English')], default='ru', max_length=50)),
+                ('timezone', models.CharField(default='Europe/Moscow', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Профиль пользователя',
+                'verbose_name_plural': 'Профили пользователей',
+                'db_table': 'user_profiles',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='users_email_4b85f2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['uuid'], name='users_uuid_4cb658_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at'], name='users_created_6541e9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user'], name='evt_user_unused_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(fields=['expires_at'], name='evt_expires_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user'], name='prt_user_unused_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['expires_at'], name='prt_expires_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usererasurejob',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'running'])), fields=['heartbeat_at'], name='erasure_active_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Триграммные GIN индексы для поиска пользователей.
+# Индексируем UPPER(col): именно так Django компилирует icontains на Postgres.
+SEARCH_INDEXES = {
+    'users_email_trgm_idx': 'email',
+    'users_first_name_trgm_idx': 'first_name',
+    'users_last_name_trgm_idx': 'last_name',
+    'users_phone_trgm_idx': 'phone',
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    CREATE INDEX CONCURRENTLY не блокирует запись в users на время
+    построения. Прерванное построение оставляет невалидный индекс - его
+    удаляем и строим заново. На других БД ничего не делает.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for index_name, column in SEARCH_INDEXES.items():
+            cursor.execute(
+                'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'WHERE c.relname = %s',
+                [index_name],
+            )
+            row = cursor.fetchone()
+            if row is not None and not row[0]:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} '
+                f'ON users USING gin (UPPER({column}) gin_trgm_ops)'
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for index_name in SEARCH_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY нельзя выполнять внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
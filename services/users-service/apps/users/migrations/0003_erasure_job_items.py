@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_user_ids(apps, schema_editor):
+    """
+    Переносит списки id незавершенных задач в user_erasure_job_items,
+    а позиции в списке - в курсоры по id пользователя.
+    """
+    UserErasureJob = apps.get_model('users', 'UserErasureJob')
+    UserErasureJobItem = apps.get_model('users', 'UserErasureJobItem')
+    jobs = UserErasureJob.objects.filter(status__in=['pending', 'running', 'failed'])
+    for job in jobs.iterator():
+        ids = job.user_ids
+        UserErasureJobItem.objects.bulk_create(
+            (UserErasureJobItem(job_id=job.pk, user_id=user_id) for user_id in ids), batch_size=1000
+        )
+        job.deactivate_cursor = ids[job.deactivated - 1] if job.deactivated else 0
+        job.process_cursor = ids[job.processed - 1] if job.processed else 0
+        job.save(update_fields=['deactivate_cursor', 'process_cursor'])
+
+
+def copy_user_ids_back(apps, schema_editor):
+    UserErasureJob = apps.get_model('users', 'UserErasureJob')
+    UserErasureJobItem = apps.get_model('users', 'UserErasureJobItem')
+    for job in UserErasureJob.objects.iterator():
+        job.user_ids = list(
+            UserErasureJobItem.objects.filter(job_id=job.pk).order_by('user_id').values_list('user_id', flat=True)
+        )
+        job.save(update_fields=['user_ids'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usererasurejob',
+            name='deactivate_cursor',
+            field=models.BigIntegerField(default=0, verbose_name='Курсор деактивации'),
+        ),
+        migrations.AddField(
+            model_name='usererasurejob',
+            name='process_cursor',
+            field=models.BigIntegerField(default=0, verbose_name='Курсор обработки'),
+        ),
+        migrations.CreateModel(
+            name='UserErasureJobItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(verbose_name='ID пользователя')),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='users.usererasurejob', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Пользователь задачи удаления',
+                'verbose_name_plural': 'Пользователи задачи удаления',
+                'db_table': 'user_erasure_job_items',
+                'constraints': [models.UniqueConstraint(fields=('job', 'user_id'), name='erasure_item_job_user_uniq')],
+            },
+        ),
+        migrations.RunPython(copy_user_ids, copy_user_ids_back),
+        migrations.RemoveField(
+            model_name='usererasurejob',
+            name='user_ids',
+        ),
+    ]
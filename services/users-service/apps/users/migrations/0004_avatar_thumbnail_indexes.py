@@ -0,0 +1,58 @@
+from django.db import migrations
+
+
+# Индексы по миниатюрам каждого размера (USER_SETTINGS['AVATAR_SIZES']):
+# по ним UserErasureService.delete_avatar_files проверяет, ссылается ли
+# еще какой-то профиль на миниатюру. Выражение совпадает с
+# users.utils.avatars.ThumbnailName на Postgres.
+# При смене AVATAR_SIZES нужна новая миграция с индексами новых размеров.
+THUMBNAIL_INDEXES = {
+    'user_profiles_thumb_64_idx': '64',
+    'user_profiles_thumb_128_idx': '128',
+    'user_profiles_thumb_256_idx': '256',
+}
+
+
+def create_thumbnail_indexes(apps, schema_editor):
+    """
+    CREATE INDEX CONCURRENTLY не блокирует запись в user_profiles на время
+    построения; невалидный индекс после прерванного построения удаляется
+    и строится заново. На других БД ничего не делает.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for index_name, size in THUMBNAIL_INDEXES.items():
+            cursor.execute(
+                'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'WHERE c.relname = %s',
+                [index_name],
+            )
+            row = cursor.fetchone()
+            if row is not None and not row[0]:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} '
+                f"ON user_profiles ((avatar_thumbnails ->> '{size}'))"
+            )
+
+
+def drop_thumbnail_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for index_name in THUMBNAIL_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY нельзя выполнять внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ('users', '0003_erasure_job_items'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_thumbnail_indexes, drop_thumbnail_indexes),
+    ]
@@ -4,8 +4,11 @@ from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
+from django.db.models import Q
+from django.core.serializers.json import DjangoJSONEncoder
 
 from users.managers.user_manager import UserManager
+from users.utils.last_login_buffer import record_login, merge_last_login
 
 
 class User(AbstractUser):
@@ -72,9 +75,25 @@ class User(AbstractUser):
         )
         
     def update_last_login(self):
-        """Обновляет время последнего входа."""
+        """
+        Обновляет время последнего входа.
+        
+        При USER_SETTINGS['LAST_LOGIN_WRITE_BEHIND'] время пишется в Redis,
+        а в БД попадает пачкой задачей flush_last_logins. Если Redis
+        недоступен, время пишется в БД сразу: вход не должен падать.
+        """
         self.last_login_at = timezone.now()
+        if settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False):
+            if record_login(self.pk, self.last_login_at):
+                return
         self.save(update_fields=['last_login_at'])
+    
+    @property
+    def fresh_last_login_at(self):
+        """Время последнего входа с учетом еще не записанного в БД буфера."""
+        if not settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False):
+            return self.last_login_at
+        return merge_last_login(self.last_login_at, self.pk)
         
     
 class UserProfile(models.Model):
@@ -85,6 +104,8 @@ class UserProfile(models.Model):
         verbose_name='Пользователь'
     )
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # {размер: имя файла в STORAGES['avatars']}, заполняет process_avatar
+    avatar_thumbnails = models.JSONField(default=dict, blank=True)
     bio = models.TextField(blank=True)
     birth_date = models.DateField(blank=True, null=True)
     
@@ -140,6 +161,12 @@ class EmailVerificationToken(models.Model):
         verbose_name = 'Токен верификации email'
         verbose_name_plural = 'Токены верификации email'
         ordering = ['-created_at']
+        indexes = [
+            # resend_verification_email / поиск активных токенов пользователя
+            models.Index(fields=['user'], condition=Q(is_used=False), name='evt_user_unused_idx'),
+            # Фоновая очистка истекших токенов
+            models.Index(fields=['expires_at'], name='evt_expires_at_idx'),
+        ]
     
     def __str__(self):
         return f'Токен верификации для {self.user.email}'
@@ -179,6 +206,12 @@ class PasswordResetToken(models.Model):
         verbose_name = 'Токен сброса пароля'
         verbose_name_plural = 'Токены сброса пароля'
         ordering = ['-created_at']
+        indexes = [
+            # Активные токены сброса пароля пользователя
+            models.Index(fields=['user'], condition=Q(is_used=False), name='prt_user_unused_idx'),
+            # Фоновая очистка истекших токенов
+            models.Index(fields=['expires_at'], name='prt_expires_at_idx'),
+        ]
         
     def __str__(self):
         return f'Токен сброса пароля для {self.user.email}'
@@ -197,3 +230,138 @@ class PasswordResetToken(models.Model):
     @property
     def is_valid(self):
         return not self.is_used and not self.is_expired
+
+
+class OutboxEvent(models.Model):
+    """
+    Событие жизненного цикла пользователя для публикации в брокер.
+
+    Пишется в той же транзакции, что и изменение пользователя,
+    и публикуется задачей publish_outbox_events (transactional outbox).
+    """
+    aggregate_id = models.UUIDField('UUID пользователя', db_index=True)
+    event_type = models.CharField('Тип события', max_length=100)
+    payload = models.JSONField('Данные', encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField('Опубликовано', blank=True, null=True)
+    
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Событие outbox'
+        verbose_name_plural = 'События outbox'
+        ordering = ['id']
+        indexes = [
+            # Выборка неопубликованных событий релеем
+            models.Index(fields=['id'], condition=Q(published_at__isnull=True), name='outbox_unpublished_idx'),
+            # Очистка опубликованных событий
+            models.Index(fields=['published_at'], name='outbox_published_at_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.event_type} для {self.aggregate_id}'
+
+
+class UserErasureJob(models.Model):
+    """
+    Фоновая деактивация и удаление/анонимизация набора пользователей.
+
+    Выполняется задачей run_erasure_job небольшими пачками: сначала все
+    пользователи деактивируются, затем удаляются или анонимизируются.
+    Пользователи задачи лежат в UserErasureJobItem, пачка - следующие по
+    user_id после курсора. Курсоры продвигаются в той же транзакции, что
+    и обработка пачки, поэтому после падения воркера задача продолжает с
+    места остановки.
+    """
+    MODE_ANONYMIZE = 'anonymize'
+    MODE_DELETE = 'delete'
+    MODE_CHOICES = [
+        (MODE_ANONYMIZE, 'Анонимизация'),
+        (MODE_DELETE, 'Удаление'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_COMPLETED, 'Завершена'),
+        (STATUS_CANCELLED, 'Отменена'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    mode = models.CharField('Режим', max_length=20, choices=MODE_CHOICES)
+    status = models.CharField('Статус', max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    reason = models.CharField('Причина', max_length=255, blank=True)
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Инициатор'
+    )
+    total = models.PositiveIntegerField('Всего', default=0)
+    deactivated = models.PositiveIntegerField('Деактивировано', default=0)
+    processed = models.PositiveIntegerField('Обработано', default=0)
+    # id последнего деактивированного / удаленного (анонимизированного) пользователя
+    deactivate_cursor = models.BigIntegerField('Курсор деактивации', default=0)
+    process_cursor = models.BigIntegerField('Курсор обработки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    # Ошибок подряд; при ERASURE_MAX_ERRORS задача переводится в failed
+    error_count = models.PositiveSmallIntegerField('Ошибок подряд', default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField('Начата', blank=True, null=True)
+    finished_at = models.DateTimeField('Завершена', blank=True, null=True)
+    # Обновляется после каждой пачки; по нему находятся зависшие задачи
+    heartbeat_at = models.DateTimeField('Последняя активность', blank=True, null=True)
+
+    class Meta:
+        db_table = 'user_erasure_jobs'
+        verbose_name = 'Задача удаления пользователей'
+        verbose_name_plural = 'Задачи удаления пользователей'
+        ordering = ['-created_at']
+        indexes = [
+            # Поиск незавершенных задач для возобновления
+            models.Index(fields=['heartbeat_at'], condition=Q(status__in=['pending', 'running']),
+                         name='erasure_active_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_mode_display()} {self.total} пользователей ({self.get_status_display()})'
+
+    @property
+    def progress(self) -> float:
+        """Доля выполненной работы (деактивация + удаление)."""
+        if not self.total:
+            return 1.0
+        return round((self.deactivated + self.processed) / (2 * self.total), 4)
+
+
+class UserErasureJobItem(models.Model):
+    """Пользователь задачи удаления (UserErasureJob)."""
+    job = models.ForeignKey(
+        UserErasureJob,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name='Задача',
+        # Выборки по job покрывает индекс erasure_item_job_user_uniq
+        db_index=False
+    )
+    # Не ForeignKey: в режиме удаления пользователь удаляется раньше задачи
+    user_id = models.BigIntegerField('ID пользователя')
+
+    class Meta:
+        db_table = 'user_erasure_job_items'
+        verbose_name = 'Пользователь задачи удаления'
+        verbose_name_plural = 'Пользователи задачи удаления'
+        constraints = [
+            # Пачки выбираются по (job, user_id > курсор) этим индексом
+            models.UniqueConstraint(fields=['job', 'user_id'], name='erasure_item_job_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.job_id}: {self.user_id}'
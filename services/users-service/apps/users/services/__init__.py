@@ -0,0 +1,2 @@
+from users.services.user_service import UserService
+from users.services.user_cache_service import UserCacheService
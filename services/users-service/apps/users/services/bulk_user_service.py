@@ -0,0 +1,255 @@
+import csv
+import io
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from users.models import User, UserProfile
+from users.services.outbox_service import OutboxService, USER_REGISTERED
+
+logger = logging.getLogger(__name__)
+
+
+USER_FIELDS = ['email', 'first_name', 'last_name', 'phone', 'is_active', 'is_email_verified']
+PROFILE_FIELDS = ['bio', 'country', 'city', 'address', 'language', 'timezone']
+EXPORT_FIELDS = ['uuid', *USER_FIELDS, 'created_at', *[f'profile__{field}' for field in PROFILE_FIELDS]]
+
+BOOLEAN_TRUE = {'1', 'true', 'yes', 'y', 't'}
+
+
+def _init_hash_worker():
+    """Инициализирует Django в процессе пула (нужно при spawn)."""
+    import django
+    django.setup()
+
+
+def _to_bool(value, default: bool) -> bool:
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in BOOLEAN_TRUE
+
+
+class BulkUserService:
+    """
+    Массовый импорт и экспорт пользователей.
+
+    Импорт читает CSV или NDJSON потоком, хэширует пароли в пуле процессов
+    (или принимает готовые хэши в поле password_hash) и пишет пользователей
+    и профили пачками через bulk_create. Каждая пачка - своя транзакция,
+    в ней же пишутся события user.registered в outbox.
+
+    Пример:
+        with open('users.ndjson') as f:
+            result = BulkUserService.import_users(BulkUserService.iter_rows(f, 'ndjson'))
+    """
+
+    @staticmethod
+    def iter_rows(stream, fmt: str) -> Iterator[Dict]:
+        """
+        Потоково читает строки CSV (с заголовком) или NDJSON.
+
+        stream - текстовый поток (бинарный оборачиваем в io.TextIOWrapper).
+        """
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+        elif fmt == 'ndjson':
+            for line in stream:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            raise ValueError(f'Неподдерживаемый формат: {fmt}')
+
+    @staticmethod
+    def import_users(
+        rows: Iterable[Dict],
+        chunk_size: int = 1000,
+        workers: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        Импортирует пользователей пачками по chunk_size.
+
+        Пользователи с уже существующим email пропускаются, поэтому
+        повторный импорт того же файла безопасен. workers=0 - пароли
+        хэшируются в текущем процессе (без пула, например в воркере Celery).
+        on_progress(stats) вызывается после каждой пачки.
+
+        Не бросает исключений: если импорт прервался (битая строка файла,
+        ошибка БД), уже закоммиченные пачки остаются, completed=False, а
+        причина - в failure. Возвращает статистику: processed, created,
+        skipped, errors, completed, seconds, rows_per_sec.
+        """
+        started = time.monotonic()
+        stats = {'processed': 0, 'created': 0, 'skipped': 0, 'errors': [], 'completed': False}
+        rows = iter(rows)
+
+        try:
+            with ExitStack() as stack:
+                pool = None
+                if workers != 0:
+                    pool = stack.enter_context(
+                        ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker)
+                    )
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    BulkUserService._import_chunk(chunk, pool, stats)
+                    logger.info(f'Импорт пользователей: обработано {stats["processed"]}, создано {stats["created"]}')
+                    if on_progress:
+                        on_progress(stats)
+            stats['completed'] = True
+        except Exception as e:
+            stats['failure'] = str(e)
+            logger.exception(f'Импорт пользователей прерван после {stats["created"]} созданных: {e}')
+
+        seconds = time.monotonic() - started
+        stats['seconds'] = round(seconds, 2)
+        stats['rows_per_sec'] = round(stats['processed'] / seconds, 1) if seconds else 0.0
+        logger.info(
+            f'Импорт пользователей завершен: создано {stats["created"]}, пропущено {stats["skipped"]}, '
+            f'ошибок {len(stats["errors"])}, {stats["rows_per_sec"]} строк/сек'
+        )
+        return stats
+
+    @staticmethod
+    def _hash_passwords(passwords: List[str], pool: Optional[ProcessPoolExecutor]) -> Iterator[str]:
+        if pool is None:
+            return map(make_password, passwords)
+        return iter(pool.map(make_password, passwords, chunksize=max(len(passwords) // 32, 1)))
+
+    @staticmethod
+    def _import_chunk(chunk: List[Dict], pool: Optional[ProcessPoolExecutor], stats: Dict) -> None:
+        """Валидирует, хэширует и сохраняет одну пачку строк."""
+        offset = stats['processed']
+
+        # Ключ - email в нижнем регистре: email сравниваются без учета
+        # регистра (get_by_email - iexact), а сохраняется он как в
+        # create_user, с нормализацией только домена
+        valid = {}
+        for line_number, row in enumerate(chunk, start=offset + 1):
+            email = User.objects.normalize_email((row.get('email') or '').strip())
+            if not email:
+                stats['errors'].append({'row': line_number, 'error': 'Не указан email'})
+                continue
+            if email.lower() in valid:
+                stats['skipped'] += 1
+                continue
+            password_hash = row.get('password_hash')
+            if password_hash:
+                try:
+                    identify_hasher(password_hash)
+                except ValueError:
+                    stats['errors'].append({'row': line_number, 'error': 'Неизвестный формат password_hash'})
+                    continue
+            valid[email.lower()] = (email, line_number, row)
+
+        existing = set(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=list(valid)).values_list('email_lower', flat=True)
+        )
+        stats['skipped'] += len(existing)
+        new_rows = [value for key, value in valid.items() if key not in existing]
+        if not new_rows:
+            stats['processed'] += len(chunk)
+            return
+
+        # Хэшируем только открытые пароли, параллельно в пуле процессов
+        to_hash = [row['password'] for _, _, row in new_rows if not row.get('password_hash') and row.get('password')]
+        hashed = BulkUserService._hash_passwords(to_hash, pool)
+        unusable = make_password(None)
+
+        users = []
+        for email, _, row in new_rows:
+            if row.get('password_hash'):
+                password = row['password_hash']
+            elif row.get('password'):
+                password = next(hashed)
+            else:
+                password = unusable
+            users.append(User(
+                email=email,
+                password=password,
+                first_name=row.get('first_name') or '',
+                last_name=row.get('last_name') or '',
+                phone=row.get('phone') or None,
+                is_active=_to_bool(row.get('is_active'), True),
+                is_email_verified=_to_bool(row.get('is_email_verified'), False),
+            ))
+
+        try:
+            with transaction.atomic():
+                created = User.objects.bulk_create(users, batch_size=len(users))
+                profiles = [
+                    UserProfile(user=user, **BulkUserService._profile_fields(row))
+                    for user, (_, _, row) in zip(created, new_rows)
+                ]
+                UserProfile.objects.bulk_create(profiles, batch_size=len(profiles))
+                OutboxService.record_many([user.pk for user in created], USER_REGISTERED)
+            stats['created'] += len(created)
+        except IntegrityError:
+            # Конфликт с параллельной регистрацией или уникальным полем:
+            # сохраняем пачку построчно, чтобы ошибку получила только своя строка
+            BulkUserService._import_rows(users, new_rows, stats)
+        stats['processed'] += len(chunk)
+
+    @staticmethod
+    def _import_rows(users: List[User], new_rows: List, stats: Dict) -> None:
+        """Построчное сохранение пачки: каждая строка - своя транзакция."""
+        for user, (_, line_number, row) in zip(users, new_rows):
+            # bulk_create в откаченной транзакции мог проставить pk
+            user.pk = None
+            user._state.adding = True
+            try:
+                with transaction.atomic():
+                    user.save()
+                    UserProfile.objects.create(user=user, **BulkUserService._profile_fields(row))
+                    OutboxService.record(user, USER_REGISTERED)
+            except IntegrityError as e:
+                stats['errors'].append({'row': line_number, 'error': f'Конфликт при сохранении: {e}'.splitlines()[0]})
+                continue
+            stats['created'] += 1
+
+    @staticmethod
+    def _profile_fields(row: Dict) -> Dict:
+        return {field: row[field] for field in PROFILE_FIELDS if row.get(field)}
+
+    @staticmethod
+    def export_users(fmt: str, include_password_hash: bool = False) -> Iterator[str]:
+        """
+        Потоково выгружает пользователей в CSV или NDJSON.
+
+        Строки читаются через iterator(), без загрузки всей таблицы в память.
+        С include_password_hash выгрузку можно импортировать в другой
+        инстанс без сброса паролей.
+        """
+        fields = EXPORT_FIELDS + (['password'] if include_password_hash else [])
+        columns = [field.replace('profile__', '') for field in fields]
+        columns = ['password_hash' if column == 'password' else column for column in columns]
+
+        queryset = User.objects.order_by('id').values_list(*fields).iterator(chunk_size=2000)
+
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # Первой строкой выгрузки всегда идет заголовок CSV
+            for values in chain([columns], queryset):
+                writer.writerow(values)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        elif fmt == 'ndjson':
+            for values in queryset:
+                yield json.dumps(dict(zip(columns, values)), default=str, ensure_ascii=False) + '\n'
+        else:
+            raise ValueError(f'Неподдерживаемый формат: {fmt}')
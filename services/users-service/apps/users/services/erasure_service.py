@@ -0,0 +1,314 @@
+import logging
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Iterable, List, Optional
+from django.contrib.auth.hashers import make_password
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import CharField, Q, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from users.models import (
+    User, UserProfile, EmailVerificationToken, PasswordResetToken, UserErasureJob, UserErasureJobItem
+)
+from users.services.outbox_service import OutboxService, USER_DEACTIVATED, USER_DELETED, USER_ANONYMIZED
+from users.services.user_cache_service import UserCacheService
+from users.utils.avatars import ThumbnailName, get_thumbnail_storage
+
+logger = logging.getLogger(__name__)
+
+
+ERASED_EMAIL_DOMAIN = 'erased.invalid'
+
+
+class UserErasureService:
+    """
+    Фоновая деактивация и удаление/анонимизация пользователей.
+
+    Работа разбита на пачки, каждая - короткая транзакция: обработка
+    пачки и сдвиг курсора задачи коммитятся вместе, поэтому после падения
+    воркера пачка либо выполнена целиком, либо не начата.
+
+    Пример:
+        job = UserErasureService.create_job(user_ids, UserErasureJob.MODE_ANONYMIZE, requested_by=admin)
+        # дальше работает users.tasks.erasure_tasks.run_erasure_job
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def create_job(
+        user_ids: Iterable[int],
+        mode: str,
+        requested_by: Optional[User] = None,
+        reason: str = '',
+    ) -> UserErasureJob:
+        """
+        Создает задачу и ставит ее в очередь после коммита.
+
+        Суперпользователи и сам инициатор в задачу не попадают.
+        """
+        if mode not in dict(UserErasureJob.MODE_CHOICES):
+            raise ValueError(f'Неизвестный режим: {mode}')
+
+        users = User.objects.filter(pk__in=set(user_ids), is_superuser=False)
+        if requested_by is not None:
+            users = users.exclude(pk=requested_by.pk)
+        ids = sorted(users.values_list('pk', flat=True))
+        if not ids:
+            raise ValueError('Нет пользователей для обработки')
+
+        job = UserErasureJob.objects.create(
+            mode=mode,
+            reason=reason,
+            requested_by=requested_by,
+            total=len(ids),
+        )
+        UserErasureJobItem.objects.bulk_create(
+            (UserErasureJobItem(job=job, user_id=user_id) for user_id in ids), batch_size=1000
+        )
+        transaction.on_commit(lambda: UserErasureService.enqueue(job.pk))
+        logger.info(f'Создана задача удаления #{job.pk}: {job.get_mode_display()}, пользователей {job.total}')
+        return job
+
+    @staticmethod
+    def enqueue(job_id: int) -> None:
+        # Импорт здесь: users.tasks при загрузке импортирует users.services
+        from users.tasks.erasure_tasks import run_erasure_job
+        try:
+            run_erasure_job.delay(job_id)
+        except Exception as e:
+            # Задачу подхватит периодический resume_erasure_jobs
+            logger.warning(f'Не удалось поставить задачу удаления #{job_id} в очередь: {e}')
+
+    @staticmethod
+    def start(job_id: int) -> Optional[UserErasureJob]:
+        """Переводит задачу в running. None - задача уже не активна."""
+        with transaction.atomic():
+            job = UserErasureJob.objects.select_for_update().filter(
+                pk=job_id, status__in=UserErasureJob.ACTIVE_STATUSES
+            ).first()
+            if job is None:
+                return None
+            now = timezone.now()
+            job.status = UserErasureJob.STATUS_RUNNING
+            job.started_at = job.started_at or now
+            job.heartbeat_at = now
+            job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+        return job
+
+    @staticmethod
+    def cancel(job: UserErasureJob) -> bool:
+        """
+        Отменяет задачу. Уже обработанные пачки не откатываются.
+
+        Возвращает False, если задача уже завершена.
+        """
+        updated = UserErasureJob.objects.filter(
+            pk=job.pk, status__in=UserErasureJob.ACTIVE_STATUSES
+        ).update(status=UserErasureJob.STATUS_CANCELLED, finished_at=timezone.now())
+        if updated:
+            logger.info(f'Задача удаления #{job.pk} отменена')
+        return bool(updated)
+
+    @staticmethod
+    def resume(job: UserErasureJob) -> bool:
+        """Перезапускает задачу после ошибки (failed) с места остановки."""
+        updated = UserErasureJob.objects.filter(pk=job.pk, status=UserErasureJob.STATUS_FAILED).update(
+            status=UserErasureJob.STATUS_PENDING, error_count=0, finished_at=None
+        )
+        if updated:
+            UserErasureService.enqueue(job.pk)
+            logger.info(f'Задача удаления #{job.pk} возобновлена')
+        return bool(updated)
+
+    @staticmethod
+    def process_chunk(job_id: int, size: int) -> bool:
+        """
+        Обрабатывает следующую пачку задачи.
+
+        Сначала деактивируются все пользователи задачи (вход закрыт сразу),
+        затем они удаляются или анонимизируются. Возвращает True, если
+        работа осталась.
+        """
+        with transaction.atomic():
+            job = UserErasureJob.objects.select_for_update().get(pk=job_id)
+            if job.status != UserErasureJob.STATUS_RUNNING:
+                return False
+
+            if job.deactivated < job.total:
+                ids = UserErasureService.next_user_ids(job.pk, job.deactivate_cursor, size)
+                if ids:
+                    UserErasureService.deactivate_users(ids)
+                    job.deactivated += len(ids)
+                    job.deactivate_cursor = ids[-1]
+                else:
+                    job.deactivated = job.total
+            else:
+                ids = UserErasureService.next_user_ids(job.pk, job.process_cursor, size)
+                if ids:
+                    if job.mode == UserErasureJob.MODE_DELETE:
+                        UserErasureService.delete_users(ids)
+                    else:
+                        UserErasureService.anonymize_users(ids)
+                    job.processed += len(ids)
+                    job.process_cursor = ids[-1]
+                else:
+                    job.processed = job.total
+
+            job.heartbeat_at = timezone.now()
+            job.error_count = 0
+            if job.processed >= job.total:
+                job.status = UserErasureJob.STATUS_COMPLETED
+                job.finished_at = job.heartbeat_at
+            job.save(update_fields=[
+                'deactivated', 'processed', 'deactivate_cursor', 'process_cursor',
+                'heartbeat_at', 'error_count', 'status', 'finished_at'
+            ])
+
+        if job.status == UserErasureJob.STATUS_COMPLETED:
+            logger.info(f'Задача удаления #{job.pk} завершена: пользователей {job.total}')
+        return job.status == UserErasureJob.STATUS_RUNNING
+
+    @staticmethod
+    def next_user_ids(job_id: int, cursor: int, size: int) -> List[int]:
+        """Следующие size пользователей задачи после курсора (по возрастанию id)."""
+        return list(
+            UserErasureJobItem.objects.filter(job_id=job_id, user_id__gt=cursor)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)[:size]
+        )
+
+    @staticmethod
+    def record_error(job_id: int, error: Exception, max_errors: int) -> None:
+        """Запоминает ошибку пачки; после max_errors подряд задача - failed."""
+        job = UserErasureJob.objects.get(pk=job_id)
+        job.error_count += 1
+        job.last_error = f'{type(error).__name__}: {error}'
+        job.heartbeat_at = timezone.now()
+        if job.error_count >= max_errors and job.status == UserErasureJob.STATUS_RUNNING:
+            job.status = UserErasureJob.STATUS_FAILED
+            job.finished_at = job.heartbeat_at
+        job.save(update_fields=['error_count', 'last_error', 'heartbeat_at', 'status', 'finished_at'])
+
+    @staticmethod
+    def deactivate_users(user_ids: List[int]) -> None:
+        """Деактивирует пачку пользователей. Вызывать внутри транзакции."""
+        ids = list(
+            User.objects.filter(pk__in=user_ids, is_active=True).values_list('pk', flat=True)
+        )
+        if not ids:
+            return
+        # Событие пишется после UPDATE: в снимке уже is_active=False
+        User.objects.filter(pk__in=ids).update(is_active=False, updated_at=timezone.now())
+        OutboxService.record_many(ids, USER_DEACTIVATED)
+        transaction.on_commit(lambda: UserErasureService.invalidate_cache(ids))
+
+    @staticmethod
+    def delete_users(user_ids: List[int]) -> None:
+        """
+        Удаляет пачку пользователей. Вызывать внутри транзакции.
+
+        Зависимые строки удаляются явными DELETE по user_id, а не каскадом
+        через collector, который грузит объекты в память.
+        """
+        avatars = UserErasureService.get_avatars(user_ids)
+        OutboxService.record_many(user_ids, USER_DELETED)
+        EmailVerificationToken.objects.filter(user_id__in=user_ids).delete()
+        PasswordResetToken.objects.filter(user_id__in=user_ids).delete()
+        UserProfile.objects.filter(user_id__in=user_ids).delete()
+        User.objects.filter(pk__in=user_ids).delete()
+        transaction.on_commit(lambda: UserErasureService.after_erase(user_ids, avatars))
+
+    @staticmethod
+    def anonymize_users(user_ids: List[int]) -> None:
+        """
+        Стирает персональные данные пачки пользователей, оставляя строки
+        (на них могут ссылаться другие сервисы по uuid). Вызывать внутри транзакции.
+        """
+        avatars = UserErasureService.get_avatars(user_ids)
+        EmailVerificationToken.objects.filter(user_id__in=user_ids).delete()
+        PasswordResetToken.objects.filter(user_id__in=user_ids).delete()
+        User.objects.filter(pk__in=user_ids).update(
+            email=Concat(Value('erased-'), Cast('pk', CharField()), Value(f'@{ERASED_EMAIL_DOMAIN}')),
+            first_name='',
+            last_name='',
+            phone='',
+            password=make_password(None),
+            is_active=False,
+            is_email_verified=False,
+            last_login=None,
+            last_login_at=None,
+            updated_at=timezone.now(),
+        )
+        UserProfile.objects.filter(user_id__in=user_ids).update(
+            avatar='',
+            avatar_thumbnails={},
+            bio='',
+            birth_date=None,
+            country='',
+            city='',
+            address='',
+            updated_at=timezone.now(),
+        )
+        OutboxService.record_many(user_ids, USER_ANONYMIZED)
+        transaction.on_commit(lambda: UserErasureService.after_erase(user_ids, avatars))
+
+    @staticmethod
+    def get_avatars(user_ids: List[int]) -> List[tuple]:
+        """(оригинал, миниатюры) аватаров пачки - файлы удаляются после коммита."""
+        return [
+            (avatar, thumbnails or {})
+            for avatar, thumbnails in UserProfile.objects.filter(user_id__in=user_ids)
+            .exclude(avatar='').exclude(avatar__isnull=True)
+            .values_list('avatar', 'avatar_thumbnails')
+        ]
+
+    @staticmethod
+    def after_erase(user_ids: List[int], avatars: List[tuple]) -> None:
+        UserErasureService.invalidate_cache(user_ids)
+        UserErasureService.delete_avatar_files(avatars)
+
+    @staticmethod
+    def invalidate_cache(user_ids: List[int]) -> None:
+        for user_id in user_ids:
+            UserCacheService.invalidate(user_id)
+
+    @staticmethod
+    def delete_avatar_files(avatars: List[tuple]) -> None:
+        """
+        Удаляет файлы аватаров. Миниатюры общие для одинаковых картинок
+        (имя - хэш содержимого), поэтому удаляются только те, на которые
+        больше не ссылается ни один профиль.
+
+        Миниатюра одного размера лежит только под своим ключом, поэтому
+        ссылки ищутся точным сравнением по ключу - одно условие на размер
+        (индексы user_profiles_thumb_*_idx, миграция 0004).
+        """
+        names_by_size = defaultdict(set)
+        for _, thumbnails in avatars:
+            for size, name in thumbnails.items():
+                names_by_size[size].add(name)
+        names = set().union(*names_by_size.values())
+        if names:
+            still_used = UserProfile.objects.alias(**{
+                f'thumb_{size}': ThumbnailName(size) for size in names_by_size
+            }).filter(reduce(or_, (
+                Q(**{f'thumb_{size}__in': list(size_names)}) for size, size_names in names_by_size.items()
+            ))).values_list('avatar_thumbnails', flat=True)
+            names -= {name for thumbnails in still_used for name in thumbnails.values()}
+
+        thumbnail_storage = get_thumbnail_storage()
+        for avatar, _ in avatars:
+            UserErasureService.delete_file(default_storage, avatar)
+        for name in names:
+            UserErasureService.delete_file(thumbnail_storage, name)
+
+    @staticmethod
+    def delete_file(storage, name: str) -> None:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            # Строки уже удалены; осиротевший файл не должен ронять задачу
+            logger.warning(f'Не удалось удалить файл аватара {name}: {e}')
@@ -0,0 +1,152 @@
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """Ключ из набора ключей подписи JWT."""
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+
+
+class JWTKeyService:
+    """
+    Набор асимметричных ключей для подписи JWT (RS256 / EdDSA).
+
+    Ключи лежат в JWT_KEYS_DIR как <kid>.pem (приватный ключ в PEM).
+    Токены подписываются ключом JWT_ACTIVE_KID, а проверяются любым ключом
+    из набора. Публичные части публикуются в /.well-known/jwks.json,
+    поэтому другие сервисы проверяют токены сами, без запроса к users-service.
+
+    Ротация ключа:
+        0) если JWT_ACTIVE_KID еще не задан - задаем его равным текущему ключу
+           (при нескольких ключах без него подпись невозможна)
+        1) manage.py generate_jwt_key - новый ключ попадает в JWKS
+        2) после того как сервисы обновили JWKS, переключаем JWT_ACTIVE_KID
+        3) после истечения старых refresh токенов удаляем старый .pem
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_keys() -> Dict[str, SigningKey]:
+        """Загружает все ключи из JWT_KEYS_DIR (один раз на процесс)."""
+        keys_dir = Path(settings.JWT_KEYS_DIR)
+        keys = {}
+
+        if not keys_dir.is_dir():
+            logger.warning(f'Каталог ключей JWT не найден: {keys_dir}')
+            return keys
+
+        for pem_path in sorted(keys_dir.glob('*.pem')):
+            private_key = serialization.load_pem_private_key(pem_path.read_bytes(), password=None)
+            keys[pem_path.stem] = SigningKey(
+                kid=pem_path.stem,
+                algorithm=JWTKeyService.get_algorithm(private_key),
+                private_key=private_key,
+                public_key=private_key.public_key(),
+            )
+
+        logger.info(f'Загружено ключей JWT: {len(keys)}')
+        return keys
+
+    @staticmethod
+    def get_algorithm(private_key) -> str:
+        """Определяет алгоритм подписи по типу ключа."""
+        if isinstance(private_key, rsa.RSAPrivateKey):
+            return 'RS256'
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            return 'EdDSA'
+        raise ValueError(f'Неподдерживаемый тип ключа JWT: {type(private_key).__name__}')
+
+    @staticmethod
+    def get_active_key() -> Optional[SigningKey]:
+        """
+        Возвращает ключ для подписи новых токенов.
+
+        Без JWT_ACTIVE_KID допустим только единственный ключ: при ротации
+        новый ключ не должен подписывать токены, пока сервисы не получили
+        его через JWKS, поэтому выбор всегда явный.
+        """
+        keys = JWTKeyService.get_keys()
+        if not keys:
+            return None
+
+        active_kid = settings.JWT_ACTIVE_KID
+        if active_kid:
+            if active_kid not in keys:
+                raise ValueError(f'Активный ключ JWT не найден: {active_kid}')
+            return keys[active_kid]
+        if len(keys) > 1:
+            raise ValueError(f'Загружено несколько ключей JWT ({", ".join(sorted(keys))}), задайте JWT_ACTIVE_KID')
+        return next(iter(keys.values()))
+
+    @staticmethod
+    def get_key(kid: str) -> Optional[SigningKey]:
+        """Возвращает ключ по kid из заголовка токена."""
+        return JWTKeyService.get_keys().get(kid)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_jwks() -> Dict[str, List[Dict]]:
+        """
+        Публичные ключи в формате JWKS (RFC 7517).
+
+        Пример: JWTKeyService.get_jwks() -> {'keys': [{'kid': ..., 'kty': 'RSA', ...}]}
+        """
+        jwks = []
+        for key in JWTKeyService.get_keys().values():
+            if key.algorithm == 'RS256':
+                jwk = RSAAlgorithm.to_jwk(key.public_key, as_dict=True)
+            else:
+                jwk = OKPAlgorithm.to_jwk(key.public_key, as_dict=True)
+            jwk.update({'kid': key.kid, 'alg': key.algorithm, 'use': 'sig'})
+            jwks.append(jwk)
+        return {'keys': jwks}
+
+    @staticmethod
+    def generate_key(kid: str, algorithm: str = 'RS256') -> Path:
+        """
+        Генерирует новый приватный ключ и сохраняет его в JWT_KEYS_DIR.
+
+        Пример: JWTKeyService.generate_key('2026-10-17', algorithm='EdDSA')
+        """
+        if algorithm == 'RS256':
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        elif algorithm == 'EdDSA':
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            raise ValueError(f'Неподдерживаемый алгоритм: {algorithm}')
+
+        keys_dir = Path(settings.JWT_KEYS_DIR)
+        keys_dir.mkdir(parents=True, exist_ok=True)
+        pem_path = keys_dir / f'{kid}.pem'
+        if pem_path.exists():
+            raise ValueError(f'Ключ {kid} уже существует')
+
+        pem_path.write_bytes(private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
+        pem_path.chmod(0o600)
+
+        JWTKeyService.reset_cache()
+        logger.info(f'Сгенерирован ключ JWT: {kid} ({algorithm})')
+        return pem_path
+
+    @staticmethod
+    def reset_cache() -> None:
+        """Сбрасывает загруженные ключи (после ротации)."""
+        JWTKeyService.get_keys.cache_clear()
+        JWTKeyService.get_jwks.cache_clear()
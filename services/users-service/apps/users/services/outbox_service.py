@@ -0,0 +1,116 @@
+import logging
+from typing import Dict, Iterable, List
+from django.db import transaction
+
+from users.models import User, UserProfile, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+USER_REGISTERED = 'user.registered'
+USER_EMAIL_VERIFIED = 'user.email_verified'
+USER_UPDATED = 'user.updated'
+USER_DEACTIVATED = 'user.deactivated'
+USER_DELETED = 'user.deleted'
+USER_ANONYMIZED = 'user.anonymized'
+
+# Поля, изменение которых публикуется событием user.updated
+SNAPSHOT_USER_FIELDS = ('email', 'first_name', 'last_name', 'is_active', 'is_email_verified')
+SNAPSHOT_PROFILE_FIELDS = ('language', 'timezone')
+
+
+class OutboxService:
+    """
+    Запись событий пользователей в outbox.
+
+    Событие содержит полный снимок данных, нужных другим сервисам, поэтому
+    потребитель просто делает upsert локальной копии, а по номеру события
+    (event_id) отбрасывает устаревшие.
+
+    Пример:
+        with transaction.atomic():
+            user.save()
+            OutboxService.record(user, USER_UPDATED)
+    """
+
+    @staticmethod
+    def build_snapshot(user: User) -> Dict:
+        """Снимок данных пользователя для потребителей."""
+        try:
+            profile = user.profile
+        except UserProfile.DoesNotExist:
+            profile = None
+        return {
+            'uuid': str(user.uuid),
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'full_name': user.get_full_name(),
+            'is_active': user.is_active,
+            'is_email_verified': user.is_email_verified,
+            'language': profile.language if profile else None,
+            'timezone': profile.timezone if profile else None,
+            'updated_at': user.updated_at,
+        }
+
+    @staticmethod
+    def record(user: User, event_type: str) -> OutboxEvent:
+        """
+        Пишет событие в outbox. Вызывать внутри транзакции изменения.
+
+        После коммита будится релей, чтобы событие ушло без ожидания beat.
+        """
+        if not transaction.get_connection().in_atomic_block:
+            raise RuntimeError('OutboxService.record должен вызываться внутри transaction.atomic')
+
+        # Снимок строим по строке из БД, а не по объекту в памяти (он может
+        # быть устаревшим). Блокировка строки упорядочивает события одного
+        # пользователя: id события растет в порядке коммитов
+        current = User.objects.select_for_update(of=('self',)).select_related('profile').get(pk=user.pk)
+        event = OutboxEvent.objects.create(
+            aggregate_id=current.uuid,
+            event_type=event_type,
+            payload=OutboxService.build_snapshot(current),
+        )
+        transaction.on_commit(OutboxService._wake_relay)
+        logger.debug(f'Событие {event_type} записано в outbox: {user.uuid}')
+        return event
+
+    @staticmethod
+    def record_many(user_ids: Iterable[int], event_type: str) -> List[OutboxEvent]:
+        """
+        Пишет событие для каждого из пользователей (пачкой, одним INSERT).
+
+        Как и record, вызывается внутри транзакции изменения; строки
+        блокируются по возрастанию id, чтобы параллельные пачки не
+        взаимоблокировались.
+        """
+        if not transaction.get_connection().in_atomic_block:
+            raise RuntimeError('OutboxService.record_many должен вызываться внутри transaction.atomic')
+
+        users = (
+            User.objects.select_for_update(of=('self',)).select_related('profile')
+            .filter(pk__in=list(user_ids)).order_by('pk')
+        )
+        events = OutboxEvent.objects.bulk_create([
+            OutboxEvent(
+                aggregate_id=user.uuid,
+                event_type=event_type,
+                payload=OutboxService.build_snapshot(user),
+            )
+            for user in users
+        ])
+        if events:
+            transaction.on_commit(OutboxService._wake_relay)
+        logger.debug(f'Событий {event_type} записано в outbox: {len(events)}')
+        return events
+
+    @staticmethod
+    def _wake_relay():
+        # Импорт здесь: users.tasks при загрузке импортирует users.services
+        from users.tasks.outbox_tasks import publish_outbox_events
+        try:
+            publish_outbox_events.delay()
+        except Exception as e:
+            # Событие уже в outbox, его заберет периодический запуск релея
+            logger.warning(f'Не удалось запустить релей outbox: {e}')
@@ -0,0 +1,176 @@
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class UserCacheService:
+    """
+    Кэш сериализованных данных пользователя (read-through).
+
+    Для каждого пользователя хранится версия. Ключ с данными содержит
+    версию, поэтому инвалидация - это просто смена версии: старые данные
+    становятся недоступны и истекают сами по TTL.
+
+    Данные пишутся под версией, прочитанной до их построения: если между
+    чтением из БД и записью в кэш пришла инвалидация, запись уходит под
+    старую версию и не отдается.
+
+    Пример:
+        data = UserCacheService.get_or_set(user.id, lambda: UserSerializer(user).data)
+        UserCacheService.invalidate(user.id)
+    """
+
+    VERSION_KEY = 'user:{user_id}:version'
+    PAYLOAD_KEY = 'user:{user_id}:payload:{version}'
+    HITS_KEY = 'user:cache:hits'
+    MISSES_KEY = 'user:cache:misses'
+
+    @staticmethod
+    def _get_timeout() -> int:
+        return settings.USER_SETTINGS.get('USER_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def _get_version(user_id) -> int:
+        """Возвращает текущую версию данных пользователя (создает при отсутствии)."""
+        version_key = UserCacheService.VERSION_KEY.format(user_id=user_id)
+        version = cache.get(version_key)
+        if version is None:
+            # Версия на основе времени: после вытеснения ключа из Redis
+            # не воскресим старые данные с той же версией
+            cache.add(version_key, time.time_ns(), timeout=None)
+            version = cache.get(version_key)
+        return version
+
+    @staticmethod
+    def _count(key: str) -> None:
+        """Увеличивает счетчик попаданий/промахов (INCRBY создает ключ при отсутствии)."""
+        cache.incr(key, ignore_key_check=True)
+
+    @staticmethod
+    def lookup(user_id) -> Tuple[Optional[int], Optional[Dict]]:
+        """
+        Возвращает (версия, данные или None).
+
+        Версию нужно передать в set после построения данных.
+        """
+        version = UserCacheService._get_version(user_id)
+        if version is None:
+            return None, None
+        data = cache.get(UserCacheService.PAYLOAD_KEY.format(user_id=user_id, version=version))
+        UserCacheService._count(UserCacheService.HITS_KEY if data is not None else UserCacheService.MISSES_KEY)
+        return version, data
+
+    @staticmethod
+    def get(user_id) -> Optional[Dict]:
+        """Возвращает закэшированные данные пользователя или None."""
+        return UserCacheService.lookup(user_id)[1]
+
+    @staticmethod
+    def set(user_id, data: Dict, version: Optional[int]) -> None:
+        """Кладет данные пользователя в кэш под версией, полученной из lookup."""
+        if version is None:
+            return
+        cache.set(
+            UserCacheService.PAYLOAD_KEY.format(user_id=user_id, version=version),
+            data,
+            timeout=UserCacheService._get_timeout()
+        )
+
+    @staticmethod
+    def get_or_set(user_id, build: Callable[[], Dict]) -> Dict:
+        """
+        Read-through: отдает данные из кэша, при промахе строит и кэширует.
+
+        Пример:
+            data = UserCacheService.get_or_set(user.id, lambda: UserSerializer(user).data)
+        """
+        version, data = UserCacheService.lookup(user_id)
+        if data is None:
+            data = dict(build())
+            UserCacheService.set(user_id, data, version)
+        return data
+
+    @staticmethod
+    async def _aget_version(user_id) -> int:
+        """Async версия _get_version."""
+        version_key = UserCacheService.VERSION_KEY.format(user_id=user_id)
+        version = await cache.aget(version_key)
+        if version is None:
+            await cache.aadd(version_key, time.time_ns(), timeout=None)
+            version = await cache.aget(version_key)
+        return version
+
+    @staticmethod
+    async def alookup(user_id) -> Tuple[Optional[int], Optional[Dict]]:
+        """Async версия lookup (для async views)."""
+        version = await UserCacheService._aget_version(user_id)
+        if version is None:
+            return None, None
+        data = await cache.aget(UserCacheService.PAYLOAD_KEY.format(user_id=user_id, version=version))
+        # cache.aincr - это GET + SET, поэтому счетчик увеличиваем атомарным INCRBY
+        await sync_to_async(UserCacheService._count)(
+            UserCacheService.HITS_KEY if data is not None else UserCacheService.MISSES_KEY
+        )
+        return version, data
+
+    @staticmethod
+    async def aget(user_id) -> Optional[Dict]:
+        """Async версия get (для async views)."""
+        return (await UserCacheService.alookup(user_id))[1]
+
+    @staticmethod
+    async def aset(user_id, data: Dict, version: Optional[int]) -> None:
+        """Async версия set."""
+        if version is None:
+            return
+        await cache.aset(
+            UserCacheService.PAYLOAD_KEY.format(user_id=user_id, version=version),
+            data,
+            timeout=UserCacheService._get_timeout()
+        )
+
+    @staticmethod
+    async def aget_or_set(user_id, build: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Async read-through: build - корутина, строящая данные при промахе.
+
+        Пример:
+            data = await UserCacheService.aget_or_set(user.id, lambda: build_user_data(user.id))
+        """
+        version, data = await UserCacheService.alookup(user_id)
+        if data is None:
+            data = dict(await build())
+            await UserCacheService.aset(user_id, data, version)
+        return data
+
+    @staticmethod
+    def invalidate(user_id) -> None:
+        """
+        Инвалидирует кэш пользователя сменой версии.
+
+        Пример: UserCacheService.invalidate(user.id)
+        """
+        cache.set(UserCacheService.VERSION_KEY.format(user_id=user_id), time.time_ns(), timeout=None)
+        logger.debug(f'Кэш пользователя инвалидирован: {user_id}')
+
+    @staticmethod
+    def get_stats() -> Dict:
+        """
+        Возвращает счетчики попаданий и промахов кэша.
+
+        Пример: UserCacheService.get_stats() -> {'hits': 90, 'misses': 10, 'hit_ratio': 0.9}
+        """
+        counters = cache.get_many([UserCacheService.HITS_KEY, UserCacheService.MISSES_KEY])
+        hits = counters.get(UserCacheService.HITS_KEY, 0)
+        misses = counters.get(UserCacheService.MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else 0.0,
+        }
@@ -1,15 +1,47 @@
+import hashlib
 import logging
-from typing import Dict, Optional
-from django.db import transaction
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.db import transaction, IntegrityError
 from django.conf import settings
 from django.core.mail import send_mail
 from django.utils import timezone
+from django.core.files.storage import default_storage
 
 from users.models import User, UserProfile, EmailVerificationToken, PasswordResetToken
 from users.utils.email_utils import send_verification_email, send_password_reset_email
+from users.utils.avatars import thumbnail_urls
+from users.utils.last_login_buffer import merge_last_login, amerge_last_login
+from users.services.user_cache_service import UserCacheService
+from users.services.outbox_service import (
+    OutboxService, USER_REGISTERED, USER_EMAIL_VERIFIED, USER_UPDATED, USER_DEACTIVATED,
+    USER_DELETED, SNAPSHOT_USER_FIELDS, SNAPSHOT_PROFILE_FIELDS
+)
 
 logger = logging.getLogger(__name__)
 
+# Поля, которые можно запросить в компактной выдаче для других сервисов.
+# Значение - путь для values(); поля профиля идут через LEFT JOIN.
+COMPACT_USER_FIELDS = {
+    'uuid': 'uuid',
+    'email': 'email',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'phone': 'phone',
+    'is_active': 'is_active',
+    'is_email_verified': 'is_email_verified',
+    'avatar': 'profile__avatar',
+    'avatar_thumbnails': 'profile__avatar_thumbnails',
+    'city': 'profile__city',
+    'country': 'profile__country',
+    'language': 'profile__language',
+    'timezone': 'profile__timezone',
+}
+
+DEFAULT_COMPACT_FIELDS = ['uuid', 'email', 'first_name', 'last_name', 'full_name']
+
+
 class UserService:
     """Сервис для работы с пользователями."""
     
@@ -29,15 +61,21 @@ class UserService:
             logger.warning(f'Попытка регистрации с существующим email: {email}')
             raise ValueError(f'Пользователь с email {email} уже существует.')
         
-        user = User.objects.create_user(
-            email=email,
-            password=password,
-            first_name=first_name,
-            last_name=last_name,
-            **extra_fields
-        )
+        try:
+            user = User.objects.create_user(
+                email=email,
+                password=password,
+                first_name=first_name,
+                last_name=last_name,
+                **extra_fields
+            )
+        except IntegrityError:
+            # email_exists читает из реплики и может не увидеть свежую запись
+            logger.warning(f'Попытка регистрации с существующим email: {email}')
+            raise ValueError(f'Пользователь с email {email} уже существует.')
         
         UserProfile.objects.create(user=user)
+        OutboxService.record(user, USER_REGISTERED)
         
         logger.info(f'Пользователь создан: {user.id} - {user.email}')
         
@@ -87,23 +125,39 @@ class UserService:
             logger.warning(f'Токен не найден: {token_value}')
             raise ValueError('Токен верификации не найден.')
         
-        if not token.is_valid():
+        if not token.is_valid:
             logger.warning(f'Токен невалиден: {token_value}, использован: {token.is_used}, истек: {token.is_expired}')
             raise ValueError('Токен верификации недействителен или истек.')
         
         # Обновляем пользователя
         user = token.user
         user.is_email_verified = True
-        user.save(update_fields=['is_email_verified'])
+        user.save(update_fields=['is_email_verified', 'updated_at'])
         
         # Помечаем токен как использованный
         token.is_used = True
         token.save(update_fields=['is_used'])
         
+        OutboxService.record(user, USER_EMAIL_VERIFIED)
+        
+        # Сбрасываем кэш только после коммита, чтобы не закэшировать старые данные
+        transaction.on_commit(lambda: UserCacheService.invalidate(user.id))
+        
         logger.info(f'Email успешно верифицирован: {user.email}')
         
         return user
     
+    @staticmethod
+    async def averify_email(token_value: str) -> User:
+        """
+        Async версия verify_email.
+
+        Транзакция (select_for_update, outbox, on_commit) в async ORM
+        недоступна, поэтому вся верификация выполняется одним вызовом
+        в потоке - один переход вместо перехода на каждый запрос.
+        """
+        return await sync_to_async(UserService.verify_email)(token_value)
+    
     @staticmethod
     def request_password_reset(email: str) -> None:
         """
@@ -196,11 +250,69 @@ class UserService:
         user.set_password(new_password)
         user.save(update_fields=['password'])
         
+        transaction.on_commit(lambda: UserCacheService.invalidate(user.id))
+        
         logger.info(f'Пароль успешно изменен для: {user.email}')
         
         return user
     
     @staticmethod
+    @transaction.atomic
+    def update_user(user: User, **user_data) -> User:
+        """
+        Обновляет данные пользователя (имя, фамилия, телефон).
+        
+        Пример: user = UserService.update_user(user, first_name='Иван')
+        """
+        for key, value in user_data.items():
+            setattr(user, key, value)
+        user.save()
+        
+        if set(user_data) & set(SNAPSHOT_USER_FIELDS):
+            OutboxService.record(user, USER_UPDATED)
+        
+        transaction.on_commit(lambda: UserCacheService.invalidate(user.id))
+        logger.info(f'Данные пользователя обновлены: {user.email}')
+        
+        return user
+    
+    @staticmethod
+    @transaction.atomic
+    def deactivate_user(user: User) -> User:
+        """
+        Деактивирует пользователя (мягкое удаление).
+        
+        Пример: UserService.deactivate_user(user)
+        """
+        if not user.is_active:
+            return user
+        
+        user.is_active = False
+        user.save(update_fields=['is_active', 'updated_at'])
+        OutboxService.record(user, USER_DEACTIVATED)
+        
+        transaction.on_commit(lambda: UserCacheService.invalidate(user.id))
+        logger.info(f'Пользователь деактивирован: {user.email}')
+        
+        return user
+    
+    @staticmethod
+    @transaction.atomic
+    def delete_user(user: User) -> None:
+        """
+        Удаляет пользователя вместе с профилем и токенами.
+        
+        Пример: UserService.delete_user(user)
+        """
+        user_id = user.id
+        OutboxService.record(user, USER_DELETED)
+        user.delete()
+        
+        transaction.on_commit(lambda: UserCacheService.invalidate(user_id))
+        logger.info(f'Пользователь удален: {user_id}')
+    
+    @staticmethod
+    @transaction.atomic
     def update_profile(user: User, **profile_data) -> User:
         """
         Обновляет профиль пользователя.
@@ -217,8 +329,24 @@ class UserService:
         for key, value in profile_data.items():
             if hasattr(profile, key):
                 setattr(profile, key, value)
+        
+        avatar_changed = 'avatar' in profile_data
+        if avatar_changed:
+            # Старые миниатюры не относятся к новому файлу
+            profile.avatar_thumbnails = {}
         profile.save()
         
+        if set(profile_data) & set(SNAPSHOT_PROFILE_FIELDS):
+            OutboxService.record(user, USER_UPDATED)
+        
+        transaction.on_commit(lambda: UserCacheService.invalidate(user.id))
+        if avatar_changed and profile.avatar:
+            # Декодирование и миниатюры - в воркере, не в запросе.
+            # Импорт здесь: задачи сами импортируют users.services
+            from users.tasks.avatar_tasks import process_avatar
+            avatar_name = profile.avatar.name
+            transaction.on_commit(lambda: process_avatar.delay(profile.id, avatar_name))
+        
         logger.info(f'Профиль обновлен для: {user.email}')
         
         return user
@@ -249,3 +377,134 @@ class UserService:
         
         
         
+
+    
+    @staticmethod
+    def get_resource_state(user_id) -> Optional[Tuple[str, datetime]]:
+        """
+        Возвращает (etag, last_modified) данных пользователя для conditional GET.
+
+        Читаются только временные метки пользователя и профиля (плюс время
+        входа из буфера write-behind) - без загрузки модели и сериализации.
+        None - пользователь не найден или неактивен.
+
+        Пример: etag, last_modified = UserService.get_resource_state(user.id)
+        """
+        try:
+            row = (
+                User.objects.filter(pk=user_id, is_active=True)
+                .values_list('updated_at', 'profile__updated_at', 'last_login_at')
+                .first()
+            )
+        except (TypeError, ValueError):
+            # Некорректный id из URL - пусть get_object вернет 404
+            return None
+        if row is None:
+            return None
+        
+        user_updated_at, profile_updated_at, last_login_at = row
+        if settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False):
+            last_login_at = merge_last_login(last_login_at, user_id)
+        return UserService._build_resource_state(user_id, [user_updated_at, profile_updated_at, last_login_at])
+    
+    @staticmethod
+    async def aget_resource_state(user_id) -> Optional[Tuple[str, datetime]]:
+        """
+        Async версия get_resource_state (для async views).
+
+        Пример: etag, last_modified = await UserService.aget_resource_state(user.id)
+        """
+        try:
+            row = await (
+                User.objects.filter(pk=user_id, is_active=True)
+                .values_list('updated_at', 'profile__updated_at', 'last_login_at')
+                .afirst()
+            )
+        except (TypeError, ValueError):
+            return None
+        if row is None:
+            return None
+        
+        user_updated_at, profile_updated_at, last_login_at = row
+        if settings.USER_SETTINGS.get('LAST_LOGIN_WRITE_BEHIND', False):
+            last_login_at = await amerge_last_login(last_login_at, user_id)
+        return UserService._build_resource_state(user_id, [user_updated_at, profile_updated_at, last_login_at])
+    
+    @staticmethod
+    def _build_resource_state(user_id, stamps: List[Optional[datetime]]) -> Tuple[str, datetime]:
+        raw = '|'.join(stamp.isoformat() if stamp else '' for stamp in stamps)
+        etag = hashlib.sha1(f'{user_id}|{raw}'.encode()).hexdigest()
+        return etag, max(stamp for stamp in stamps if stamp)
+    
+    @staticmethod
+    def get_compact_users(uuids: Iterable, fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Возвращает компактные данные пользователей по списку uuid одним запросом.
+
+        fields - маска полей из COMPACT_USER_FIELDS (+ full_name).
+        Из БД читаются только нужные колонки, JOIN профиля - только если
+        запрошено поле профиля.
+
+        Пример: UserService.get_compact_users([uuid1, uuid2], fields=['uuid', 'full_name'])
+        """
+        paths = UserService._compact_paths(fields)
+        queryset = User.objects.filter(uuid__in=list(uuids)).values_list(*paths.values())
+        return [UserService._compact_row(dict(zip(paths.keys(), values)), fields) for values in queryset]
+    
+    @staticmethod
+    async def aget_compact_users(uuids: Iterable, fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Async версия get_compact_users (для async views).
+
+        Пример: await UserService.aget_compact_users([uuid1, uuid2], fields=['uuid', 'full_name'])
+        """
+        paths = UserService._compact_paths(fields)
+        queryset = User.objects.filter(uuid__in=list(uuids)).values_list(*paths.values())
+        return [UserService._compact_row(dict(zip(paths.keys(), values)), fields) async for values in queryset]
+    
+    @staticmethod
+    def _compact_paths(fields: Optional[List[str]]) -> Dict[str, str]:
+        """Колонки для values_list: только нужные запрошенным полям."""
+        columns = {'uuid'}
+        for field in fields or DEFAULT_COMPACT_FIELDS:
+            if field == 'full_name':
+                columns.update({'email', 'first_name', 'last_name'})
+            else:
+                columns.add(field)
+        return {column: COMPACT_USER_FIELDS[column] for column in columns}
+    
+    @staticmethod
+    def _compact_row(row: Dict, fields: Optional[List[str]]) -> Dict:
+        fields = fields or DEFAULT_COMPACT_FIELDS
+        if 'full_name' in fields:
+            full_name = f'{row["first_name"]} {row["last_name"]}'.strip()
+            row['full_name'] = full_name if row['first_name'] and row['last_name'] else row['email']
+        if row.get('avatar'):
+            row['avatar'] = default_storage.url(row['avatar'])
+        if 'avatar_thumbnails' in row:
+            row['avatar_thumbnails'] = thumbnail_urls(row['avatar_thumbnails'])
+        # uuid есть в каждой строке: по нему вызывающий сопоставляет
+        # результаты с запросом, даже если в маске его нет
+        return {'uuid': row['uuid'], **{field: row.get(field) for field in fields}}
+
+    @staticmethod
+    def lookup_batch(uuids: List, fields: Optional[List[str]] = None) -> Dict:
+        """
+        Ответ internal batch: {'results': [...], 'missing': [uuid, ...]}.
+
+        Пример: UserService.lookup_batch([uuid1, uuid2], fields=['full_name'])
+        """
+        return UserService._batch_response(uuids, UserService.get_compact_users(uuids, fields=fields))
+
+    @staticmethod
+    async def alookup_batch(uuids: List, fields: Optional[List[str]] = None) -> Dict:
+        """Async версия lookup_batch (для async views)."""
+        return UserService._batch_response(uuids, await UserService.aget_compact_users(uuids, fields=fields))
+
+    @staticmethod
+    def _batch_response(uuids: List, users: List[Dict]) -> Dict:
+        found = {str(user['uuid']) for user in users}
+        return {
+            'results': users,
+            'missing': [str(uuid) for uuid in uuids if str(uuid) not in found],
+        }
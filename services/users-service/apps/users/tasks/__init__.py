@@ -0,0 +1,7 @@
+from users.tasks.email_tasks import flush_email_queue, send_email_batch
+from users.tasks.cleanup_tasks import purge_expired_tokens
+from users.tasks.last_login_tasks import flush_last_logins
+from users.tasks.avatar_tasks import process_avatar
+from users.tasks.outbox_tasks import publish_outbox_events, purge_published_outbox_events
+from users.tasks.erasure_tasks import run_erasure_job, resume_erasure_jobs
+from users.tasks.import_tasks import import_users_file
@@ -0,0 +1,48 @@
+import logging
+from celery import shared_task
+from django.utils import timezone
+
+from users.models import UserProfile
+from users.services.user_cache_service import UserCacheService
+from users.utils.avatars import InvalidAvatarError, generate_avatar_thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_avatar(self, profile_id: int, avatar_name: str) -> dict:
+    """
+    Декодирует загруженный аватар и генерирует миниатюры.
+
+    avatar_name - имя файла на момент загрузки: если пользователь успел
+    загрузить новый аватар, старая задача ничего не делает.
+    Невалидное изображение удаляется из профиля.
+    """
+    profile = UserProfile.objects.filter(id=profile_id).first()
+    if profile is None or profile.avatar.name != avatar_name:
+        logger.info(f'Аватар профиля {profile_id} уже заменен, обработка пропущена')
+        return {}
+
+    try:
+        with profile.avatar.open('rb') as file:
+            thumbnails = generate_avatar_thumbnails(file)
+    except InvalidAvatarError as e:
+        logger.warning(f'Невалидный аватар у профиля {profile_id}: {e}')
+        profile.avatar.delete(save=False)
+        UserProfile.objects.filter(id=profile_id, avatar=avatar_name).update(
+            avatar=None, avatar_thumbnails={}, updated_at=timezone.now()
+        )
+        UserCacheService.invalidate(profile.user_id)
+        return {}
+    except OSError as e:
+        # Хранилище временно недоступно
+        raise self.retry(exc=e)
+
+    # Условие по avatar защищает от гонки с новой загрузкой
+    updated = UserProfile.objects.filter(id=profile_id, avatar=avatar_name).update(
+        avatar_thumbnails=thumbnails, updated_at=timezone.now()
+    )
+    if updated:
+        UserCacheService.invalidate(profile.user_id)
+        logger.info(f'Миниатюры аватара готовы для профиля {profile_id}')
+    return thumbnails
@@ -0,0 +1,70 @@
+import logging
+import time
+from typing import Dict
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from users.models import EmailVerificationToken, PasswordResetToken
+
+logger = logging.getLogger(__name__)
+
+
+def purge_tokens(model, batch_size: int, max_batches: int, pause: float) -> int:
+    """
+    Удаляет использованные и истекшие токены модели пачками.
+
+    Каждая пачка - отдельная короткая транзакция DELETE ... WHERE id IN (...),
+    поэтому блокировки держатся миллисекунды, а не весь проход.
+    Возвращает количество удаленных строк.
+    """
+    now = timezone.now()
+    stale = Q(is_used=True) | Q(expires_at__lt=now)
+    deleted = 0
+
+    for _ in range(max_batches):
+        ids = list(
+            model.objects.filter(stale)
+            .order_by()
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic():
+            count, _ = model.objects.filter(id__in=ids).delete()
+        deleted += count
+
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return deleted
+
+
+@shared_task
+def purge_expired_tokens() -> Dict[str, int]:
+    """
+    Очищает таблицы токенов верификации email и сброса пароля.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['purge-expired-tokens']).
+    За один запуск удаляется не больше TOKEN_PURGE_BATCH_SIZE * TOKEN_PURGE_MAX_BATCHES
+    строк на таблицу, остаток добирается следующими запусками.
+    """
+    batch_size = settings.USER_SETTINGS.get('TOKEN_PURGE_BATCH_SIZE', 1000)
+    max_batches = settings.USER_SETTINGS.get('TOKEN_PURGE_MAX_BATCHES', 100)
+    pause = settings.USER_SETTINGS.get('TOKEN_PURGE_PAUSE', 0.05)
+
+    result = {
+        'email_verification_tokens': purge_tokens(EmailVerificationToken, batch_size, max_batches, pause),
+        'password_reset_tokens': purge_tokens(PasswordResetToken, batch_size, max_batches, pause),
+    }
+
+    logger.info(
+        f'Очистка токенов: верификации email удалено {result["email_verification_tokens"]}, '
+        f'сброса пароля удалено {result["password_reset_tokens"]}'
+    )
+    return result
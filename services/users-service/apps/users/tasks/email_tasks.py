@@ -0,0 +1,77 @@
+import logging
+from smtplib import SMTPException
+from typing import Dict, List
+from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.mail import get_connection
+
+from users.utils.email_queue import EmailQueue, split_by_domain_quota, to_email_message
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_email_queue() -> int:
+    """
+    Забирает пачку писем из очереди и отправляет ее одной задачей.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['flush-email-queue']).
+    Письма сверх лимита домена возвращаются в конец очереди до следующего окна.
+    Пачка удаляется из Redis только после передачи в Celery: если
+    delay() упал, письма возвращаются в очередь, а пачки упавшего
+    воркера возвращает recover_stale.
+    """
+    user_settings = settings.USER_SETTINGS
+    EmailQueue.recover_stale(user_settings.get('EMAIL_PROCESSING_TIMEOUT', 300))
+
+    batch_id, messages = EmailQueue.pop_batch(user_settings.get('EMAIL_BATCH_SIZE', 100))
+    if not messages:
+        return 0
+
+    ready, deferred = split_by_domain_quota(messages)
+    if ready:
+        try:
+            send_email_batch.delay(ready)
+        except Exception as e:
+            logger.error(f'Не удалось передать пачку писем в Celery: {e}')
+            EmailQueue.restore(batch_id)
+            return 0
+    EmailQueue.ack(batch_id, requeue=deferred)
+
+    logger.info(f'Очередь писем: к отправке {len(ready)}, отложено {len(deferred)}')
+    return len(ready)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=5)
+def send_email_batch(self, messages: List[Dict]) -> int:
+    """
+    Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Письма отправляются по одному в открытом соединении, поэтому известно,
+    какие уже ушли: при ошибке SMTP задача перезапускается с
+    экспоненциальной задержкой только для еще не отправленных писем.
+    """
+    connection = get_connection(fail_silently=False)
+    sent = 0
+
+    try:
+        connection.open()
+        for message in messages:
+            connection.send_messages([to_email_message(message)])
+            sent += 1
+    except (SMTPException, OSError) as e:
+        remaining = messages[sent:]
+        logger.warning(
+            f'Ошибка отправки писем: {e}. Отправлено {sent}, повтор для {len(remaining)} '
+            f'(попытка {self.request.retries + 1})'
+        )
+        countdown = get_exponential_backoff_interval(
+            factor=10, retries=self.request.retries, maximum=600, full_jitter=True
+        )
+        raise self.retry(exc=e, args=[remaining], countdown=countdown)
+    finally:
+        connection.close()
+
+    logger.info(f'Отправлено писем: {sent}')
+    return sent
@@ -0,0 +1,95 @@
+import logging
+import time
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from users.models import UserErasureJob
+from users.services.erasure_service import UserErasureService
+
+logger = logging.getLogger(__name__)
+
+
+def lock_key(job_id: int) -> str:
+    return f'erasure:job:{job_id}:lock'
+
+
+@shared_task
+def run_erasure_job(job_id: int) -> int:
+    """
+    Выполняет задачу удаления пользователей пачками по ERASURE_CHUNK_SIZE.
+
+    Нагрузка на БД ограничивается паузой после каждой пачки: не меньше
+    ERASURE_CHUNK_PAUSE и не меньше времени пачки * ERASURE_LOAD_FACTOR
+    (при 1.0 задача занимает БД не больше половины времени, а под
+    нагрузкой пачки медленнее - и паузы автоматически длиннее).
+
+    Один запуск работает не дольше ERASURE_RUN_TIME_LIMIT секунд и ставит
+    продолжение в очередь, не занимая воркер надолго. Возвращает
+    количество обработанных пачек.
+    """
+    user_settings = settings.USER_SETTINGS
+    chunk_size = user_settings.get('ERASURE_CHUNK_SIZE', 100)
+    pause = user_settings.get('ERASURE_CHUNK_PAUSE', 0.2)
+    load_factor = user_settings.get('ERASURE_LOAD_FACTOR', 1.0)
+    time_limit = user_settings.get('ERASURE_RUN_TIME_LIMIT', 60)
+    max_errors = user_settings.get('ERASURE_MAX_ERRORS', 5)
+
+    # Одну задачу обрабатывает один воркер (повторный запуск от beat - no-op)
+    if not cache.add(lock_key(job_id), 1, timeout=time_limit * 2):
+        return 0
+
+    chunks = 0
+    has_more = False
+    try:
+        if UserErasureService.start(job_id) is None:
+            return 0
+
+        started = time.monotonic()
+        while time.monotonic() - started < time_limit:
+            chunk_started = time.monotonic()
+            try:
+                has_more = UserErasureService.process_chunk(job_id, chunk_size)
+            except Exception as e:
+                # Пачка откатилась целиком; повтор - через resume_erasure_jobs
+                logger.error(f'Ошибка задачи удаления #{job_id}: {e}')
+                UserErasureService.record_error(job_id, e, max_errors)
+                has_more = False
+                break
+            chunks += 1
+            if not has_more:
+                break
+            time.sleep(max(pause, (time.monotonic() - chunk_started) * load_factor))
+    finally:
+        cache.delete(lock_key(job_id))
+
+    if has_more:
+        run_erasure_job.apply_async((job_id,), countdown=pause)
+    return chunks
+
+
+@shared_task
+def resume_erasure_jobs() -> int:
+    """
+    Возобновляет незавершенные задачи удаления.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['resume-erasure-jobs']).
+    Подхватывает задачи, которые не попали в очередь, и задачи, воркер
+    которых упал или которые остановились на ошибке: их heartbeat старше
+    двух ERASURE_RUN_TIME_LIMIT. Работа продолжается с сохраненного курсора.
+    """
+    time_limit = settings.USER_SETTINGS.get('ERASURE_RUN_TIME_LIMIT', 60)
+    stale_before = timezone.now() - timedelta(seconds=time_limit * 2)
+    job_ids = list(
+        UserErasureJob.objects.filter(status__in=UserErasureJob.ACTIVE_STATUSES)
+        .filter(Q(heartbeat_at__isnull=True, created_at__lt=stale_before) | Q(heartbeat_at__lt=stale_before))
+        .values_list('id', flat=True)
+    )
+    for job_id in job_ids:
+        UserErasureService.enqueue(job_id)
+    if job_ids:
+        logger.info(f'Возобновлено задач удаления: {len(job_ids)}')
+    return len(job_ids)
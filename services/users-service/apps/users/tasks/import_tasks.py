@@ -0,0 +1,53 @@
+import io
+import logging
+from typing import Dict, Optional
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+from users.services.bulk_user_service import BulkUserService
+
+logger = logging.getLogger(__name__)
+
+
+IMPORT_STATUS_KEY = 'users:import:{import_id}'
+# Сколько ошибок строк хранится в статусе импорта
+STATUS_MAX_ERRORS = 100
+
+
+def set_import_status(import_id: str, status: str, stats: Optional[Dict] = None) -> None:
+    """Пишет статус и статистику импорта в кэш (читает UserBulkImportStatusView)."""
+    data = {'import_id': import_id, 'status': status}
+    if stats is not None:
+        data.update(stats, errors=stats['errors'][:STATUS_MAX_ERRORS], error_count=len(stats['errors']))
+    cache.set(
+        IMPORT_STATUS_KEY.format(import_id=import_id), data,
+        timeout=settings.USER_SETTINGS.get('BULK_IMPORT_STATUS_TTL', 86400),
+    )
+
+
+def get_import_status(import_id: str) -> Optional[Dict]:
+    return cache.get(IMPORT_STATUS_KEY.format(import_id=import_id))
+
+
+@shared_task(ignore_result=True)
+def import_users_file(import_id: str, name: str, fmt: str) -> None:
+    """
+    Импортирует пользователей из загруженного файла (default_storage).
+
+    Ставится UserBulkImportView. Пароли хэшируются в процессе воркера:
+    пул процессов внутри prefork воркера Celery недоступен. Повторный
+    запуск после падения воркера (acks_late) пропускает уже созданных.
+    Файл удаляется после завершения.
+    """
+    set_import_status(import_id, 'running')
+    with default_storage.open(name, 'rb') as file:
+        stream = io.TextIOWrapper(file, encoding='utf-8', newline='')
+        stats = BulkUserService.import_users(
+            BulkUserService.iter_rows(stream, fmt),
+            workers=0,
+            on_progress=lambda progress: set_import_status(import_id, 'running', progress),
+        )
+    set_import_status(import_id, 'completed' if stats['completed'] else 'failed', stats)
+    default_storage.delete(name)
@@ -0,0 +1,28 @@
+import logging
+from celery import shared_task
+
+from users.models import User
+from users.utils.last_login_buffer import take_buffered_logins, ack_buffered_logins
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_last_logins() -> int:
+    """
+    Записывает накопленные в Redis времена входа в БД.
+
+    Запускается Celery beat (CELERY_BEAT_SCHEDULE['flush-last-logins']).
+    bulk_update собирает пачку в один UPDATE ... SET last_login_at = CASE ...
+    вместо отдельного UPDATE на каждый вход.
+    """
+    logins = take_buffered_logins()
+    if not logins:
+        return 0
+
+    users = [User(pk=int(user_id), last_login_at=when) for user_id, when in logins.items()]
+    User.objects.bulk_update(users, ['last_login_at'], batch_size=1000)
+    ack_buffered_logins()
+
+    logger.info(f'Записано времен входа: {len(users)}')
+    return len(users)
@@ -0,0 +1,149 @@
+import logging
+import time
+from datetime import timedelta
+from functools import lru_cache
+from typing import List
+from uuid import uuid4
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from django_redis import get_redis_connection
+from kombu import Connection, Exchange, pools
+
+from users.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+RELAY_LOCK_KEY = 'users-service:outbox:relay:lock'
+
+# KEYS: ключ блокировки; ARGV: владелец.
+# Снимает блокировку, только если она все еще наша: релей, работавший
+# дольше OUTBOX_RELAY_LOCK_TIMEOUT, не снимет блокировку следующего
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def get_exchange() -> Exchange:
+    return Exchange(settings.OUTBOX_EXCHANGE, type='topic', durable=True)
+
+
+@lru_cache(maxsize=1)
+def get_connection() -> Connection:
+    """
+    Соединение с RabbitMQ с publisher confirms (один пул на процесс).
+
+    С confirm_publish publish() возвращается только после подтверждения
+    брокером, поэтому событие помечается опубликованным лишь когда оно
+    действительно принято.
+    """
+    return Connection(
+        settings.OUTBOX_BROKER_URL,
+        transport_options={'confirm_publish': True},
+        connect_timeout=5,
+    )
+
+
+def publish_batch(events, published_ids: List[int]) -> None:
+    """
+    Публикует пачку событий по порядку через пул producer-ов kombu.
+
+    id подтвержденных брокером событий добавляются в published_ids -
+    при ошибке посередине пачки они все равно будут отмечены.
+    """
+    exchange = get_exchange()
+    with pools.producers[get_connection()].acquire(block=True, timeout=10) as producer:
+        for event in events:
+            producer.publish(
+                {
+                    'event_id': event.id,
+                    'event_type': event.event_type,
+                    'aggregate_id': str(event.aggregate_id),
+                    'occurred_at': event.created_at.isoformat(),
+                    'data': event.payload,
+                },
+                exchange=exchange,
+                declare=[exchange],
+                routing_key=event.event_type,
+                serializer='json',
+                delivery_mode=2,
+                message_id=str(event.id),
+                retry=True,
+                retry_policy={'max_retries': 3, 'interval_start': 0.5, 'interval_step': 1},
+            )
+            published_ids.append(event.id)
+
+
+@shared_task(bind=True, max_retries=None, default_retry_delay=5)
+def publish_outbox_events(self) -> int:
+    """
+    Релей outbox: публикует неопубликованные события пачками.
+
+    Одновременно работает только один релей (блокировка в Redis), а
+    события берутся строго по возрастанию id - так сохраняется порядок
+    событий каждого пользователя. Доставка at-least-once: потребитель
+    дедуплицирует по event_id.
+    """
+    batch_size = settings.OUTBOX_BATCH_SIZE
+    lock_timeout = settings.OUTBOX_RELAY_LOCK_TIMEOUT
+    connection = get_redis_connection('default')
+    owner = uuid4().hex
+    if not connection.set(RELAY_LOCK_KEY, owner, nx=True, ex=lock_timeout):
+        return 0
+
+    total = 0
+    started = time.monotonic()
+    try:
+        while time.monotonic() - started < lock_timeout / 2:
+            events = list(OutboxEvent.objects.filter(published_at__isnull=True).order_by('id')[:batch_size])
+            if not events:
+                break
+
+            published_ids = []
+            try:
+                publish_batch(events, published_ids)
+            except Exception as e:
+                if self.request.is_eager:
+                    # В eager-режиме retry выполнился бы тут же рекурсивно;
+                    # оставшиеся события заберет следующий запуск
+                    logger.error(f'Ошибка публикации outbox: {e}')
+                    break
+                logger.error(f'Ошибка публикации outbox, повтор: {e}')
+                raise self.retry(exc=e)
+            finally:
+                OutboxEvent.objects.filter(id__in=published_ids).update(published_at=timezone.now())
+                total += len(published_ids)
+
+            if len(events) < batch_size:
+                break
+    finally:
+        connection.register_script(RELEASE_LOCK_SCRIPT)(keys=[RELAY_LOCK_KEY], args=[owner])
+
+    if total:
+        logger.info(f'Опубликовано событий outbox: {total}')
+    return total
+
+
+@shared_task
+def purge_published_outbox_events() -> int:
+    """Удаляет давно опубликованные события outbox пачками."""
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    batch_size = settings.OUTBOX_BATCH_SIZE * 10
+    deleted = 0
+    while True:
+        ids = list(
+            OutboxEvent.objects.filter(published_at__lt=cutoff)
+            .order_by()
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        count, _ = OutboxEvent.objects.filter(id__in=ids).delete()
+        deleted += count
+    if deleted:
+        logger.info(f'Удалено опубликованных событий outbox: {deleted}')
+    return deleted
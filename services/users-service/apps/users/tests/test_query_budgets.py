@@ -0,0 +1,54 @@
+"""
+Бюджеты SQL запросов горячих endpoint-ов: ловят N+1 регрессии, например
+пропавший select_related('profile') в списке пользователей.
+"""
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from common.testing import assert_endpoint_queries, assert_max_queries
+from users.api import tokens
+from users.api.tokens import KeyRingRefreshToken
+from users.models import User
+from users.services import UserCacheService
+from users.services.jwt_key_service import JWTKeyService
+
+PASSWORD = 'Secret-pass-123'
+
+
+# Без ключей токены подписываются HS256, аутентификация та же, что в проде
+@override_settings(JWT_KEYS_DIR='/nonexistent')
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@example.com', PASSWORD, is_staff=True)
+        for number in range(5):
+            User.objects.create_user(f'user{number}@example.com', PASSWORD, first_name=f'User{number}')
+
+    def setUp(self):
+        JWTKeyService.get_keys.cache_clear()
+        tokens._token_backend = None
+        self.addCleanup(JWTKeyService.get_keys.cache_clear)
+        # Первый запрос /me/ - всегда промах кэша
+        UserCacheService.invalidate(self.admin.pk)
+        self.client = APIClient()
+        access_token = KeyRingRefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+
+    def test_me(self):
+        # Пользователь по токену, валидаторы ETag и профиль при промахе кэша
+        with assert_max_queries(3, label='GET /me/ (холодный кэш)'):
+            response = self.client.get('/api/v1/users/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], self.admin.email)
+
+        with assert_max_queries(2, label='GET /me/ (из кэша)'):
+            self.client.get('/api/v1/users/me/')
+
+    def test_list_does_not_grow_with_page(self):
+        # Профили подгружаются тем же запросом (select_related), а не по одному
+        assert_endpoint_queries(self.client, [
+            ('get', '/api/v1/users/', 2),
+            ('get', '/api/v1/users/?expand=profile', 2),
+            ('get', '/api/v1/users/?fields=id,email&expand=profile', 2),
+        ])
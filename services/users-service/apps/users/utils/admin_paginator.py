@@ -0,0 +1,66 @@
+import json
+import logging
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для админки, не делающий COUNT(*) по большим таблицам.
+
+    На PostgreSQL:
+    - без фильтров количество берется из статистики pg_class.reltuples;
+    - с фильтрами - из оценки планировщика (EXPLAIN).
+    Если оценка меньше ADMIN_ESTIMATED_COUNT_THRESHOLD, считаем точно:
+    на маленьких выборках COUNT дешевый, а точность важнее.
+
+    Пример:
+        class UserAdmin(admin.ModelAdmin):
+            paginator = EstimatedCountPaginator
+            show_full_result_count = False
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        if connection.vendor != 'postgresql' or not threshold:
+            return super().count
+
+        try:
+            if not queryset.query.where and not queryset.query.distinct:
+                estimate = self._table_estimate(connection, queryset.model._meta.db_table)
+            else:
+                estimate = self._plan_estimate(connection, queryset)
+        except Exception as e:
+            logger.warning(f'Не удалось оценить количество строк, считаем точно: {e}')
+            return super().count
+
+        if estimate is None or estimate < threshold:
+            return super().count
+        return estimate
+
+    @staticmethod
+    def _table_estimate(connection, table):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+            row = cursor.fetchone()
+        # reltuples = -1, пока по таблице не было ANALYZE
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+    @staticmethod
+    def _plan_estimate(connection, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import logging
+from typing import Dict
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db.models import CharField, F, Func, Value
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+
+FORMAT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+class InvalidAvatarError(ValueError):
+    """Загруженный файл не является допустимым изображением."""
+
+
+def get_thumbnail_storage():
+    """Хранилище миниатюр (settings.STORAGES['avatars'])."""
+    return storages['avatars']
+
+
+def thumbnail_name(content: bytes, fmt: str) -> str:
+    """
+    Имя миниатюры по хэшу содержимого: ab/ab12...ef.webp.
+
+    Одинаковые картинки хранятся один раз, а файл по имени никогда
+    не меняется - его можно кэшировать навсегда.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    return f'{digest[:2]}/{digest}.{FORMAT_EXTENSIONS[fmt]}'
+
+
+class ThumbnailName(Func):
+    """
+    Имя миниатюры размера size из UserProfile.avatar_thumbnails (текст).
+
+    Пример: UserProfile.objects.alias(thumb=ThumbnailName(64)).filter(thumb__in=names)
+
+    KeyTextTransform (avatar_thumbnails__64) не подходит: числовой ключ
+    Django считает индексом массива (-> 64), и ключ '64' не находится.
+    На Postgres выражение совпадает с индексами user_profiles_thumb_*_idx.
+    """
+    function = 'JSON_EXTRACT'
+    output_field = CharField()
+
+    def __init__(self, size):
+        self.size = str(size)
+        super().__init__(F('avatar_thumbnails'), Value(f'$."{self.size}"'))
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        return f'({column} ->> %s)', (*params, self.size)
+
+
+def thumbnail_urls(thumbnails: Dict[str, str]) -> Dict[str, str]:
+    """
+    URL миниатюр по размерам.
+
+    Пример: thumbnail_urls(profile.avatar_thumbnails) -> {'64': '/api/v1/users/avatars/ab/ab12...ef.webp', ...}
+    """
+    if not thumbnails:
+        return {}
+    storage = get_thumbnail_storage()
+    return {size: storage.url(name) for size, name in thumbnails.items()}
+
+
+def open_avatar(file) -> Image.Image:
+    """
+    Открывает и декодирует аватар с проверкой размеров.
+
+    Размер в пикселях проверяется до декодирования, чтобы маленький файл
+    не распаковался в гигабайты памяти.
+    """
+    max_pixels = settings.USER_SETTINGS.get('AVATAR_MAX_PIXELS', 40_000_000)
+    try:
+        image = Image.open(file)
+        if image.width * image.height > max_pixels:
+            raise InvalidAvatarError(f'Слишком большое изображение: {image.width}x{image.height}')
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidAvatarError(f'Не удалось прочитать изображение: {e}') from e
+
+    # Учитываем поворот из EXIF и приводим к RGB (без прозрачности для JPEG)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    return image
+
+
+def generate_avatar_thumbnails(file) -> Dict[str, str]:
+    """
+    Генерирует квадратные миниатюры аватара всех размеров из настроек.
+
+    Возвращает {размер: имя файла в хранилище}. Уже существующие файлы
+    (та же картинка) повторно не сохраняются.
+
+    Пример:
+        with profile.avatar.open('rb') as f:
+            thumbnails = generate_avatar_thumbnails(f)  # {'64': 'ab/ab12...ef.webp', ...}
+    """
+    fmt = settings.USER_SETTINGS.get('AVATAR_FORMAT', 'WEBP')
+    quality = settings.USER_SETTINGS.get('AVATAR_QUALITY', 80)
+    sizes = settings.USER_SETTINGS.get('AVATAR_SIZES', (64, 128, 256))
+    storage = get_thumbnail_storage()
+
+    image = open_avatar(file)
+    if fmt == 'JPEG' and image.mode == 'RGBA':
+        image = image.convert('RGB')
+
+    thumbnails = {}
+    for size in sizes:
+        thumbnail = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format=fmt, quality=quality, optimize=True)
+        content = buffer.getvalue()
+
+        name = thumbnail_name(content, fmt)
+        if not storage.exists(name):
+            storage.save(name, ContentFile(content))
+        thumbnails[str(size)] = name
+
+    logger.debug(f'Миниатюры аватара сгенерированы: {thumbnails}')
+    return thumbnails
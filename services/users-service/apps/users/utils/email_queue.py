@@ -0,0 +1,209 @@
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_KEY = 'users-service:email:queue'
+# Забранные, но еще не переданные в Celery пачки: список писем пачки и
+# ZSET batch_id -> время забора (по нему возвращаются зависшие пачки)
+PROCESSING_KEY = 'users-service:email:processing:{batch_id}'
+INFLIGHT_KEY = 'users-service:email:inflight'
+RATE_LIMIT_KEY = 'users-service:email:rate:{domain}:{window}'
+RATE_LIMIT_WINDOW = 60
+
+# KEYS: очередь, список пачки, ZSET пачек; ARGV: размер, now, batch_id.
+# Переносит до size писем из очереди в список пачки
+POP_BATCH_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items == 0 then
+    return items
+end
+redis.call('LTRIM', KEYS[1], #items, -1)
+redis.call('RPUSH', KEYS[2], unpack(items))
+redis.call('ZADD', KEYS[3], ARGV[2], ARGV[3])
+return items
+"""
+
+# KEYS: очередь, список пачки, ZSET пачек; ARGV: batch_id.
+# Возвращает письма пачки в начало очереди в прежнем порядке
+RESTORE_BATCH_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[2], 0, -1)
+for i = #items, 1, -1 do
+    redis.call('LPUSH', KEYS[1], items[i])
+end
+redis.call('DEL', KEYS[2])
+redis.call('ZREM', KEYS[3], ARGV[1])
+return #items
+"""
+
+
+def build_message(subject: str, body: str, recipient: str) -> Dict:
+    """
+    Собирает письмо в виде словаря, пригодного для очереди и Celery.
+
+    Пример: build_message('Сброс пароля', text, 'user@example.com')
+    """
+    return {
+        'subject': subject,
+        'body': body,
+        'from_email': settings.DEFAULT_FROM_EMAIL,
+        'to': [recipient],
+    }
+
+
+def to_email_message(message: Dict) -> EmailMessage:
+    """Превращает словарь из очереди в EmailMessage."""
+    return EmailMessage(
+        subject=message['subject'],
+        body=message['body'],
+        from_email=message['from_email'],
+        to=message['to'],
+    )
+
+
+def get_domain(message: Dict) -> str:
+    """Возвращает почтовый домен первого получателя."""
+    return message['to'][0].rsplit('@', 1)[-1].lower()
+
+
+class EmailQueue:
+    """
+    Буфер исходящих писем в Redis (список).
+
+    Запросы только кладут письма в очередь (RPUSH), а периодическая задача
+    flush_email_queue забирает их пачками и отправляет через одно
+    SMTP соединение.
+
+    Забранная пачка лежит в своем списке (PROCESSING_KEY), пока ее не
+    подтвердят (ack) после передачи в Celery. Если воркер упал между
+    забором и передачей, recover_stale вернет пачку в очередь.
+    """
+
+    @staticmethod
+    def push(message: Dict) -> bool:
+        """
+        Добавляет письмо в конец очереди.
+
+        Возвращает False, если Redis недоступен: письмо не поставлено,
+        вызывающий отправляет его в обход очереди.
+        """
+        try:
+            get_redis_connection('default').rpush(QUEUE_KEY, json.dumps(message))
+        except RedisError as e:
+            logger.warning(f'Очередь писем недоступна: {e}')
+            return False
+        return True
+
+    @staticmethod
+    def pop_batch(size: int) -> Tuple[Optional[str], List[Dict]]:
+        """
+        Атомарно забирает до size писем из начала очереди в новую пачку.
+
+        Возвращает (batch_id, письма); после передачи писем дальше нужно
+        вызвать ack(batch_id), при ошибке - restore(batch_id).
+        """
+        batch_id = uuid4().hex
+        connection = get_redis_connection('default')
+        raw_messages = connection.register_script(POP_BATCH_SCRIPT)(
+            keys=[QUEUE_KEY, PROCESSING_KEY.format(batch_id=batch_id), INFLIGHT_KEY],
+            args=[size, time.time(), batch_id],
+        )
+        if not raw_messages:
+            return None, []
+        return batch_id, [json.loads(raw) for raw in raw_messages]
+
+    @staticmethod
+    def ack(batch_id: str, requeue: Optional[List[Dict]] = None) -> None:
+        """
+        Подтверждает пачку; письма requeue (отложенные) одновременно
+        возвращаются в конец очереди, сохраняя порядок.
+
+        В конец, а не в начало: иначе письма домена, упершегося в лимит,
+        забирали бы каждую следующую пачку и не давали отправить остальные.
+        """
+        pipe = get_redis_connection('default').pipeline(transaction=True)
+        if requeue:
+            pipe.rpush(QUEUE_KEY, *[json.dumps(message) for message in requeue])
+        pipe.delete(PROCESSING_KEY.format(batch_id=batch_id))
+        pipe.zrem(INFLIGHT_KEY, batch_id)
+        pipe.execute()
+
+    @staticmethod
+    def restore(batch_id: str) -> int:
+        """Возвращает всю пачку в начало очереди. Возвращает количество писем."""
+        connection = get_redis_connection('default')
+        return connection.register_script(RESTORE_BATCH_SCRIPT)(
+            keys=[QUEUE_KEY, PROCESSING_KEY.format(batch_id=batch_id), INFLIGHT_KEY],
+            args=[batch_id],
+        )
+
+    @staticmethod
+    def recover_stale(timeout: float) -> int:
+        """Возвращает в очередь пачки, не подтвержденные за timeout секунд."""
+        stale = get_redis_connection('default').zrangebyscore(INFLIGHT_KEY, '-inf', time.time() - timeout)
+        restored = 0
+        for batch_id in stale:
+            batch_id = batch_id.decode() if isinstance(batch_id, bytes) else batch_id
+            restored += EmailQueue.restore(batch_id)
+        if restored:
+            logger.warning(f'Возвращено в очередь писем из зависших пачек: {restored}')
+        return restored
+
+    @staticmethod
+    def size() -> int:
+        return get_redis_connection('default').llen(QUEUE_KEY)
+
+
+def acquire_domain_quota(domain: str, requested: int) -> int:
+    """
+    Резервирует квоту отправки для домена в текущем минутном окне.
+
+    Возвращает сколько писем из requested можно отправить прямо сейчас.
+    Лимит задается USER_SETTINGS['EMAIL_DOMAIN_RATE_LIMIT'] (писем в минуту).
+    """
+    limit = settings.USER_SETTINGS.get('EMAIL_DOMAIN_RATE_LIMIT', 60)
+    window = int(time.time() // RATE_LIMIT_WINDOW)
+    key = RATE_LIMIT_KEY.format(domain=domain, window=window)
+
+    connection = get_redis_connection('default')
+    pipe = connection.pipeline(transaction=True)
+    pipe.incrby(key, requested)
+    pipe.expire(key, RATE_LIMIT_WINDOW * 2)
+    used, _ = pipe.execute()
+
+    over_limit = used - limit
+    if over_limit <= 0:
+        return requested
+
+    # Отдаем обратно то, что не влезло в лимит
+    connection.decrby(key, min(over_limit, requested))
+    return max(requested - over_limit, 0)
+
+
+def split_by_domain_quota(messages: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Делит пачку писем на те, что можно отправить сейчас, и отложенные.
+
+    Порядок писем внутри домена сохраняется.
+    """
+    by_domain: Dict[str, List[Dict]] = {}
+    for message in messages:
+        by_domain.setdefault(get_domain(message), []).append(message)
+
+    ready, deferred = [], []
+    for domain, domain_messages in by_domain.items():
+        allowed = acquire_domain_quota(domain, len(domain_messages))
+        ready.extend(domain_messages[:allowed])
+        deferred.extend(domain_messages[allowed:])
+        if allowed < len(domain_messages):
+            logger.info(f'Лимит отправки для домена {domain}: отложено {len(domain_messages) - allowed} писем')
+
+    return ready, deferred
@@ -1,12 +1,55 @@
 import logging
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
+from users.utils.email_queue import EmailQueue, build_message
+from users.tasks.email_tasks import send_email_batch
+
 logger = logging.getLogger(__name__)
 
 
+def queue_email(subject, message, recipient):
+    """
+    Ставит письмо в очередь на отправку.
+
+    Письмо попадает в очередь Redis только после коммита транзакции,
+    отправляет его воркер Celery (flush_email_queue -> send_email_batch).
+    Если Redis недоступен, письмо уходит в обход очереди (deliver_email).
+    При USER_SETTINGS['EMAIL_ASYNC'] = False письмо отправляется сразу
+    через EMAIL_BACKEND (locmem/filebased в тестах).
+
+    Пример: queue_email('Сброс пароля', text, 'user@example.com')
+    """
+    payload = build_message(subject, message, recipient)
+    
+    if not settings.USER_SETTINGS.get('EMAIL_ASYNC', True):
+        send_email_batch([payload])
+        return
+    
+    transaction.on_commit(lambda: deliver_email(payload))
+
+
+def deliver_email(payload):
+    """
+    Кладет письмо в очередь, а без Redis - сразу в Celery или отправляет
+    синхронно. Не бросает исключений: вызывается после коммита, и
+    ошибка письма не должна превращать выполненный запрос в 500.
+    """
+    if EmailQueue.push(payload):
+        return
+    try:
+        send_email_batch.delay([payload])
+        return
+    except Exception as e:
+        logger.warning(f'Не удалось поставить задачу отправки письма: {e}')
+    try:
+        send_email_batch([payload])
+    except Exception as e:
+        logger.error(f'Письмо на {payload["to"]} не отправлено: {e}')
+
+
 def send_verification_email(user, token):
     """
     Отправляет письмо с ссылкой для верификации email.
@@ -33,14 +76,8 @@ def send_verification_email(user, token):
     """
     
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
-        logger.info(f'Письмо верификации отправлено на: {user.email}')
+        queue_email(subject, message, user.email)
+        logger.info(f'Письмо верификации поставлено в очередь для: {user.email}')
     except Exception as e:
         logger.error(f'Ошибка отправки письма верификации на {user.email}: {e}')
         raise
@@ -74,14 +111,8 @@ def send_password_reset_email(user, token):
     """
     
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
-        logger.info(f'Письмо сброса пароля отправлено на: {user.email}')
+        queue_email(subject, message, user.email)
+        logger.info(f'Письмо сброса пароля поставлено в очередь для: {user.email}')
     except Exception as e:
         logger.error(f'Ошибка отправки письма сброса пароля на {user.email}: {e}')
         raise
@@ -107,14 +138,8 @@ def send_welcome_email(user):
     """
     
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
-        logger.info(f'Приветственное письмо отправлено на: {user.email}')
+        queue_email(subject, message, user.email)
+        logger.info(f'Приветственное письмо поставлено в очередь для: {user.email}')
     except Exception as e:
         logger.error(f'Ошибка отправки приветственного письма на {user.email}: {e}')
         pass
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id с параметрами из настроек PASSWORD_HASHER_PARAMS['argon2id'].
+
+    При смене параметров must_update() вернет True, и пароль будет
+    прозрачно перехэширован при следующем входе.
+    """
+
+    def __init__(self):
+        params = settings.PASSWORD_HASHER_PARAMS.get('argon2id', {})
+        self.time_cost = params.get('time_cost', self.time_cost)
+        self.memory_cost = params.get('memory_cost', self.memory_cost)
+        self.parallelism = params.get('parallelism', self.parallelism)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt с параметрами из настроек PASSWORD_HASHER_PARAMS['scrypt']."""
+
+    def __init__(self):
+        params = settings.PASSWORD_HASHER_PARAMS.get('scrypt', {})
+        self.work_factor = params.get('work_factor', self.work_factor)
+        self.block_size = params.get('block_size', self.block_size)
+        self.parallelism = params.get('parallelism', self.parallelism)
+
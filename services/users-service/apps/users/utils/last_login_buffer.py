@@ -0,0 +1,116 @@
+import logging
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, Optional
+from asgiref.sync import sync_to_async
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError, ResponseError
+
+logger = logging.getLogger(__name__)
+
+
+BUFFER_KEY = 'users-service:last_login'
+PROCESSING_KEY = 'users-service:last_login:processing'
+
+
+def _to_datetime(raw) -> datetime:
+    return datetime.fromtimestamp(float(raw), tz=dt_timezone.utc)
+
+
+def record_login(user_id, when: datetime) -> bool:
+    """
+    Запоминает время входа пользователя в Redis (write-behind).
+
+    В БД время попадет при следующем flush_last_logins. Возвращает False,
+    если Redis недоступен: тогда время нужно записать в БД сразу.
+    """
+    try:
+        get_redis_connection('default').hset(BUFFER_KEY, str(user_id), when.timestamp())
+    except RedisError as e:
+        logger.warning(f'Буфер входов недоступен, пишем в БД: {e}')
+        return False
+    return True
+
+
+def get_buffered_logins(user_ids: Iterable) -> Dict[str, datetime]:
+    """
+    Возвращает еще не записанные в БД времена входа по id пользователей.
+
+    Смотрим и в основной буфер, и в буфер, который сейчас сбрасывается.
+    """
+    user_ids = [str(user_id) for user_id in user_ids]
+    if not user_ids:
+        return {}
+
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        pipe.hmget(BUFFER_KEY, user_ids)
+        pipe.hmget(PROCESSING_KEY, user_ids)
+        buffered, processing = pipe.execute()
+    except Exception as e:
+        logger.warning(f'Не удалось прочитать буфер входов: {e}')
+        return {}
+
+    result = {}
+    for user_id, fresh, flushing in zip(user_ids, buffered, processing):
+        raw = fresh or flushing
+        if raw is not None:
+            result[user_id] = _to_datetime(raw)
+    return result
+
+
+def get_buffered_login(user_id) -> Optional[datetime]:
+    """Возвращает буферизованное время входа одного пользователя."""
+    return get_buffered_logins([user_id]).get(str(user_id))
+
+
+def latest_login(db_value: Optional[datetime], buffered: Optional[datetime]) -> Optional[datetime]:
+    """Самое свежее из времени входа в БД и в буфере."""
+    if buffered is None:
+        return db_value
+    if db_value is None:
+        return buffered
+    return max(db_value, buffered)
+
+
+def merge_last_login(db_value: Optional[datetime], user_id) -> Optional[datetime]:
+    """Возвращает самое свежее время входа: из БД или из буфера."""
+    return latest_login(db_value, get_buffered_login(user_id))
+
+
+
+async def aget_buffered_login(user_id) -> Optional[datetime]:
+    """Async версия get_buffered_login: клиент Redis синхронный, читаем в потоке."""
+    return await sync_to_async(get_buffered_login)(user_id)
+
+
+async def amerge_last_login(db_value: Optional[datetime], user_id) -> Optional[datetime]:
+    """Async версия merge_last_login."""
+    return latest_login(db_value, await aget_buffered_login(user_id))
+
+
+def take_buffered_logins() -> Dict[str, datetime]:
+    """
+    Забирает накопленный буфер для записи в БД.
+
+    Буфер атомарно переименовывается в PROCESSING_KEY, новые входы пишутся
+    уже в новый буфер. Если предыдущий сброс упал, сначала дочитываем
+    оставшийся PROCESSING_KEY. После записи в БД нужно вызвать
+    ack_buffered_logins().
+    """
+    connection = get_redis_connection('default')
+    if not connection.exists(PROCESSING_KEY):
+        try:
+            connection.rename(BUFFER_KEY, PROCESSING_KEY)
+        except ResponseError:
+            # Буфер пуст: RENAME несуществующего ключа - ошибка
+            return {}
+
+    return {
+        user_id.decode(): _to_datetime(raw)
+        for user_id, raw in connection.hgetall(PROCESSING_KEY).items()
+    }
+
+
+def ack_buffered_logins() -> None:
+    """Удаляет записанный в БД буфер."""
+    get_redis_connection('default').delete(PROCESSING_KEY)
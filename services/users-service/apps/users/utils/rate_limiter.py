@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Tuple
+from uuid import uuid4
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+
+KEY_PREFIX = 'users-service:ratelimit:'
+LOCAL_MAX_KEYS = 10000
+
+# Проверяет все окна разом и, только если запрос проходит во всех,
+# записывает его в каждое. Возвращает 0 или сколько мс ждать.
+# KEYS - окна, ARGV: now_ms, member, затем пары limit, window_ms на каждый ключ.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local window = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local count = redis.call('ZCARD', key)
+    if count >= limit then
+        local oldest = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+        local key_wait = tonumber(oldest[2]) + window - now
+        if key_wait > wait then
+            wait = key_wait
+        end
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 + 2 * i]))
+end
+return 0
+"""
+
+_script = None
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Разбирает лимит вида '5/min' в (количество, окно в секундах).
+
+    Поддерживаются sec, min, hour, day и множитель: '10/15min'.
+    """
+    count, period = rate.split('/')
+    multiplier = ''.join(ch for ch in period if ch.isdigit()) or '1'
+    unit = period.lstrip('0123456789')[0]
+    seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[unit]
+    return int(count), int(multiplier) * seconds
+
+
+class _LocalSlidingWindow:
+    """
+    Скользящее окно в памяти процесса.
+
+    Запасной вариант на время недоступности Redis: лимиты считаются
+    на процесс, а не на весь сервис, но полностью не отключаются.
+    """
+
+    def __init__(self, max_keys: int = LOCAL_MAX_KEYS):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.windows = OrderedDict()
+
+    def hit(self, limits: List[Tuple[str, int, int]], now_ms: int) -> int:
+        with self.lock:
+            wait = 0
+            for key, limit, window_ms in limits:
+                hits = self.windows.get(key)
+                if hits is None:
+                    continue
+                while hits and hits[0] <= now_ms - window_ms:
+                    hits.popleft()
+                if len(hits) >= limit:
+                    wait = max(wait, hits[len(hits) - limit] + window_ms - now_ms)
+            if wait > 0:
+                return wait
+
+            for key, limit, window_ms in limits:
+                hits = self.windows.get(key)
+                if hits is None:
+                    hits = self.windows[key] = deque()
+                self.windows.move_to_end(key)
+                hits.append(now_ms)
+            # Ограничиваем память: вытесняем давно не использованные ключи
+            while len(self.windows) > self.max_keys:
+                self.windows.popitem(last=False)
+            return 0
+
+
+_local = _LocalSlidingWindow()
+
+
+def hit(limits: List[Tuple[str, int, int]]) -> float:
+    """
+    Регистрирует запрос во всех окнах limits = [(key, limit, window_sec), ...].
+
+    Возвращает 0, если запрос разрешен, иначе сколько секунд ждать.
+    Запрос, отклоненный хотя бы одним окном, не расходует остальные.
+
+    Пример:
+        wait = hit([('login:ip:1.2.3.4', 20, 60), ('login:global', 1000, 60)])
+    """
+    global _script
+    if not limits:
+        return 0
+    now_ms = int(time.time() * 1000)
+    keys = [KEY_PREFIX + key for key, _, _ in limits]
+    args = [now_ms, f'{now_ms}-{uuid4().hex[:8]}']
+    for _, limit, window in limits:
+        args.extend([limit, window * 1000])
+
+    try:
+        if _script is None:
+            _script = get_redis_connection('default').register_script(SLIDING_WINDOW_SCRIPT)
+        wait_ms = int(_script(keys=keys, args=args))
+    except Exception as e:
+        logger.warning(f'Redis недоступен для rate limit, используем локальный лимит: {e}')
+        wait_ms = _local.hit([(key, limit, window * 1000) for key, (_, limit, window) in zip(keys, limits)], now_ms)
+    return wait_ms / 1000
@@ -5,6 +5,30 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Профиль запуска под ASGI (async views горячих endpoint-ов, см.
+users.api.async_views):
+
+    # uvicorn воркеры под gunicorn: метрики и перезапуск воркеров как у sync профиля
+    USERS_ASYNC_VIEWS=True GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \\
+        GUNICORN_WORKERS=4 gunicorn -c config/gunicorn.conf.py config.asgi:application
+
+    # или daphne (один процесс на инстанс, масштабирование - числом инстансов)
+    USERS_ASYNC_VIEWS=True daphne -b 0.0.0.0 -p 8000 config.asgi:application
+
+Воркеров - по числу ядер (а не 2 * ядра + 1, как у sync): один async
+воркер держит много соединений одновременно. Под ASGI каждый запрос
+выполняет ORM в своем потоке, поэтому соединения с БД не переживают
+запрос - держите их в PgBouncer (DATABASE_PGBOUNCER=True).
+
+Сравнение с sync профилем: python manage.py benchmark_asgi.
+
+ВНИМАНИЕ: по умолчанию USERS_ASYNC_VIEWS выключен, и включать его в
+production пока не стоит. В единственном замере (benchmark_asgi,
+gunicorn по 2 воркера на 1 CPU, SQLite, concurrency 32) async профиль дал
+0.5-0.6 throughput sync профиля на всех горячих endpoint-ах. На
+PostgreSQL + PgBouncer профиль еще не измерялся; включать - только если
+benchmark_asgi там покажет, что он не медленнее sync.
 """
 
 import os
@@ -0,0 +1,113 @@
+"""
+Маршрутизация запросов между primary и read-only репликой.
+
+Чтение идет в реплику только там, где это явно разрешено
+(read_from_replica() или ReplicaReadMixin во view). После первой записи
+в рамках запроса все дальнейшие чтения этого запроса идут в primary,
+чтобы не прочитать устаревшие данные сразу после своей же записи.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+PRIMARY_ALIAS = 'default'
+
+_use_replica = ContextVar('use_replica', default=False)
+_primary_pinned = ContextVar('primary_pinned', default=False)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def allow_replica_reads():
+    """Разрешает чтение из реплики до конца текущего запроса."""
+    _use_replica.set(True)
+
+
+def pin_to_primary():
+    """Все дальнейшие чтения текущего запроса - из primary."""
+    _primary_pinned.set(True)
+
+
+def reset_routing():
+    """Сбрасывает состояние маршрутизации (начало нового запроса)."""
+    _use_replica.set(False)
+    _primary_pinned.set(False)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Контекст, в котором чтения идут в реплику (если нет записи в запросе).
+
+    Пример:
+        with read_from_replica():
+            exists = User.objects.filter(email=email).exists()
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router: записи - в primary, разрешенные чтения - в реплику.
+
+    settings.DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_enabled() and _use_replica.get() and not _primary_pinned.get():
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика содержит те же данные, связи между ними допустимы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Сбрасывает маршрутизацию в начале каждого запроса.
+
+    Нужен, т.к. в WSGI поток переиспользуется между запросами,
+    и флаги предыдущего запроса не должны «протечь» в следующий.
+    Поддерживает и async цепочку (ASGI), чтобы не переключать потоки.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        reset_routing()
+        try:
+            return self.get_response(request)
+        finally:
+            reset_routing()
+
+    async def __acall__(self, request):
+        reset_routing()
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_routing()
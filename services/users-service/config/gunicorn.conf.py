@@ -0,0 +1,37 @@
+"""
+Конфигурация gunicorn.
+
+Запуск:
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus gunicorn -c config/gunicorn.conf.py config.wsgi
+
+Воркеры пишут метрики в файлы PROMETHEUS_MULTIPROC_DIR, /metrics в любом
+воркере отдает сумму по всем (см. common.metrics).
+
+ASGI профиль (uvicorn воркеры) - см. config/asgi.py.
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+# sync или uvicorn.workers.UvicornWorker (вместе с config.asgi:application)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+# Хуки мастера (on_starting, child_exit) импортируют common до загрузки
+# приложения, то есть до config/__init__.py, который добавляет эти пути
+pythonpath = f"{SERVICE_DIR / 'apps'},{SERVICE_DIR.parent}"
+
+
+def on_starting(server):
+    from common.metrics import clear_multiprocess_dir
+
+    clear_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    from common.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
@@ -1,7 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from common.metrics import metrics_view
+
+from users.api.views import JWKSView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/v1/users/", include("users.api.urls")),
+    path(".well-known/jwks.json", JWKSView.as_view(), name="jwks"),
+    path("metrics", metrics_view, name="metrics"),
 ]